@@ -12,7 +12,9 @@ class AgentsConfig(AppConfig):
     verbose_name = 'CrewAI Agents'
     
     def ready(self):
-        """Initialize the Slack bot only once under Daphne"""
+        """Register signal handlers and initialize the Slack bot only once under Daphne"""
+        import apps.agents.signals  # noqa
+
         # Get the current process name
         process_name = sys.argv[0] if sys.argv else ''
         #logger.info(f"AgentsConfig.ready() called with process_name: {process_name}")
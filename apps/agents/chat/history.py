@@ -1,6 +1,6 @@
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import BaseMessage
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import logging
 from apps.agents.models import ChatMessage
 
@@ -26,14 +26,26 @@ class DjangoCacheMessageHistory(BaseChatMessageHistory):
             ttl=ttl
         )
 
-    async def aget_messages(self) -> List[BaseMessage]:
+    async def aget_messages(self, limit: Optional[int] = None, before: Optional[str] = None) -> List[BaseMessage]:
         """Get messages from the message manager."""
         try:
-            return await self.message_manager.get_messages()
+            return await self.message_manager.get_messages(limit=limit, before=before)
         except Exception as e:
             logger.error(f"Error getting messages: {str(e)}")
             return []
 
+    async def aget_message_window(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Tuple[List[BaseMessage], Optional[str]]:
+        """Get a window of messages and the cursor for older ones."""
+        try:
+            return await self.message_manager.get_message_window(limit=limit, before=before)
+        except Exception as e:
+            logger.error(f"Error getting message window: {str(e)}")
+            return [], None
+
     async def add_message(self, message: BaseMessage, token_usage: Optional[Dict] = None) -> Optional[ChatMessage]:
         """
         Add message using the message manager.
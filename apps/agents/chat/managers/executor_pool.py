@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.common.utils import get_llm
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "agent_setup_version:"
+TOOLS_VERSION_KEY = f"{VERSION_KEY_PREFIX}tools"
+
+
+@dataclass
+class AgentSetup:
+    """Session-independent parts of a chat agent, safe to share between sessions."""
+    llm: Any
+    tools: List[Any]
+    prompt: Any
+    agent: Any
+
+
+class AgentSetupPool:
+    """
+    Per-process LRU cache of compiled agent setups.
+
+    Setups are keyed by agent ID, model, the agent's and the tool registry's
+    version counters and a hash of the system prompt (which covers the client
+    context). Version counters live in the shared cache and are bumped by the
+    signals in apps.agents.signals, so a change in any process retires the
+    stale setups everywhere. The LLMs in a setup carry no callbacks; sessions
+    pass their own token counters when invoking.
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._setups: "OrderedDict[Tuple, AgentSetup]" = OrderedDict()
+        self._llms: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, agent_id: int, model_name: str, system_prompt: str) -> Tuple:
+        prompt_hash = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+        return (agent_id, model_name, agent_version(agent_id), tools_version(), prompt_hash)
+
+    async def get(self, key: Tuple, build: Callable[[], Awaitable[AgentSetup]]) -> AgentSetup:
+        """Return the setup for key, building it on a miss."""
+        with self._lock:
+            setup = self._setups.get(key)
+            if setup is not None:
+                self._setups.move_to_end(key)
+                self.hits += 1
+                return setup
+            self.misses += 1
+
+        setup = await build()
+        with self._lock:
+            # Older versions of this agent's setup can never be hit again
+            stale = [k for k in self._setups if k[0] == key[0] and k[1] == key[1] and k[2:4] != key[2:4]]
+            for stale_key in stale:
+                del self._setups[stale_key]
+            self._setups[key] = setup
+            while len(self._setups) > self.max_size:
+                self._setups.popitem(last=False)
+        return setup
+
+    def get_llm(self, model_name: str, temperature: float = 0.7):
+        """Shared callback-free LLM client for a model and temperature."""
+        key = (model_name, temperature)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is not None:
+                self._llms.move_to_end(key)
+                return llm
+
+        llm, _ = get_llm(model_name=model_name, temperature=temperature)
+        llm.callbacks = None
+        with self._lock:
+            self._llms[key] = llm
+            while len(self._llms) > self.max_size:
+                self._llms.popitem(last=False)
+        return llm
+
+    def discard_agent(self, agent_id: Optional[int] = None):
+        """Drop this process's setups for one agent (or all agents)."""
+        with self._lock:
+            for key in [k for k in self._setups if agent_id is None or k[0] == agent_id]:
+                del self._setups[key]
+
+    def clear(self):
+        with self._lock:
+            self._setups.clear()
+            self._llms.clear()
+
+
+def agent_version(agent_id: int) -> int:
+    try:
+        return cache.get(f"{VERSION_KEY_PREFIX}{agent_id}", 0)
+    except Exception as e:
+        logger.warning(f"Error reading agent setup version: {str(e)}")
+        return 0
+
+
+def tools_version() -> int:
+    try:
+        return cache.get(TOOLS_VERSION_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Error reading tool setup version: {str(e)}")
+        return 0
+
+
+def _bump(key: str):
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception as e:
+        logger.warning(f"Error bumping agent setup version: {str(e)}")
+
+
+def invalidate_agent(agent_id: int):
+    """Retire cached setups of an agent in every process."""
+    _bump(f"{VERSION_KEY_PREFIX}{agent_id}")
+    agent_setup_pool.discard_agent(agent_id)
+
+
+def invalidate_tools():
+    """Retire all cached setups, e.g. after a tool definition changed."""
+    _bump(TOOLS_VERSION_KEY)
+    agent_setup_pool.discard_agent()
+
+
+# One pool per process, shared by every chat session
+agent_setup_pool = AgentSetupPool(getattr(settings, 'AGENT_SETUP_POOL_SIZE', 32))
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from channels.db import database_sync_to_async
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from apps.agents.models import ChatMessage, ConversationSummary
+from apps.agents.chat.managers.token_manager import TokenManager
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """Progressively summarize the conversation, adding onto the previous summary and returning a new summary.
+Keep names, figures, decisions, open questions and anything the user asked to remember. Write at most {max_words} words.
+
+Previous summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+
+
+class MemoryManager:
+    """
+    Token-budgeted conversation memory.
+
+    The most recent messages are kept verbatim up to ``window_tokens``. Older
+    messages are folded into a rolling summary stored in ConversationSummary.
+    The summary only changes when the window rolls over, and then the window
+    is trimmed to ``rollover_ratio`` of the budget so that the next few turns
+    fit without another summarization call. Summarizing runs in the background
+    after a turn (``schedule_roll_over``), never while building the context of
+    the next one. Token counts are stored on each ChatMessage the first time
+    they are needed.
+    """
+
+    MESSAGE_OVERHEAD = 4  # Tokens for role and formatting per message
+
+    def __init__(
+        self,
+        conversation_id: Optional[str],
+        token_manager: TokenManager,
+        llm=None,
+        window_tokens: int = 6000,
+        rollover_ratio: float = 0.75,
+        summary_words: int = 400
+    ):
+        self.conversation_id = conversation_id
+        self.token_manager = token_manager
+        self.llm = llm
+        self.window_tokens = window_tokens
+        self.rollover_ratio = rollover_ratio
+        self.summary_words = summary_words
+        self._roll_over_task: Optional[asyncio.Task] = None
+
+    async def get_context(self) -> Tuple[str, List[BaseMessage]]:
+        """Return the rolling summary and the recent messages that fit the budget."""
+        if not self.conversation_id:
+            return "", []
+
+        summary, rows = await database_sync_to_async(self._load_state)()
+        window, rolled_out = self._split_window(rows)
+
+        if rolled_out:
+            # Normally folded in after the previous turn; this turn goes on without them
+            self.schedule_roll_over()
+
+        return summary, [self._to_message(row) for row in window]
+
+    def schedule_roll_over(self) -> Optional[asyncio.Task]:
+        """Summarize messages that left the window in a background task."""
+        if not self.conversation_id:
+            return None
+        if self._roll_over_task is None or self._roll_over_task.done():
+            self._roll_over_task = asyncio.get_running_loop().create_task(self._roll_over_pending())
+        return self._roll_over_task
+
+    async def _roll_over_pending(self):
+        try:
+            summary, rows = await database_sync_to_async(self._load_state)()
+            _, rolled_out = self._split_window(rows)
+            if rolled_out:
+                await self._roll_over(summary, rolled_out)
+        except Exception as e:
+            logger.error(f"Error rolling over memory of conversation {self.conversation_id}: {str(e)}")
+
+    def _load_state(self) -> Tuple[str, List[Dict]]:
+        """Load the stored summary and the messages it does not cover yet."""
+        summary = ConversationSummary.objects.filter(conversation_id=self.conversation_id).first()
+        queryset = ChatMessage.objects.filter(conversation_id=self.conversation_id, is_deleted=False)
+        if summary:
+            queryset = queryset.filter(id__gt=summary.last_message_id)
+        rows = list(queryset.order_by('timestamp', 'id').values('id', 'content', 'is_agent', 'token_count'))
+
+        uncounted = [row for row in rows if row['token_count'] is None]
+        if uncounted:
+            for row in uncounted:
+                row['token_count'] = self.token_manager.count_tokens(row['content'] or '')
+            ChatMessage.objects.bulk_update(
+                [ChatMessage(id=row['id'], token_count=row['token_count']) for row in uncounted],
+                ['token_count']
+            )
+
+        return (summary.content if summary else ""), rows
+
+    def _split_window(self, rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split unsummarized messages into the kept window and those to summarize."""
+        if self._tokens(rows) <= self.window_tokens:
+            return rows, []
+
+        # Rolling over: keep less than the full budget to leave headroom
+        budget = int(self.window_tokens * self.rollover_ratio)
+        used = 0
+        start = len(rows)
+        while start > 0:
+            cost = rows[start - 1]['token_count'] + self.MESSAGE_OVERHEAD
+            # Always keep the latest message, even if it alone exceeds the budget
+            if used + cost > budget and start < len(rows):
+                break
+            used += cost
+            start -= 1
+        return rows[start:], rows[:start]
+
+    async def _roll_over(self, summary: str, rolled_out: List[Dict]) -> str:
+        """Fold messages that left the window into the stored summary."""
+        if self.llm is None:
+            logger.warning("No summarizer LLM configured; dropping messages outside the memory window")
+            new_summary = summary
+        else:
+            try:
+                new_summary = await self._summarize(summary, rolled_out)
+            except Exception as e:
+                # Keep the old summary and try again on the next turn
+                logger.error(f"Error summarizing conversation {self.conversation_id}: {str(e)}")
+                return summary
+
+        await database_sync_to_async(self._save_summary)(new_summary, rolled_out[-1]['id'])
+        logger.debug(f"Summarized {len(rolled_out)} messages for conversation {self.conversation_id}")
+        return new_summary
+
+    async def _summarize(self, summary: str, rows: List[Dict]) -> str:
+        new_lines = "\n".join(
+            f"{'AI' if row['is_agent'] else 'Human'}: {row['content']}" for row in rows
+        )
+        response = await self.llm.ainvoke(SUMMARY_PROMPT.format(
+            max_words=self.summary_words,
+            summary=summary or "(none)",
+            new_lines=new_lines
+        ))
+        return str(getattr(response, 'content', response)).strip()
+
+    def _save_summary(self, content: str, last_message_id: int):
+        ConversationSummary.objects.update_or_create(
+            conversation_id=self.conversation_id,
+            defaults={
+                'content': content,
+                'last_message_id': last_message_id,
+                'token_count': self.token_manager.count_tokens(content)
+            }
+        )
+
+    def _tokens(self, rows: List[Dict]) -> int:
+        return sum(row['token_count'] + self.MESSAGE_OVERHEAD for row in rows)
+
+    @staticmethod
+    def _to_message(row: Dict) -> BaseMessage:
+        message_class = AIMessage if row['is_agent'] else HumanMessage
+        return message_class(content=row['content'], additional_kwargs={'id': str(row['id'])})
@@ -1,16 +1,25 @@
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
 from django.core.cache import cache
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from channels.db import database_sync_to_async
 from apps.agents.chat.formatters.tool_formatter import ToolFormatter
 from apps.agents.chat.formatters.table_formatter import TableFormatter
-from apps.agents.models import ChatMessage, ToolRun
+from apps.agents.models import ChatMessage, ConversationSummary, ToolRun
 import logging
 import json
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 import asyncio
 
+try:
+    from django_redis import get_redis_connection
+    from redis.exceptions import WatchError
+except ImportError:
+    get_redis_connection = None
+    WatchError = None
+
 logger = logging.getLogger(__name__)
 
 def messages_to_dict(messages: List[BaseMessage]) -> List[Dict]:
@@ -42,6 +51,12 @@ class MessageManager(BaseChatMessageHistory):
     Consolidates message-related functionality from across the codebase.
     """
     
+    # Latest messages loaded for chat context and the initial history page
+    HISTORY_WINDOW = 50
+    # Messages kept in the history cache; one more than the window so a full
+    # cache also shows that older messages exist
+    HISTORY_CACHE_SIZE = HISTORY_WINDOW + 1
+    
     def __init__(self, 
                  conversation_id: Optional[str] = None,
                  session_id: Optional[str] = None,
@@ -62,24 +77,26 @@ class MessageManager(BaseChatMessageHistory):
         self.agent_id = agent_id
         self.ttl = ttl
         self.tool_formatter = ToolFormatter()
-        self.messages_cache_key = f"messages_{self.session_id}"
         self._messages = []
 
+    @property
+    def history_cache_key(self) -> str:
+        """Cache key of the history list (conversation_id may be set after init)."""
+        return f"chat_history:{self.conversation_id}"
+
     @property
     def messages(self) -> List[BaseMessage]:
-        """Get all messages in the history. Required by BaseChatMessageHistory."""
-        if self.messages_cache_key:
-            messages_dict = cache.get(self.messages_cache_key, [])
-            return dict_to_messages(messages_dict)
+        """Get the cached latest messages in the history. Required by BaseChatMessageHistory."""
+        if self.conversation_id:
+            entries = self._cache_read()
+            if entries is not None:
+                return dict_to_messages(entries)
         return self._messages.copy()
 
     @messages.setter
     def messages(self, messages: List[BaseMessage]) -> None:
         """Set messages in the history. Required by BaseChatMessageHistory."""
         self._messages = messages.copy()
-        if self.messages_cache_key:
-            messages_dict = messages_to_dict(messages)
-            cache.set(self.messages_cache_key, messages_dict, self.ttl)
 
     async def add_message(self, message: BaseMessage, token_usage: Optional[Dict] = None) -> Optional[ChatMessage]:
         """
@@ -122,108 +139,250 @@ class MessageManager(BaseChatMessageHistory):
             logger.error(f"Error adding message: {str(e)}")
             raise
 
-    async def get_messages(self) -> List[BaseMessage]:
-        """Get all non-deleted messages in the history."""
+    async def get_messages(self, limit: Optional[int] = None, before: Optional[str] = None) -> List[BaseMessage]:
+        """
+        Get non-deleted messages in the history, oldest first.
+        
+        Args:
+            limit: Only return the latest ``limit`` messages (all if None)
+            before: Cursor from get_message_window; only return older messages
+        """
+        messages, _ = await self.get_message_window(limit=limit, before=before)
+        return messages
+
+    async def get_message_window(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None
+    ) -> Tuple[List[BaseMessage], Optional[str]]:
+        """
+        Get a window of messages and the cursor for the page before it.
+        
+        The cursor is None when there are no older messages.
+        """
         try:
             if self.conversation_id:
-                from apps.agents.models import ChatMessage, ToolRun
-                
-                # First get non-deleted messages
-                query = {
-                    'conversation_id': self.conversation_id,
-                    'is_deleted': False  # Only get non-deleted messages
-                }
-                
-                logger.debug(f"Retrieving messages for conversation {self.conversation_id}")
-                    
-                messages = await database_sync_to_async(
-                    lambda: list(
-                        ChatMessage.objects.filter(**query)
-                        .prefetch_related(
-                            # Only prefetch tool runs associated with non-deleted messages
-                            models.Prefetch(
-                                'tool_runs',
-                                queryset=ToolRun.objects.filter(
-                                    message__is_deleted=False,
-                                    is_deleted=False
-                                )
-                            )
-                        )
-                        .order_by('timestamp')
-                    )
-                )()
-                
-                logger.debug(f"Retrieved {len(messages)} messages from database")
-
-                result = []
-                for msg in messages:
-                    logger.debug(f"Processing message ID: {msg.id}, Content: {msg.content[:50]}...")
-                    
-                    # Process the message differently based on type
-                    if not msg.is_agent:
-                        # Human messages (no tool processing needed)
-                        result.append(HumanMessage(
-                            content=msg.content,
-                            additional_kwargs={'id': str(msg.id)}
-                        ))
-                    else:
-                        # For agent messages, we need to check tool runs
-                        additional_kwargs = await self._process_tool_runs(msg) if msg.is_agent else {'id': str(msg.id)}
-                        
-                        # AI messages
-                        result.append(AIMessage(
-                            content=msg.content,
-                            additional_kwargs=additional_kwargs
-                        ))
-
-                # Update the in-memory cache with the loaded messages
-                self._messages = result.copy()
-                if self.messages_cache_key:
-                    messages_dict = messages_to_dict(result)
-                    cache.set(self.messages_cache_key, messages_dict, self.ttl)
-                
-                return result
-            return self._messages.copy()
+                entries, has_more = await database_sync_to_async(self._load_window)(limit, before)
+                return dict_to_messages(entries), self._cursor(entries[0]) if entries and has_more else None
+            return self._messages.copy(), None
         except Exception as e:
             logger.error(f"Error getting messages: {str(e)}", exc_info=True)
-            return []
+            return [], None
 
-    @database_sync_to_async
-    def _process_tool_runs(self, message):
-        """Process tool runs for a message in a synchronous context."""
-        additional_kwargs = {'id': str(message.id)}
+    def _load_window(self, limit: Optional[int], before: Optional[str]) -> Tuple[List[Dict], bool]:
+        """
+        Load a window of serialised messages.
         
+        The latest window is served from the history cache, which holds the
+        latest ``HISTORY_CACHE_SIZE`` messages. A cache miss loads just those;
+        after that only messages newer than the last cached one are read from
+        the database and pushed onto it. Older pages (``before``) and windows
+        larger than the cache use a keyset query on (timestamp, id).
+        """
+        if before or not limit or limit >= self.HISTORY_CACHE_SIZE:
+            fetch = limit + 1 if limit else None
+            entries = self._load_entries(limit=fetch, before=before)
+            has_more = bool(limit) and len(entries) > limit
+            return (entries[1:] if has_more else entries), has_more
+
+        # The cache holds either the whole conversation or more than ``limit``
+        # messages, so its length tells whether older messages exist
+        total = self._cache_length()
+        if total is None:
+            entries = self._load_entries(limit=self.HISTORY_CACHE_SIZE)
+            self._cache_replace(entries)
+            total = len(entries)
+            window = entries[-limit:]
+        else:
+            window = self._cache_read(limit) or []
+            last_id = self._cache_last_id()
+            newer = self._load_entries(after_id=last_id) if last_id is not None else []
+            if newer:
+                self._cache_append(newer)
+                total += len(newer)
+                window = (window + newer)[-limit:]
+        return window, total > limit
+
+    def _load_entries(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        after_id: Optional[int] = None
+    ) -> List[Dict]:
+        """Query non-deleted messages with their tool runs and serialise them in one pass."""
+        queryset = (
+            ChatMessage.objects.filter(conversation_id=self.conversation_id, is_deleted=False)
+            .prefetch_related(
+                models.Prefetch(
+                    'tool_runs',
+                    queryset=ToolRun.objects.filter(is_deleted=False).select_related('tool')
+                )
+            )
+        )
+        if after_id is not None:
+            queryset = queryset.filter(id__gt=after_id)
+        if before:
+            timestamp, message_id = self._parse_cursor(before)
+            queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+
+        if limit:
+            rows = list(queryset.order_by('-timestamp', '-id')[:limit])
+            rows.reverse()
+        else:
+            rows = list(queryset.order_by('timestamp', 'id'))
+
+        logger.debug(f"Retrieved {len(rows)} messages from database for conversation {self.conversation_id}")
+        return [self._serialize_message(row) for row in rows]
+
+    def _serialize_message(self, message: ChatMessage) -> Dict:
+        """Serialise a ChatMessage (with prefetched tool runs) for the history cache."""
+        additional_kwargs = {'id': str(message.id), 'timestamp': message.timestamp.isoformat()}
+        if message.is_agent:
+            tool_call = self._tool_call_from_runs(message)
+            if tool_call:
+                additional_kwargs['tool_call'] = tool_call
+        return {
+            'type': 'AIMessage' if message.is_agent else 'HumanMessage',
+            'content': message.content,
+            'additional_kwargs': additional_kwargs,
+            'pk': message.id
+        }
+
+    def _tool_call_from_runs(self, message: ChatMessage) -> Optional[Dict]:
+        """Build the tool_call entry from the message's first prefetched tool run."""
         try:
-            if hasattr(message, 'tool_runs'):
-                tool_runs = list(message.tool_runs.all())
-                logger.debug(f"Message {message.id} has {len(tool_runs)} tool runs")
-                
-                if tool_runs:
-                    # Get the first tool run
-                    tool_run = tool_runs[0]
-                    tool_name = tool_run.tool.name if tool_run.tool else 'unknown_tool'
-                    logger.debug(f"Tool run ID: {tool_run.id}, Tool: {tool_name}")
-                    
-                    # Parse tool output if it's JSON
-                    if tool_run.result and tool_run.result.strip():
-                        logger.debug(f"Tool result raw: {tool_run.result[:100]}...")
-                        try:
-                            tool_output = json.loads(tool_run.result)
-                            logger.debug("Successfully parsed tool result as JSON")
-                        except json.JSONDecodeError:
-                            tool_output = tool_run.result
-                            logger.debug("Could not parse tool result as JSON, using raw string")
-                        
-                        # Add tool data to additional_kwargs
-                        additional_kwargs['tool_call'] = {
-                            'name': tool_name,
-                            'output': tool_output
-                        }
-                        logger.debug(f"Added tool_call to additional_kwargs for message {message.id}")
+            tool_runs = list(message.tool_runs.all())
+            if not tool_runs:
+                return None
+            tool_run = tool_runs[0]
+            tool_name = tool_run.tool.name if tool_run.tool else 'unknown_tool'
+            if not tool_run.result or not str(tool_run.result).strip():
+                return None
+            try:
+                tool_output = json.loads(tool_run.result)
+            except (json.JSONDecodeError, TypeError):
+                tool_output = tool_run.result
+            return {'name': tool_name, 'output': tool_output}
         except Exception as e:
             logger.error(f"Error processing tool runs: {str(e)}", exc_info=True)
-            
-        return additional_kwargs
+            return None
+
+    @staticmethod
+    def _cursor(entry: Dict) -> str:
+        return f"{entry['additional_kwargs']['timestamp']}|{entry['pk']}"
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[Any, int]:
+        timestamp, message_id = cursor.rsplit('|', 1)
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError(f"Invalid history cursor: {cursor}")
+        return parsed, int(message_id)
+
+    # History cache: a Redis list of serialised messages, appended to as new
+    # messages arrive. Falls back to a single Django cache entry without Redis.
+
+    def _redis(self):
+        return get_redis_connection("default") if get_redis_connection is not None else None
+
+    def _cache_length(self) -> Optional[int]:
+        """Number of cached messages, or None if the history is not cached."""
+        try:
+            client = self._redis()
+            if client is not None:
+                return client.llen(self.history_cache_key) if client.exists(self.history_cache_key) else None
+            entries = cache.get(self.history_cache_key)
+            return len(entries) if entries is not None else None
+        except Exception as e:
+            logger.warning(f"Error reading chat history cache: {str(e)}")
+            return None
+
+    def _cache_read(self, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Cached messages (the latest ``limit`` if given), or None if not cached."""
+        try:
+            client = self._redis()
+            if client is not None:
+                if not client.exists(self.history_cache_key):
+                    return None
+                start = -limit if limit else 0
+                return [json.loads(item) for item in client.lrange(self.history_cache_key, start, -1)]
+            entries = cache.get(self.history_cache_key)
+            if entries is None:
+                return None
+            return entries[-limit:] if limit else entries
+        except Exception as e:
+            logger.warning(f"Error reading chat history cache: {str(e)}")
+            return None
+
+    def _cache_last_id(self) -> Optional[int]:
+        entries = self._cache_read(1)
+        if entries is None:
+            return None
+        return entries[-1]['pk'] if entries else 0
+
+    def _cache_replace(self, entries: List[Dict]):
+        try:
+            client = self._redis()
+            if client is not None:
+                pipe = client.pipeline()
+                pipe.delete(self.history_cache_key)
+                if entries:
+                    pipe.rpush(self.history_cache_key, *[json.dumps(entry, default=str) for entry in entries])
+                    pipe.expire(self.history_cache_key, self.ttl)
+                pipe.execute()
+            else:
+                cache.set(self.history_cache_key, entries, self.ttl)
+        except Exception as e:
+            logger.warning(f"Error writing chat history cache: {str(e)}")
+
+    def _cache_append(self, entries: List[Dict]):
+        """
+        Append entries newer than the cached tail, keeping the latest ``HISTORY_CACHE_SIZE``.
+        
+        Concurrent readers can load the same newer rows, so the tail is checked
+        and the push made atomically (WATCH/MULTI); a reader that loses the
+        race leaves the list to the one that won.
+        """
+        try:
+            client = self._redis()
+            if client is not None:
+                with client.pipeline() as pipe:
+                    try:
+                        pipe.watch(self.history_cache_key)
+                        if not pipe.exists(self.history_cache_key):
+                            return
+                        tail = pipe.lrange(self.history_cache_key, -1, -1)
+                        last_id = json.loads(tail[0])['pk'] if tail else 0
+                        entries = [entry for entry in entries if entry['pk'] > last_id]
+                        if not entries:
+                            return
+                        pipe.multi()
+                        pipe.rpush(self.history_cache_key, *[json.dumps(entry, default=str) for entry in entries])
+                        pipe.ltrim(self.history_cache_key, -self.HISTORY_CACHE_SIZE, -1)
+                        pipe.expire(self.history_cache_key, self.ttl)
+                        pipe.execute()
+                    except WatchError:
+                        logger.debug(f"Chat history cache {self.history_cache_key} changed while appending; skipped")
+            else:
+                cached = cache.get(self.history_cache_key) or []
+                last_id = cached[-1]['pk'] if cached else 0
+                cache.set(
+                    self.history_cache_key,
+                    (cached + [entry for entry in entries if entry['pk'] > last_id])[-self.HISTORY_CACHE_SIZE:],
+                    self.ttl
+                )
+        except Exception as e:
+            logger.warning(f"Error writing chat history cache: {str(e)}")
+
+    def _cache_invalidate(self):
+        try:
+            client = self._redis()
+            if client is not None:
+                client.delete(self.history_cache_key)
+            else:
+                cache.delete(self.history_cache_key)
+        except Exception as e:
+            logger.warning(f"Error clearing chat history cache: {str(e)}")
 
     async def add_messages(self, messages: List[BaseMessage]) -> None:
         """Add multiple messages to the history."""
@@ -241,6 +400,7 @@ class MessageManager(BaseChatMessageHistory):
                 await database_sync_to_async(ChatMessage.objects.filter(
                     conversation_id=self.conversation_id
                 ).delete)()
+                await database_sync_to_async(self._cache_invalidate)()
                 
         except Exception as e:
             logger.error(f"Error clearing messages: {str(e)}")
@@ -283,15 +443,22 @@ class MessageManager(BaseChatMessageHistory):
             
             # Store token usage if provided
             if token_usage:
-                TokenUsage.objects.create(
-                    conversation=conversation,
-                    message=chat_message,
-                    prompt_tokens=token_usage.get('prompt_tokens', 0),
-                    completion_tokens=token_usage.get('completion_tokens', 0),
-                    total_tokens=token_usage.get('total_tokens', 0),
-                    model=token_usage.get('model', 'unknown'),
-                    metadata={'message_type': message.__class__.__name__}
-                )
+                with transaction.atomic():
+                    usage = TokenUsage.objects.create(
+                        conversation=conversation,
+                        message=chat_message,
+                        prompt_tokens=token_usage.get('prompt_tokens', 0),
+                        completion_tokens=token_usage.get('completion_tokens', 0),
+                        total_tokens=token_usage.get('total_tokens', 0),
+                        model=token_usage.get('model', 'unknown'),
+                        metadata={'message_type': message.__class__.__name__}
+                    )
+                    Conversation.add_token_usage(
+                        conversation.id,
+                        prompt_tokens=usage.prompt_tokens,
+                        completion_tokens=usage.completion_tokens,
+                        total_tokens=usage.total_tokens
+                    )
             
             # Store tool runs if this is a tool-related message
             if message.additional_kwargs.get('tool_call'):
@@ -324,6 +491,8 @@ class MessageManager(BaseChatMessageHistory):
                             inputs=tool_input,
                             result=tool_output
                         )
+                        # A reader may have cached the message before its tool run existed
+                        self._cache_invalidate()
             
             return chat_message
                 
@@ -356,6 +525,17 @@ class MessageManager(BaseChatMessageHistory):
                 ).update
             )(is_deleted=True)
             
+            # Deleted messages may already be in the append-only history cache
+            await database_sync_to_async(self._cache_invalidate)()
+            
+            # A rolling summary that covers deleted messages has to be rebuilt
+            await database_sync_to_async(
+                ConversationSummary.objects.filter(
+                    conversation_id=self.conversation_id,
+                    last_message__timestamp__gte=message.timestamp
+                ).delete
+            )()
+            
             logger.debug(f"Message timestamp: {message.timestamp}. {deleted_count} messages and their tool runs marked as deleted.")
                     
         except Exception as e:
@@ -440,97 +620,16 @@ class MessageManager(BaseChatMessageHistory):
             logger.error(f"Error adding message synchronously: {str(e)}")
             raise
     
-    def get_messages_sync(self) -> List[BaseMessage]:
+    def get_messages_sync(self, limit: Optional[int] = None) -> List[BaseMessage]:
         """Synchronous version of get_messages."""
         try:
             if self.conversation_id:
-                from apps.agents.models import ChatMessage, ToolRun
-                
-                # First get non-deleted messages
-                query = {
-                    'conversation_id': self.conversation_id,
-                    'is_deleted': False  # Only get non-deleted messages
-                }
-                
-                logger.debug(f"Retrieving messages synchronously for conversation {self.conversation_id}")
-                    
-                messages = list(
-                    ChatMessage.objects.filter(**query)
-                    .prefetch_related(
-                        # Only prefetch tool runs associated with non-deleted messages
-                        models.Prefetch(
-                            'tool_runs',
-                            queryset=ToolRun.objects.filter(
-                                message__is_deleted=False,
-                                is_deleted=False
-                            )
-                        )
-                    )
-                    .order_by('timestamp')
-                )
-                
-                logger.debug(f"Retrieved {len(messages)} messages from database (sync)")
-
-                result = []
-                for msg in messages:
-                    # Process the message differently based on type
-                    if not msg.is_agent:
-                        # Human messages (no tool processing needed)
-                        result.append(HumanMessage(
-                            content=msg.content,
-                            additional_kwargs={'id': str(msg.id)}
-                        ))
-                    else:
-                        # For agent messages, we need to check tool runs
-                        additional_kwargs = self._process_tool_runs_sync(msg) if msg.is_agent else {'id': str(msg.id)}
-                        
-                        # AI messages
-                        result.append(AIMessage(
-                            content=msg.content,
-                            additional_kwargs=additional_kwargs
-                        ))
-
-                # Update the in-memory cache with the loaded messages
-                self._messages = result.copy()
-                if self.messages_cache_key:
-                    messages_dict = messages_to_dict(result)
-                    cache.set(self.messages_cache_key, messages_dict, self.ttl)
-                
-                return result
+                entries, _ = self._load_window(limit, None)
+                return dict_to_messages(entries)
             return self._messages.copy()
         except Exception as e:
             logger.error(f"Error getting messages synchronously: {str(e)}")
             return []
-    
-    def _process_tool_runs_sync(self, message):
-        """Process tool runs for a message in a synchronous context."""
-        additional_kwargs = {'id': str(message.id)}
-        
-        try:
-            if hasattr(message, 'tool_runs'):
-                tool_runs = list(message.tool_runs.all())
-                
-                if tool_runs:
-                    # Get the first tool run
-                    tool_run = tool_runs[0]
-                    tool_name = tool_run.tool.name if tool_run.tool else 'unknown_tool'
-                    
-                    # Parse tool output if it's JSON
-                    if tool_run.result and tool_run.result.strip():
-                        try:
-                            tool_output = json.loads(tool_run.result)
-                        except json.JSONDecodeError:
-                            tool_output = tool_run.result
-                        
-                        # Add tool data to additional_kwargs
-                        additional_kwargs['tool_call'] = {
-                            'name': tool_name,
-                            'output': tool_output
-                        }
-        except Exception as e:
-            logger.error(f"Error processing tool runs synchronously: {str(e)}")
-            
-        return additional_kwargs
         
     def _store_message_in_db_sync(self, message: BaseMessage, token_usage: Optional[Dict] = None) -> Optional[ChatMessage]:
         """Store a message in the database synchronously."""
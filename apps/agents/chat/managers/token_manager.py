@@ -1,10 +1,10 @@
 import logging
 import tiktoken
 from django.core.cache import cache
-from django.db import models
+from django.db import transaction
 from typing import Dict, Optional, Any
 from channels.db import database_sync_to_async
-from apps.agents.models import TokenUsage
+from apps.agents.models import Conversation, TokenUsage
 from apps.common.utils import get_llm
 from datetime import datetime
 import uuid
@@ -133,125 +133,74 @@ class TokenManager:
 
     @database_sync_to_async
     def store_token_usage(self, message_id: str, token_usage: Dict[str, Any]):
-        """Store token usage in the database."""
+        """Store token usage in the database and add it to the conversation totals."""
         if not self.conversation_id:
             return
 
         try:
-            TokenUsage.objects.create(
-                conversation_id=self.conversation_id,
-                message_id=message_id,
-                prompt_tokens=token_usage.get('prompt_tokens', 0),
-                completion_tokens=token_usage.get('completion_tokens', 0),
-                total_tokens=token_usage.get('total_tokens', 0),
-                model=token_usage.get('model', ''),
-                metadata=token_usage.get('metadata', {})
-            )
+            with transaction.atomic():
+                usage = TokenUsage.objects.create(
+                    conversation_id=self.conversation_id,
+                    message_id=message_id,
+                    prompt_tokens=token_usage.get('prompt_tokens', 0),
+                    completion_tokens=token_usage.get('completion_tokens', 0),
+                    total_tokens=token_usage.get('total_tokens', 0),
+                    model=token_usage.get('model', ''),
+                    metadata=token_usage.get('metadata', {})
+                )
+                if (usage.metadata or {}).get('type') != 'conversation_tracking':
+                    Conversation.add_token_usage(
+                        usage.conversation_id,
+                        prompt_tokens=usage.prompt_tokens,
+                        completion_tokens=usage.completion_tokens,
+                        total_tokens=usage.total_tokens
+                    )
         except Exception as e:
             logger.error(f"Error storing token usage: {str(e)}")
 
+    def _conversation_lookup(self) -> Dict[str, Any]:
+        """
+        Filter for this conversation.
+        
+        conversation_id may be the database ID or the conversation's session UUID.
+        """
+        try:
+            return {'id': int(self.conversation_id)}
+        except (ValueError, TypeError):
+            pass
+        try:
+            return {'session_id': uuid.UUID(str(self.conversation_id))}
+        except (ValueError, TypeError):
+            return {'id': self.conversation_id}
+
     @database_sync_to_async
     def get_conversation_token_usage(self) -> Dict[str, int]:
-        """Get total token usage for the conversation."""
+        """Get total token usage for the conversation from its running totals."""
+        empty = {'total_tokens': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
         if not self.conversation_id:
-            return {'total_tokens': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+            return empty
 
         try:
-            # Handle different types of conversation_id inputs
-            # It could be either a numeric ID or a UUID session_id
-            query = None
-            
-            try:
-                # Check if it's a valid UUID (session_id)
-                uuid.UUID(str(self.conversation_id))
-                # If it's a UUID, filter by session_id
-                query = TokenUsage.objects.filter(conversation__session_id=self.conversation_id)
-            except (ValueError, TypeError):
-                # If it's not a valid UUID, assume it's a database ID
-                try:
-                    # Try to convert to int in case it's a string representation of a number
-                    conversation_id = int(self.conversation_id)
-                    query = TokenUsage.objects.filter(conversation_id=conversation_id)
-                except (ValueError, TypeError):
-                    # If conversion to int fails, try as a string ID
-                    query = TokenUsage.objects.filter(conversation_id=self.conversation_id)
-            
-            # Only count each message once to avoid double counting
-            if query:
-                # Exclude conversation-level tracking records to avoid double counting
-                query = query.exclude(metadata__contains={'type': 'conversation_tracking'})
-                
-                # CRITICAL: Get only the maximum token usage per each unique message_id
-                # This ensures we don't count the same message multiple times if it has multiple records
-                unique_message_tokens = query.values('message_id').annotate(
-                    max_total=models.Max('total_tokens'),
-                    max_prompt=models.Max('prompt_tokens'),
-                    max_completion=models.Max('completion_tokens')
-                )
-                
-                # Sum up the maximums for each unique message
-                total_tokens = sum(item['max_total'] or 0 for item in unique_message_tokens)
-                prompt_tokens = sum(item['max_prompt'] or 0 for item in unique_message_tokens)
-                completion_tokens = sum(item['max_completion'] or 0 for item in unique_message_tokens)
-                
-                # Log the number of records being counted to help debug
-                num_records = len(unique_message_tokens)
-                logger.debug(f"Counted token usage from {num_records} unique messages")
-                
-                return {
-                    'total_tokens': total_tokens,
-                    'prompt_tokens': prompt_tokens,
-                    'completion_tokens': completion_tokens
-                }
-            
-            return {'total_tokens': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
-            
+            totals = Conversation.objects.filter(**self._conversation_lookup()).values(
+                'total_tokens', 'prompt_tokens', 'completion_tokens'
+            ).first()
+            return totals or empty
         except Exception as e:
             logger.error(f"Error getting conversation token usage: {str(e)}", exc_info=True)
-            return {'total_tokens': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+            return empty
 
     async def track_conversation_tokens(self):
         """
-        Track token usage for the entire conversation.
+        Log the conversation's token totals.
         
-        IMPORTANT: This should be called sparingly, only when we need to record
-        the current state of conversation tokens, not after every message.
+        Totals are maintained as usage is stored, so this does not write
+        anything (storing the current usage again would double count it).
         """
         if not self.conversation_id:
             return
-            
-        # Log that we're tracking conversation-level tokens to help with debugging
-        logger.debug("Recording conversation-level token tracking")
 
-        # We will NOT store the "current usage" again as a conversation-level record
-        # as this leads to double counting. Instead, we'll ensure our existing token
-        # tracking is properly attributed to this conversation.
-        
-        # Verify existing records are properly linked to this conversation
-        # by counting how many we have
-        existing_count = await self._count_token_records()
-        logger.debug(f"Verified {existing_count} token usage records for conversation {self.conversation_id}")
-            
-    @database_sync_to_async
-    def _count_token_records(self):
-        """Count how many token records exist for this conversation."""
-        try:
-            # Handle different types of conversation_id inputs
-            try:
-                # Check if it's a valid UUID (session_id)
-                uuid.UUID(str(self.conversation_id))
-                count = TokenUsage.objects.filter(conversation__session_id=self.conversation_id).count()
-            except (ValueError, TypeError):
-                # If it's not a valid UUID, assume it's a database ID
-                try:
-                    conversation_id = int(self.conversation_id)
-                    count = TokenUsage.objects.filter(conversation_id=conversation_id).count()
-                except (ValueError, TypeError):
-                    count = TokenUsage.objects.filter(conversation_id=self.conversation_id).count()
-            return count
-        except Exception as e:
-            logger.error(f"Error counting token records: {e}")
-            return 0
+        totals = await self.get_conversation_token_usage()
+        logger.debug(f"Conversation {self.conversation_id} has used {totals['total_tokens']} tokens")
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using the initialized tokenizer."""
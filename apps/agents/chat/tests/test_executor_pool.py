@@ -0,0 +1,28 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from apps.agents.chat.managers.executor_pool import AgentSetupPool
+
+@pytest.mark.asyncio
+async def test_setup_reused_until_evicted():
+    pool = AgentSetupPool(max_size=2)
+    build = AsyncMock(side_effect=lambda: Mock())
+
+    first = await pool.get((1, 'model', 0, 0, 'a'), build)
+    assert await pool.get((1, 'model', 0, 0, 'a'), build) is first
+    await pool.get((2, 'model', 0, 0, 'a'), build)
+    await pool.get((3, 'model', 0, 0, 'a'), build)
+
+    # Agent 1 was least recently used and has been evicted
+    assert await pool.get((1, 'model', 0, 0, 'a'), build) is not first
+    assert build.await_count == 4
+
+@pytest.mark.asyncio
+async def test_new_version_replaces_stale_setups():
+    pool = AgentSetupPool()
+    build = AsyncMock(side_effect=lambda: Mock())
+
+    await pool.get((1, 'model', 0, 0, 'a'), build)
+    await pool.get((1, 'model', 0, 0, 'b'), build)
+    await pool.get((1, 'model', 1, 0, 'a'), build)
+
+    assert list(pool._setups) == [(1, 'model', 1, 0, 'a')]
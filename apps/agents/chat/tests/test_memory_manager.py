@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from apps.agents.chat.managers.memory_manager import MemoryManager
+
+def make_rows(*token_counts):
+    return [
+        {'id': i + 1, 'content': f"message {i + 1}", 'is_agent': i % 2 == 1, 'token_count': tokens}
+        for i, tokens in enumerate(token_counts)
+    ]
+
+@pytest.fixture
+def memory_manager():
+    return MemoryManager(conversation_id="1", token_manager=Mock(), window_tokens=100, rollover_ratio=0.5)
+
+def test_window_kept_while_under_budget(memory_manager):
+    rows = make_rows(20, 20, 20)
+    window, rolled_out = memory_manager._split_window(rows)
+    assert window == rows
+    assert rolled_out == []
+
+def test_rollover_trims_to_ratio(memory_manager):
+    rows = make_rows(30, 30, 30, 16, 16)
+    window, rolled_out = memory_manager._split_window(rows)
+    # Budget after rollover is 50 tokens including 4 tokens overhead per message
+    assert [row['id'] for row in window] == [4, 5]
+    assert [row['id'] for row in rolled_out] == [1, 2, 3]
+
+def test_latest_message_always_kept(memory_manager):
+    rows = make_rows(10, 500)
+    window, rolled_out = memory_manager._split_window(rows)
+    assert [row['id'] for row in window] == [2]
+    assert [row['id'] for row in rolled_out] == [1]
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_previous(memory_manager):
+    memory_manager.llm = Mock()
+    memory_manager.llm.ainvoke = AsyncMock(side_effect=RuntimeError("unavailable"))
+    summary = await memory_manager._roll_over("earlier summary", make_rows(10))
+    assert summary == "earlier summary"
+
+@pytest.mark.asyncio
+async def test_context_does_not_wait_for_summary(memory_manager):
+    memory_manager.llm = Mock()
+    memory_manager.llm.ainvoke = AsyncMock(return_value="new summary")
+    memory_manager._load_state = Mock(return_value=("earlier summary", make_rows(30, 30, 30, 16, 16)))
+    memory_manager._save_summary = Mock()
+
+    summary, window = await memory_manager.get_context()
+
+    assert summary == "earlier summary"
+    assert [message.content for message in window] == ["message 4", "message 5"]
+    memory_manager.llm.ainvoke.assert_not_called()
+
+    await memory_manager._roll_over_task
+    memory_manager._save_summary.assert_called_once_with("new summary", 3)
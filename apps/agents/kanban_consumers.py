@@ -327,6 +327,16 @@ class CrewKanbanConsumer(OrganizationAwareConsumer):
                 except:
                     pass
 
+    async def execution_batch(self, event):
+        """Unpack events coalesced by the execution message bus"""
+        for message in event.get('messages', []):
+            event_type = message.get('type')
+            handler = getattr(self, event_type, None) if event_type in ('execution_update', 'human_input_request') else None
+            if handler:
+                await handler(message)
+            else:
+                logger.warning(f"No handler for batched event type: {event_type}")
+
     async def human_input_request(self, event):
         """Send human input requests to WebSocket"""
         logger.debug(f"Consumer received human_input_request event: {event}")
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-16 11:03
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_token_totals(apps, schema_editor):
+    Conversation = apps.get_model('agents', 'Conversation')
+    TokenUsage = apps.get_model('agents', 'TokenUsage')
+    totals = (
+        TokenUsage.objects.exclude(metadata__contains={'type': 'conversation_tracking'})
+        .values('conversation_id')
+        .annotate(prompt=Sum('prompt_tokens'), completion=Sum('completion_tokens'), total=Sum('total_tokens'))
+    )
+    for row in totals.iterator():
+        Conversation.objects.filter(id=row['conversation_id']).update(
+            prompt_tokens=row['prompt'] or 0,
+            completion_tokens=row['completion'] or 0,
+            total_tokens=row['total'] or 0
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0057_chatmessage_token_count_conversationsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='completion_tokens',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='prompt_tokens',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='total_tokens',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_token_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0058_conversation_token_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='executionstage',
+            name='stage_type',
+            field=models.CharField(choices=[('task_start', 'Task Start'), ('thinking', 'Thinking'), ('tool_usage', 'Tool Usage'), ('tool_results', 'Tool Results'), ('human_input', 'Human Input'), ('completion', 'Completion'), ('task_checkpoint', 'Task Checkpoint')], max_length=20),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from apps.common.utils import get_models
@@ -404,7 +404,9 @@ class ExecutionStage(models.Model):
         ('tool_usage', 'Tool Usage'),
         ('tool_results', 'Tool Results'),
         ('human_input', 'Human Input'),
-        ('completion', 'Completion')
+        ('completion', 'Completion'),
+        # Saved task output for resuming an execution; not shown on the board
+        ('task_checkpoint', 'Task Checkpoint')
     ]
     
     STATUS_CHOICES = [
@@ -457,6 +459,10 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Running token totals, kept in step with TokenUsage rows by add_token_usage()
+    prompt_tokens = models.BigIntegerField(default=0)
+    completion_tokens = models.BigIntegerField(default=0)
+    total_tokens = models.BigIntegerField(default=0)
 
     class Meta:
         ordering = ['-updated_at']
@@ -464,6 +470,45 @@ class Conversation(models.Model):
     def __str__(self):
         return f"{self.title} ({self.session_id})"
 
+    @classmethod
+    def add_token_usage(cls, conversation_id, prompt_tokens=0, completion_tokens=0, total_tokens=0):
+        """Atomically add usage to a conversation's running totals."""
+        return cls.objects.filter(id=conversation_id).update(
+            prompt_tokens=models.F('prompt_tokens') + (prompt_tokens or 0),
+            completion_tokens=models.F('completion_tokens') + (completion_tokens or 0),
+            total_tokens=models.F('total_tokens') + (total_tokens or 0)
+        )
+
+    def reconcile_token_totals(self):
+        """Recompute the running totals from TokenUsage rows; returns True if they had drifted."""
+        with transaction.atomic():
+            # Lock the row first so usage stored concurrently is either in the
+            # sum below or added on top of it once the lock is released
+            current = Conversation.objects.select_for_update().filter(id=self.id).values(
+                'prompt_tokens', 'completion_tokens', 'total_tokens'
+            ).first()
+            if current is None:
+                return False
+            totals = self.token_usage.exclude(
+                metadata__contains={'type': 'conversation_tracking'}
+            ).aggregate(
+                prompt=models.Sum('prompt_tokens'),
+                completion=models.Sum('completion_tokens'),
+                total=models.Sum('total_tokens')
+            )
+            expected = {
+                'prompt_tokens': totals['prompt'] or 0,
+                'completion_tokens': totals['completion'] or 0,
+                'total_tokens': totals['total'] or 0
+            }
+            if expected == current:
+                return False
+            # update() rather than save() so updated_at (and the conversation list order) is untouched
+            Conversation.objects.filter(id=self.id).update(**expected)
+        for field, value in expected.items():
+            setattr(self, field, value)
+        return True
+
     async def get_recent_messages(self, limit=10):
         """Get recent messages for this conversation"""
         return await self.chatmessage_set.filter(
@@ -538,6 +583,7 @@ class ChatMessage(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     model = models.CharField(max_length=255, default='unknown')
     task_id = models.IntegerField(null=True, blank=True)
+    token_count = models.IntegerField(null=True, blank=True)  # Cached content token count
     
     @property
     def formatted_message(self):
@@ -576,6 +622,17 @@ class ChatMessage(models.Model):
     def __str__(self):
         return f"{self.timestamp}: {'Agent' if self.is_agent else 'User'} - {self.content[:50]}..."
 
+class ConversationSummary(models.Model):
+    """Rolling summary of the messages that have left a conversation's memory window."""
+    conversation = models.OneToOneField(Conversation, on_delete=models.CASCADE, related_name='memory_summary')
+    content = models.TextField(blank=True)
+    last_message = models.ForeignKey(ChatMessage, on_delete=models.CASCADE, related_name='+')
+    token_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary of {self.conversation_id} through message {self.last_message_id}"
+
 class TokenUsage(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='token_usage')
     message = models.ForeignKey('ChatMessage', on_delete=models.SET_NULL, null=True, blank=True)
@@ -0,0 +1,31 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.agents.models import Agent, AgentToolSettings, Tool
+from apps.agents.chat.managers.executor_pool import invalidate_agent, invalidate_tools
+
+@receiver([post_save, post_delete], sender=Agent)
+def invalidate_agent_setup(sender, instance, **kwargs):
+    invalidate_agent(instance.pk)
+
+@receiver([post_save, post_delete], sender=AgentToolSettings)
+def invalidate_agent_tool_settings(sender, instance, **kwargs):
+    invalidate_agent(instance.agent_id)
+
+@receiver(m2m_changed, sender=Agent.tools.through)
+def invalidate_agent_tools(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # instance is a Tool; pk_set holds the agents (None on clear)
+        if pk_set is None:
+            invalidate_tools()
+        else:
+            for agent_id in pk_set:
+                invalidate_agent(agent_id)
+    else:
+        invalidate_agent(instance.pk)
+
+@receiver([post_save, post_delete], sender=Tool)
+def invalidate_tool_setups(sender, instance, **kwargs):
+    invalidate_tools()
@@ -255,10 +255,11 @@ function updateKanbanBoard(data) {
 function handleHumanInputSubmit(button) {
     const stageItem = button.closest('.stage-item');
     const executionId = stageItem.getAttribute('data-execution-id');
-    console.log("Submitting human input for execution:", executionId);
+    const taskIndex = stageItem.getAttribute('data-task-index');
+    console.log("Submitting human input for execution:", executionId, "task:", taskIndex);
     
-    if (!executionId) {
-        console.error("No execution ID found for human input submission");
+    if (!executionId || taskIndex === null) {
+        console.error("No execution ID or task index found for human input submission");
         alert('Error: Could not determine execution ID');
         return;
     }
@@ -284,7 +285,8 @@ function handleHumanInputSubmit(button) {
             'X-CSRFToken': getCookie('csrftoken')
         },
         body: JSON.stringify({
-            input: input
+            input: input,
+            task_index: parseInt(taskIndex, 10)
         })
     })
     .then(response => {
@@ -555,6 +557,9 @@ function addUpdateToBoard(taskBoard, data) {
         card.id = stageId;
         card.className = 'kanban-item stage-item';
         card.setAttribute('data-execution-id', data.execution_id);
+        if (data.task_index !== undefined && data.task_index !== null) {
+            card.setAttribute('data-task-index', data.task_index);
+        }
         card.setAttribute('data-stage-id', stageId);
         card.innerHTML = cardHtml;
         console.log('Adding click listener to expand button')
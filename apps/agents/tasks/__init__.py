@@ -1,5 +1,6 @@
 from celery import shared_task
 from .core.crew import execute_crew
 from .tools import run_tool
+from .token_totals import reconcile_conversation_token_totals
 
-__all__ = ['execute_crew', 'run_tool']
\ No newline at end of file
+__all__ = ['execute_crew', 'run_tool', 'reconcile_conversation_token_totals']
\ No newline at end of file
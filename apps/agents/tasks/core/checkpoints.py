@@ -0,0 +1,72 @@
+import logging
+from typing import Dict
+
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from apps.agents.models import ExecutionStage
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_STAGE = 'task_checkpoint'
+
+def _agent_token_usage(agent) -> Dict:
+    """Cumulative token usage of a CrewAI agent, if the installed version tracks it."""
+    try:
+        summary = agent._token_process.get_summary()
+        return summary.model_dump() if hasattr(summary, 'model_dump') else dict(summary)
+    except Exception:
+        return {}
+
+def save_task_checkpoint(execution, task_index, task_output, context=None, agent=None, crewai_task_id=None):
+    """Persist a completed task's output so a resumed run can skip it."""
+    try:
+        ExecutionStage.objects.create(
+            execution=execution,
+            stage_type=CHECKPOINT_STAGE,
+            title=f'Task {task_index} checkpoint',
+            content=task_output.raw or '',
+            status='completed',
+            crewai_task_id=crewai_task_id,
+            metadata={
+                'task_index': task_index,
+                'description': task_output.description,
+                'name': task_output.name,
+                'expected_output': task_output.expected_output,
+                'summary': task_output.summary,
+                'agent': task_output.agent,
+                'json_dict': task_output.json_dict,
+                'output_format': getattr(task_output.output_format, 'value', task_output.output_format),
+                'context': context if isinstance(context, (str, dict, list)) else str(context or ''),
+                'token_usage': _agent_token_usage(agent) if agent is not None else {}
+            }
+        )
+    except Exception as e:
+        # A missing checkpoint only costs a re-run of this task on resume
+        logger.error(f"Error saving checkpoint for task {task_index}: {str(e)}")
+
+def load_task_checkpoints(execution) -> Dict[int, TaskOutput]:
+    """Completed task outputs by task index (the latest checkpoint wins)."""
+    checkpoints = {}
+    stages = ExecutionStage.objects.filter(
+        execution=execution, stage_type=CHECKPOINT_STAGE
+    ).order_by('created_at', 'id')
+    for stage in stages:
+        metadata = stage.metadata or {}
+        try:
+            checkpoints[metadata['task_index']] = TaskOutput(
+                description=metadata.get('description') or '',
+                name=metadata.get('name'),
+                expected_output=metadata.get('expected_output'),
+                summary=metadata.get('summary'),
+                raw=stage.content,
+                json_dict=metadata.get('json_dict'),
+                agent=metadata.get('agent') or '',
+                output_format=OutputFormat(metadata.get('output_format') or OutputFormat.RAW.value)
+            )
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {stage.id}: {str(e)}")
+    return checkpoints
+
+def clear_task_checkpoints(execution):
+    """Forget checkpoints from earlier runs before starting from scratch."""
+    ExecutionStage.objects.filter(execution=execution, stage_type=CHECKPOINT_STAGE).delete()
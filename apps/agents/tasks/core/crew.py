@@ -7,6 +7,7 @@ from functools import partial
 from celery import shared_task
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connections
 from crewai import Crew
 from crewai.agents.agent_builder.base_agent_executor_mixin import CrewAgentExecutorMixin
 from apps.agents.models import CrewExecution, ExecutionStage, CrewOutput, Task
@@ -14,7 +15,9 @@ from ..utils.logging import log_crew_message, update_execution_status
 from .agents import create_crewai_agents
 from .tasks import create_crewai_tasks
 from ..callbacks.execution import StepCallback, TaskCallback
-from ..handlers.input import human_input_handler
+from ..handlers.input import current_task_index, human_input_handler, take_received_human_input, wait_for_human_input
+from .checkpoints import save_task_checkpoint, load_task_checkpoints, clear_task_checkpoints
+from .scheduler import run_crew_tasks
 from apps.common.utils import get_llm
 import time
 from django.core.files.storage import default_storage
@@ -312,8 +315,13 @@ def get_client_data(client):
 # First, analyze traffic trends from Google Analytics. Then, examine keyword performance
 # from Search Console. Finally, provide actionable recommendations based on your findings.
 # ```
-def run_crew(task_id, crew, execution):
-    """Run the crew and handle the execution"""
+def run_crew(task_id, crew, execution, resume=False):
+    """
+    Run the crew and handle the execution.
+    
+    Each completed task is checkpointed. With resume=True, tasks that have a
+    checkpoint are restored instead of being run again.
+    """
     try:
         # Update to running status
         update_execution_status(execution, 'RUNNING')
@@ -348,31 +356,36 @@ def run_crew(task_id, crew, execution):
         
         # Create callback instances
         step_callback = StepCallback(execution.id)
-        task_callback = TaskCallback(execution.id)
+        
+        # Outputs of tasks completed by an earlier, interrupted run
+        checkpoints = load_task_checkpoints(execution) if resume else {}
+        if checkpoints:
+            logger.info(f"Resuming execution {execution.id}: restoring tasks {sorted(checkpoints)} from checkpoints")
         
         # Monkey patch the crew's _execute_tasks method to track current task
         original_execute_tasks = crew._execute_tasks
         
-        def execute_tasks_with_tracking(*args, **kwargs):
-            task_outputs = []
-            futures = []
-            last_sync_output = None
-            
-            for task_index, task in enumerate(crew.tasks):
-                #logger.debug(f"Starting task {task_index}")
-                
+        # Patch the _ask_human_input method on the mixin class
+        CrewAgentExecutorMixin._ask_human_input = staticmethod(partial(human_input_handler, execution_id=execution.id))
+        
+        def run_task(task_index, task, context):
+            """Execute one task on its agent and checkpoint the output."""
+            # Lets human_input_handler know which task is asking
+            task_token = current_task_index.set(task_index)
+            try:
                 # Get the agent and continue with original logic
                 agent_to_use = crew._get_agent_to_use(task)
                 if not agent_to_use:
                     raise ValueError(f"No agent available for task: {task.description}")
                 
-                # Set current task index in callbacks BEFORE execution
-                step_callback.current_task_index = task_index
-                task_callback.current_task_index = task_index
-                step_callback.current_agent_role = agent_to_use.role
-                task_callback.current_agent_role = agent_to_use.role
-                
-                # Update execution status with current task index
+                # Callbacks are per task so concurrent tasks report their own index
+                task_step_callback = StepCallback(execution.id)
+                task_step_callback.current_task_index = task_index
+                task_step_callback.current_agent_role = agent_to_use.role
+                task_task_callback = TaskCallback(execution.id)
+                task_task_callback.current_task_index = task_index
+                task_task_callback.current_agent_role = agent_to_use.role
+                task.callback = task_task_callback
                 
                 # Create or update agent executor with callbacks and human input handler
                 if not agent_to_use.agent_executor:
@@ -381,81 +394,75 @@ def run_crew(task_id, crew, execution):
                     agent_to_use.create_agent_executor(tools=task.tools)
                     logger.debug(f"Agent executor created. Executor LLM: {agent_to_use.agent_executor.llm}")
                     
-                agent_to_use.agent_executor.callbacks = [step_callback]
-                # Patch the _ask_human_input method on the mixin class
-                from crewai.agents.agent_builder.base_agent_executor_mixin import CrewAgentExecutorMixin
-                CrewAgentExecutorMixin._ask_human_input = staticmethod(partial(human_input_handler, execution_id=execution.id))
-                
-                #logger.debug(f"Set task index to {task_index} before executing task with description: {task.description}")
+                # CrewAI rebuilds the executor from the agent, so set the agent's callback too
+                agent_to_use.step_callback = task_step_callback
+                agent_to_use.agent_executor.step_callback = task_step_callback
+                agent_to_use.agent_executor.callbacks = [task_step_callback]
                 
-                # Execute task
-                try:
-                    if task.async_execution:
-                        context = crew._get_context(task, [last_sync_output] if last_sync_output else [])
-                        future = task.execute_async(agent=agent_to_use, context=context)
-                        futures.append((task, future, task_index))
+                # If this is a human input task, add the input to context
+                if task.human_input:
+                    # First execution to get the prompt
+                    initial_output = task.execute_sync(agent=agent_to_use, context=context)
+                    #logger.debug(f"Initial execution complete, waiting for human input")
+                    
+                    # Reuse what the human input handler received; otherwise block on
+                    # the input channel (no polling) until the human responds
+                    human_response = take_received_human_input(execution.id, task_index)
+                    if human_response is None:
+                        human_response = wait_for_human_input(execution.id, task_index)
+                    if human_response is None:
+                        logger.warning(f"No human input received for task {task_index} within timeout period")
+                        human_response = "APPROVED."
+                    
+                    logger.debug(f"Received human input: {human_response}")
+                    # Make sure context is a dictionary
+                    if isinstance(context, str):
+                        new_context = {'input': context}
+                    elif context is None:
+                        new_context = {}
                     else:
-                        if futures:
-                            task_outputs = crew._process_async_tasks(futures)
-                            futures.clear()
+                        new_context = context.copy()
                         
-                        context = crew._get_context(task, task_outputs)
-                        #logger.debug(f"Executing task {task_index} with agent {agent_to_use.role}")
-                        
-                        # If this is a human input task, add the input to context
-                        if task.human_input:
-                            input_key = f"execution_{execution.id}_task_{task_index}_input"
-                            
-                            # First execution to get the prompt
-                            initial_output = task.execute_sync(agent=agent_to_use, context=context)
-                            #logger.debug(f"Initial execution complete, waiting for human input")
-                            
-                            # Wait for human input
-                            human_response = cache.get(input_key)
-                            while not human_response:
-                                time.sleep(1)
-                                human_response = cache.get(input_key)
-                            
-                            logger.debug(f"Received human input: {human_response}")
-                            
-                            # Make sure context is a dictionary
-                            if isinstance(context, str):
-                                new_context = {'input': context}
-                            elif context is None:
-                                new_context = {}
-                            else:
-                                new_context = context.copy()
-                                
-                            # Add input to context and execute again
-                            new_context['human_input'] = human_response
-                            new_context['input'] = human_response
-                            #logger.debug(f"Context for second execution: {new_context}")
-                            
-                            task_output = task.execute_sync(agent=agent_to_use, context=new_context)
-                            logger.debug(f"Second execution complete with input")
-                        else:
-                            # Non-human input task
-                            task_output = task.execute_sync(agent=agent_to_use, context=context)
-                        #logger.debug(f"Task execution complete. Output: {task_output}")
-                        task_outputs = [task_output]
-                        last_sync_output = task_output
-                        
-                        #logger.debug(f"Completed task {task_index}")
-                except Exception as e:
-                    logger.error(f"Error executing task {task_index}: {str(e)}")
-                    raise
-            
-            if futures:
-                task_outputs = crew._process_async_tasks(futures)
+                    # Add input to context and execute again
+                    new_context['human_input'] = human_response
+                    new_context['input'] = human_response
+                    #logger.debug(f"Context for second execution: {new_context}")
+                    
+                    task_output = task.execute_sync(agent=agent_to_use, context=new_context)
+                    logger.debug(f"Second execution complete with input")
+                else:
+                    # Non-human input task
+                    task_output = task.execute_sync(agent=agent_to_use, context=context)
+                
+                save_task_checkpoint(execution, task_index, task_output, context=context, agent=agent_to_use)
+                return task_output
+            except Exception as e:
+                logger.error(f"Error executing task {task_index}: {str(e)}")
+                raise
+            finally:
+                current_task_index.reset(task_token)
+                # Worker threads hold their own database connections
+                connections.close_all()
+        
+        def execute_tasks_with_tracking(*args, **kwargs):
+            """
+            Run the crew's tasks as a dependency graph.
             
+            Tasks whose dependencies are done run concurrently (at most one
+            task per agent at a time); see build_task_graph for how the
+            dependencies are derived.
+            """
+            max_workers = getattr(settings, 'CREW_MAX_PARALLEL_TASKS', 4)
+            # Tasks completed before the run was interrupted are restored from checkpoints
+            task_outputs = run_crew_tasks(crew, run_task, restored=checkpoints, max_workers=max_workers)
             return crew._create_crew_output(task_outputs)
             
         # Replace the original _execute_tasks method
         crew._execute_tasks = execute_tasks_with_tracking
         
-        # Set callbacks on crew
+        # Set callbacks on crew; task callbacks are set per task by run_task
         crew.step_callback = step_callback
-        crew.task_callback = task_callback
+        crew.task_callback = None
         
         for agent in crew.agents:
             if not hasattr(agent, 'backstory') or agent.backstory is None:
@@ -541,7 +548,7 @@ def run_crew(task_id, crew, execution):
         
         # Update execution with output
         execution.crew_output = crew_output
-        execution.save()
+        execution.save(update_fields=['crew_output', 'updated_at'])
         logger.debug(f"Crew output: {result}")
         return result
         
@@ -563,7 +570,7 @@ def handle_execution_error(execution, exception, task_id=None):
     error_message = f"Crew execution failed: {str(exception)}"
     log_crew_message(execution, error_message, agent=None)
     execution.error_message = error_message
-    execution.save()
+    execution.save(update_fields=['error_message', 'updated_at'])
 
     # Print the full traceback to stdout
     print("Full traceback:")
@@ -629,8 +636,13 @@ def save_result_to_file(execution, result):
         raise
 
 @shared_task(bind=True)
-def execute_crew(self, execution_id, organization_id=None):
-    """Execute a crew with the given execution ID"""
+def execute_crew(self, execution_id, organization_id=None, resume=False):
+    """
+    Execute a crew with the given execution ID.
+    
+    Pass resume=True to continue an interrupted execution; tasks completed
+    by the earlier run are restored from their checkpoints.
+    """
     try:
         # Set organization context if provided
         from apps.organizations.utils import OrganizationContext
@@ -655,14 +667,17 @@ def execute_crew(self, execution_id, organization_id=None):
             
             # Save the Celery task ID
             execution.task_id = self.request.id
-            execution.save()
+            execution.save(update_fields=['task_id', 'updated_at'])
+            
+            if not resume:
+                clear_task_checkpoints(execution)
             
             # Create initial stage
             ExecutionStage.objects.create(
                 execution=execution,
                 stage_type='task_start',
-                title='Starting Execution',
-                content=f'Starting execution for crew: {execution.crew.name}',
+                title='Resuming Execution' if resume else 'Starting Execution',
+                content=f"{'Resuming' if resume else 'Starting'} execution for crew: {execution.crew.name}",
                 status='completed'
             )
             
@@ -677,7 +692,7 @@ def execute_crew(self, execution_id, organization_id=None):
                 raise ValueError("Failed to initialize crew")
             
             # Run crew
-            result = run_crew(self.request.id, crew, execution)
+            result = run_crew(self.request.id, crew, execution, resume=resume)
             
             # Save the result and update execution status to COMPLETED
             if result:
@@ -0,0 +1,143 @@
+import contextvars
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+def build_task_graph(tasks) -> Tuple[Dict[int, Set[int]], Dict[int, Optional[List[int]]]]:
+    """
+    Work out which tasks each task has to wait for.
+
+    A task that declares ``context`` depends only on those tasks and gets its
+    context from them. Other tasks keep the sequential process semantics: a
+    sync task waits for everything before it (back to the previous such task)
+    and reads the async outputs since the last sync task, or else the last
+    sync output; an async task reads the last sync output.
+
+    Returns the dependencies and, for tasks without declared context, the
+    indexes whose outputs make up their context (None when declared).
+    """
+    index_of = {id(task): index for index, task in enumerate(tasks)}
+    deps: Dict[int, Set[int]] = {}
+    context_sources: Dict[int, Optional[List[int]]] = {}
+    barrier = None  # Last sync task without declared context; later tasks wait for it
+    since_barrier: List[int] = []
+    last_sync = None  # Last sync task of any kind, whose output is the running context
+    async_since_sync: List[int] = []
+
+    for index, task in enumerate(tasks):
+        is_async = getattr(task, 'async_execution', False)
+        declared = getattr(task, 'context', None)
+        if isinstance(declared, list) and declared:
+            deps[index] = {index_of[id(t)] for t in declared if id(t) in index_of and index_of[id(t)] != index}
+            context_sources[index] = None
+            since_barrier.append(index)
+        elif is_async:
+            deps[index] = {i for i in (barrier, last_sync) if i is not None}
+            context_sources[index] = [last_sync] if last_sync is not None else []
+            since_barrier.append(index)
+            async_since_sync.append(index)
+            continue
+        else:
+            deps[index] = ({barrier} if barrier is not None else set()) | set(since_barrier)
+            context_sources[index] = async_since_sync or ([last_sync] if last_sync is not None else [])
+            barrier = index
+            since_barrier = []
+
+        if not is_async:
+            last_sync = index
+            async_since_sync = []
+
+    return deps, context_sources
+
+def run_task_graph(
+    deps: Dict[int, Set[int]],
+    run: Callable[[int, Dict[int, Any]], Any],
+    max_workers: int = 4,
+    done: Optional[Dict[int, Any]] = None,
+    exclusive_key: Optional[Callable[[int], Optional[Hashable]]] = None
+) -> Dict[int, Any]:
+    """
+    Run every task once its dependencies are done, up to max_workers at a time.
+
+    ``run(index, done)`` gets a snapshot of the results finished so far, which
+    holds every dependency of the task. Tasks in ``done`` are treated as
+    already finished. Two tasks with the same
+    ``exclusive_key`` (e.g. the same agent) never run at the same time. Ready
+    tasks start in index order. The first failure stops new tasks from
+    starting and is raised once running tasks have finished.
+    """
+    done = dict(done or {})
+    remaining = {index: set(task_deps) for index, task_deps in deps.items() if index not in done}
+    running = {}
+    busy: Set[Hashable] = set()
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='crew-task')
+
+    try:
+        while remaining or running:
+            for index in sorted(remaining):
+                if len(running) >= max_workers:
+                    break
+                if remaining[index] - done.keys():
+                    continue
+                key = exclusive_key(index) if exclusive_key else None
+                if key is not None and key in busy:
+                    continue
+                del remaining[index]
+                if key is not None:
+                    busy.add(key)
+                # Copy context variables (e.g. the organization) into the worker thread
+                future = pool.submit(contextvars.copy_context().run, run, index, dict(done))
+                running[future] = (index, key)
+
+            if not running:
+                raise ValueError(f"Tasks {sorted(remaining)} have unmet or circular dependencies")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, key = running.pop(future)
+                busy.discard(key)
+                done[index] = future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return done
+
+def run_crew_tasks(
+    crew,
+    run_task: Callable[[int, Any, Any], Any],
+    restored: Optional[Dict[int, Any]] = None,
+    max_workers: int = 4
+) -> List[Any]:
+    """
+    Run a crew's tasks as a dependency graph and return the final outputs.
+
+    ``run_task(index, task, context)`` executes one task. Outputs in
+    ``restored`` (e.g. from checkpoints) count as done. The returned outputs
+    are those of the tasks nothing else depended on, in task order.
+    """
+    tasks = crew.tasks
+    deps, context_sources = build_task_graph(tasks)
+
+    done = {}
+    for task_index, output in (restored or {}).items():
+        if task_index < len(tasks):
+            tasks[task_index].output = output
+            done[task_index] = output
+
+    def run(task_index, finished):
+        task = tasks[task_index]
+        sources = context_sources[task_index]
+        # Declared context is read from the context tasks' outputs by CrewAI
+        context = crew._get_context(task, [finished[i] for i in sources] if sources is not None else [])
+        return run_task(task_index, task, context)
+
+    def agent_key(task_index):
+        agent = crew._get_agent_to_use(tasks[task_index])
+        return id(agent) if agent else None
+
+    done = run_task_graph(deps, run, max_workers=max_workers, done=done, exclusive_key=agent_key)
+
+    depended_on = set().union(*deps.values()) if deps else set()
+    return [done[i] for i in sorted(done) if i not in depended_on]
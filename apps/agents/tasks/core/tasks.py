@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 
 def create_crewai_tasks(task_models, agents, execution):
     tasks = []
+    tasks_by_model_id = {}
+    task_models = list(task_models)
     for task_model in task_models:
         try:
             # Get and log the agent model details
@@ -88,10 +90,25 @@ Available roles: {[agent.role for agent in agents]}
                     'process_human_input': True
                 })
 
-            tasks.append(CrewAITask(**task_dict))
+            crewai_task = CrewAITask(**task_dict)
+            tasks.append(crewai_task)
+            tasks_by_model_id[task_model.id] = crewai_task
             logger.debug(f"CrewAITask created successfully for task: {task_model.id}")
         except Exception as e:
             logger.error(f"Error creating CrewAITask for task {task_model.id}: {str(e)}", exc_info=True)
+
+    # Wire declared context so independent tasks can run concurrently
+    for task_model in task_models:
+        crewai_task = tasks_by_model_id.get(task_model.id)
+        if crewai_task is None:
+            continue
+        context_tasks = [
+            tasks_by_model_id[context_model.id]
+            for context_model in task_model.context.all()
+            if context_model.id in tasks_by_model_id
+        ]
+        if context_tasks:
+            crewai_task.context = context_tasks
     return tasks 
 
 def create_writing_task():
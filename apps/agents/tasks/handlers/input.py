@@ -1,27 +1,110 @@
+import contextvars
 import logging
+import threading
 import time
+from typing import Dict, Optional, Tuple
 from django.core.cache import cache
 from apps.agents.models import CrewExecution
 from ..messaging.execution_bus import ExecutionMessageBus
 
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
 logger = logging.getLogger(__name__)
 
+HUMAN_INPUT_TIMEOUT = 3600  # 1 hour
+BLOCK_INTERVAL = 30  # Longest single BLPOP, so a dead connection is noticed
+
+# Index of the crew task running in the current thread, read by human_input_handler
+current_task_index: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('current_task_index', default=None)
+
+# Input taken off the list by human_input_handler, kept for run_crew to reuse
+_received_input: Dict[Tuple[int, int], str] = {}
+_received_lock = threading.Lock()
+
+def human_input_key(execution_id, task_index) -> str:
+    """Redis list that carries human input for one task of an execution."""
+    return f"execution_{execution_id}_task_{task_index}_input"
+
+def _redis():
+    if get_redis_connection is None:
+        return None
+    try:
+        return get_redis_connection("default")
+    except Exception as e:
+        logger.warning(f"Redis unavailable for human input, using cache polling: {str(e)}")
+        return None
+
+def submit_human_input(execution_id, task_index, value: str):
+    """Deliver human input to the execution waiting on it."""
+    key = human_input_key(execution_id, task_index)
+    client = _redis()
+    if client is not None:
+        pipe = client.pipeline()
+        pipe.rpush(key, value)
+        pipe.expire(key, HUMAN_INPUT_TIMEOUT)
+        pipe.execute()
+    else:
+        cache.set(key, value, timeout=HUMAN_INPUT_TIMEOUT)
+    logger.debug(f"Submitted human input on {key}")
+
+def clear_human_input(execution_id, task_index):
+    """Drop stale input left over from an earlier request."""
+    key = human_input_key(execution_id, task_index)
+    client = _redis()
+    if client is not None:
+        client.delete(key)
+    else:
+        cache.delete(key)
+
+def wait_for_human_input(execution_id, task_index, timeout: int = HUMAN_INPUT_TIMEOUT) -> Optional[str]:
+    """
+    Block until human input arrives or ``timeout`` seconds pass.
+
+    With Redis this is a blocking pop on the input list, so nothing is polled
+    while waiting. Without Redis it falls back to checking the cache every second.
+    """
+    key = human_input_key(execution_id, task_index)
+    deadline = time.monotonic() + timeout
+    client = _redis()
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        if client is not None:
+            item = client.blpop([key], timeout=max(1, int(min(remaining, BLOCK_INTERVAL))))
+            if item:
+                value = item[1]
+                return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+        else:
+            value = cache.get(key)
+            if value:
+                cache.delete(key)
+                return str(value)
+            time.sleep(1)
+
+def take_received_human_input(execution_id, task_index) -> Optional[str]:
+    """Input human_input_handler already received for a task, if any (consumed on read)."""
+    with _received_lock:
+        return _received_input.pop((execution_id, task_index), None)
+
 def human_input_handler(prompt, execution_id):
     """Handle human input requests via websocket."""
     logger.debug(f"human_input_handler called with prompt: {prompt}, execution_id: {execution_id}")
     execution = CrewExecution.objects.get(id=execution_id)
     message_bus = ExecutionMessageBus(execution_id)
-    
-    # Get current task index from execution state
-    current_task = getattr(human_input_handler, 'current_task_index', 0)
-    
-    # Use consistent cache key format
-    input_key = f"execution_{execution_id}_task_{current_task}_input"
-    logger.debug(f"Using cache key: {input_key}")
-    
-    # Clear any existing value for this key
-    cache.delete(input_key)
-    
+
+    # Get current task index from the running task, else from execution state
+    current_task = current_task_index.get()
+    if current_task is None:
+        current_task = getattr(human_input_handler, 'current_task_index', 0)
+
+    # Clear any existing value for this task
+    clear_human_input(execution_id, current_task)
+
     # Send the human input request
     message_bus.publish('human_input_request', {
         'human_input_request': prompt,
@@ -31,25 +114,15 @@ def human_input_handler(prompt, execution_id):
             'task_index': current_task
         }
     })
-    
-    # Wait for input
-    max_wait_time = 3600  # 1 hour
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait_time:
-        response = cache.get(input_key)
-        
-        if response:
-            logger.debug(f"Received human input: {response}")
-            # Send status update
-            # message_bus.publish('execution_update', {
-            #     'status': 'RUNNING',
-            #     'message': f"Received human input: {response}",
-            #     'task_index': current_task
-            # })
-            return str(response)
-            
-        time.sleep(1)
-    
-    logger.warning("No human input received within timeout period")
-    return "APPROVED."
\ No newline at end of file
+
+    response = wait_for_human_input(execution_id, current_task)
+    if response:
+        logger.debug(f"Received human input: {response}")
+    else:
+        logger.warning("No human input received within timeout period")
+        response = "APPROVED."
+
+    # The input was popped off the list; keep it for the task's second execution
+    with _received_lock:
+        _received_input[(execution_id, current_task)] = response
+    return response
@@ -1,28 +1,139 @@
+import atexit
 import logging
-from datetime import datetime
+import threading
+from typing import Dict, List, Optional
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
 from apps.agents.models import CrewExecution, ChatMessage
 
 logger = logging.getLogger(__name__)
 channel_layer = get_channel_layer()
 
+BATCH_WINDOW = getattr(settings, 'EXECUTION_BUS_BATCH_WINDOW', 0.1)  # Seconds to coalesce events over
+MAX_BATCH_SIZE = 50
+MAX_PUBLISHERS = 256
+TERMINAL_STATUSES = {'COMPLETED', 'FAILED', 'CANCELLED'}
+
+class ExecutionPublisher:
+    """
+    Per-execution event buffer shared by every ExecutionMessageBus in a process.
+
+    The websocket groups are looked up once. Events are buffered for
+    ``BATCH_WINDOW`` seconds and each group gets the whole buffer as a single
+    ``execution_batch`` message. Human input requests and terminal statuses
+    are sent straight away.
+    """
+
+    def __init__(self, execution_id):
+        self.execution_id = execution_id
+        row = CrewExecution.objects.filter(id=execution_id).values(
+            'crew_id', 'conversation_id', 'conversation__session_id'
+        ).first()
+        if row is None:
+            raise CrewExecution.DoesNotExist(f"CrewExecution {execution_id} does not exist")
+
+        self.conversation_id = row['conversation_id']
+        self.groups = []
+        if row['crew_id']:
+            self.groups.append(f"crew_{row['crew_id']}_kanban")
+        if row['conversation_id']:
+            self.groups.append(f"chat_{row['conversation__session_id']}")
+
+        self._pending: List[Dict] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, message: Dict, immediate: bool = False):
+        with self._lock:
+            self._pending.append(message)
+            if immediate or len(self._pending) >= MAX_BATCH_SIZE:
+                flush_now = True
+            else:
+                flush_now = False
+                if self._timer is None:
+                    self._timer = threading.Timer(BATCH_WINDOW, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        """Send buffered events, one channel layer message per group."""
+        with self._lock:
+            messages, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not messages or not self.groups:
+            return
+
+        if len(messages) == 1:
+            payload = messages[0]
+        else:
+            payload = {
+                'type': 'execution_batch',
+                'execution_id': self.execution_id,
+                'messages': messages
+            }
+        try:
+            async_to_sync(self._send)(payload)
+        except Exception as e:
+            logger.error(f"Failed to send {len(messages)} events for execution {self.execution_id}: {str(e)}")
+
+    async def _send(self, payload):
+        for group in self.groups:
+            try:
+                await channel_layer.group_send(group, payload)
+            except Exception as e:
+                logger.error(f"Failed to send to group {group}: {str(e)}")
+
+_publishers: Dict[int, ExecutionPublisher] = {}
+_publishers_lock = threading.Lock()
+
+def get_publisher(execution_id) -> ExecutionPublisher:
+    with _publishers_lock:
+        publisher = _publishers.get(execution_id)
+    if publisher is None:
+        publisher = ExecutionPublisher(execution_id)
+        with _publishers_lock:
+            publisher = _publishers.setdefault(execution_id, publisher)
+            # Executions that never reported a terminal status are dropped oldest first
+            evicted = [_publishers.pop(key) for key in list(_publishers)[:max(0, len(_publishers) - MAX_PUBLISHERS)]]
+        for stale in evicted:
+            stale.flush()
+    return publisher
+
+def release_publisher(execution_id):
+    """Flush and forget an execution's publisher, e.g. once it has finished."""
+    with _publishers_lock:
+        publisher = _publishers.pop(execution_id, None)
+    if publisher is not None:
+        publisher.flush()
+
+@atexit.register
+def flush_all():
+    with _publishers_lock:
+        publishers = list(_publishers.values())
+    for publisher in publishers:
+        publisher.flush()
+
 class ExecutionMessageBus:
     """Central message bus for crew execution events and websocket communication"""
     def __init__(self, execution_id):
         self.execution_id = execution_id
-        self.execution = CrewExecution.objects.get(id=execution_id)
+        self.publisher = get_publisher(execution_id)
 
     def publish(self, event_type, data):
         """Publish event to all relevant interfaces"""
         try:
             #logger.debug(f"Publishing event {event_type} with data: {data}")
-            
+
             # Special handling for human input requests
             if data.get('human_input_request'):
-                self._send_to_groups('human_input_request', data)
+                self._send_to_groups('human_input_request', data, immediate=True)
                 return
-                
+
             if event_type == 'agent_action':
                 self._handle_agent_action(data)
             elif event_type == 'agent_finish':
@@ -32,16 +143,13 @@ class ExecutionMessageBus:
         except Exception as e:
             logger.error(f"Error publishing event {event_type}: {str(e)}")
 
-    def _send_to_groups(self, message_type, data):
-        """Send message to all relevant websocket groups"""
-        try:
-            #logger.debug(f"Sending message to groups for execution {self.execution_id}")
-            groups = []
-            if self.execution.crew:
-                groups.append(f'crew_{self.execution.crew.id}_kanban')
-            if self.execution.conversation:
-                groups.append(f'chat_{self.execution.conversation.session_id}')
+    def flush(self):
+        """Send any buffered events now."""
+        self.publisher.flush()
 
+    def _send_to_groups(self, message_type, data, immediate=False):
+        """Queue message for all relevant websocket groups"""
+        try:
             # Special handling for human input requests
             if data.get('human_input_request'):
                 message = {
@@ -52,23 +160,17 @@ class ExecutionMessageBus:
                     'task_index': data.get('task_index')
                 }
             else:
-                # Construct message with data first, then override with our fields
+                # Construct message with data first, then override with our fields.
+                # Status is only what the event itself carries: the status can be
+                # changed from another process, so a copy kept here goes stale.
                 message = {
                     **data,  # Base data first
                     'type': message_type,
                     'execution_id': self.execution_id,
-                    'status': self.execution.status,
                     'task_index': data.get('task_index')  # Ensure task_index is last
                 }
 
-            #logger.debug(f"Sending message: {message}")
-
-            for group in groups:
-                try:
-                    async_to_sync(channel_layer.group_send)(group, message)
-                    #logger.debug(f"Sent message to group {group}")
-                except Exception as e:
-                    logger.error(f"Failed to send to group {group}: {str(e)}")
+            self.publisher.enqueue(message, immediate=immediate)
 
         except Exception as e:
             logger.error(f"Error in _send_to_groups: {str(e)}")
@@ -86,10 +188,10 @@ class ExecutionMessageBus:
                 'status': 'completed'
             }
         }
-        
+
         self._send_to_groups('execution_update', message)
-        
-        if self.execution.conversation:
+
+        if self.publisher.conversation_id:
             self._store_chat_message(data['log'], data['agent_role'])
 
     def _handle_status_update(self, data):
@@ -106,13 +208,16 @@ class ExecutionMessageBus:
             }
         }
         #logger.debug(f"Sending status update with task_index: {message.get('task_index')}")
-        self._send_to_groups('execution_update', message)
+        terminal = data.get('status') in TERMINAL_STATUSES
+        self._send_to_groups('execution_update', message, immediate=terminal)
+        if terminal:
+            release_publisher(self.execution_id)
 
     def _store_chat_message(self, content, agent_role):
         """Store message in chat history"""
-        if self.execution.conversation:
+        if self.publisher.conversation_id:
             ChatMessage.objects.create(
-                conversation=self.execution.conversation,
+                conversation_id=self.publisher.conversation_id,
                 content=content,
                 is_agent=True,
                 agent_role=agent_role
@@ -0,0 +1,36 @@
+from celery import shared_task
+from datetime import timedelta
+from django.utils import timezone
+import logging
+
+from ..models import Conversation
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def reconcile_conversation_token_totals(active_within_hours: int = 24):
+    """
+    Recompute running token totals for recently active conversations.
+    
+    Totals are updated incrementally as usage is stored; this catches drift
+    from usage rows written or deleted outside TokenManager/MessageManager.
+    Pass active_within_hours=0 to reconcile every conversation.
+    """
+    conversations = Conversation.objects.only('id', 'prompt_tokens', 'completion_tokens', 'total_tokens')
+    if active_within_hours:
+        conversations = conversations.filter(
+            updated_at__gte=timezone.now() - timedelta(hours=active_within_hours)
+        )
+
+    checked = corrected = 0
+    for conversation in conversations.iterator():
+        checked += 1
+        try:
+            if conversation.reconcile_token_totals():
+                corrected += 1
+        except Exception as e:
+            logger.error(f"Error reconciling token totals for conversation {conversation.id}: {str(e)}")
+
+    if corrected:
+        logger.warning(f"Corrected token totals for {corrected} of {checked} conversations")
+    return {'checked': checked, 'corrected': corrected}
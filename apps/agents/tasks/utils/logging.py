@@ -10,7 +10,7 @@ def update_execution_status(execution, status, message=None, task_index=None):
     """Update execution status and notify all UIs"""
     try:
         execution.status = status
-        execution.save()
+        execution.save(update_fields=['status', 'updated_at'])
         
         # Create execution stage
         if message:
@@ -51,7 +51,7 @@ def log_crew_message(execution, content, agent=None, human_input_request=None, c
         # Send via message bus
         message_bus = ExecutionMessageBus(execution.id)
         message_bus.publish('execution_update', {
-            'status': 'RUNNING',
+            'status': execution.status,
             'message': content,
             'task_index': task_index,
             'stage': {
@@ -0,0 +1,106 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from apps.agents.tasks.core.scheduler import build_task_graph, run_crew_tasks, run_task_graph
+
+def make_task(async_execution=False, context=None):
+    return SimpleNamespace(async_execution=async_execution, context=context)
+
+def test_undeclared_tasks_stay_sequential():
+    tasks = [make_task(), make_task(), make_task()]
+    deps, sources = build_task_graph(tasks)
+    assert deps == {0: set(), 1: {0}, 2: {1}}
+    assert sources == {0: [], 1: [0], 2: [1]}
+
+def test_declared_context_only_waits_for_its_sources():
+    research, outline = make_task(), make_task()
+    tasks = [research, outline, make_task(context=[research]), make_task(context=[outline])]
+    tasks[1].context = [research]
+    deps, sources = build_task_graph(tasks)
+    assert deps[2] == {0}
+    assert deps[3] == {1}
+    assert sources[2] is None
+
+def test_independent_tasks_run_concurrently():
+    deps = {0: set(), 1: set(), 2: {0, 1}}
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def run(index, done):
+        with lock:
+            running.append(index)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(index)
+        return index
+
+    done = run_task_graph(deps, run, max_workers=2)
+    assert done == {0: 0, 1: 1, 2: 2}
+    assert max(peak) == 2
+
+def test_exclusive_key_serializes_tasks():
+    deps = {0: set(), 1: set()}
+    peak = []
+    running = []
+    lock = threading.Lock()
+
+    def run(index, done):
+        with lock:
+            running.append(index)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(index)
+
+    run_task_graph(deps, run, max_workers=2, exclusive_key=lambda index: 'same-agent')
+    assert max(peak) == 1
+
+def test_done_tasks_are_skipped_and_cycles_raise():
+    calls = []
+    run_task_graph({0: set(), 1: {0}}, lambda index, done: calls.append(index), done={0: 'checkpoint'})
+    assert calls == [1]
+
+    with pytest.raises(ValueError):
+        run_task_graph({0: {1}, 1: {0}}, lambda index, done: calls.append(index))
+
+class FakeCrew:
+    """Just enough of a CrewAI crew for run_crew_tasks."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.agent = object()
+
+    def _get_context(self, task, outputs):
+        return ' | '.join(outputs) if task.context is None else 'declared'
+
+    def _get_agent_to_use(self, task):
+        return self.agent
+
+def test_sequential_crew_tasks_get_the_previous_output_as_context():
+    crew = FakeCrew([make_task(), make_task(), make_task()])
+    contexts = {}
+
+    def run_task(index, task, context):
+        contexts[index] = context
+        return f'out{index}'
+
+    outputs = run_crew_tasks(crew, run_task, max_workers=4)
+    assert contexts == {0: '', 1: 'out0', 2: 'out1'}
+    assert outputs == ['out2']
+
+def test_restored_tasks_feed_later_tasks():
+    crew = FakeCrew([make_task(), make_task(), make_task()])
+    contexts = {}
+
+    def run_task(index, task, context):
+        contexts[index] = context
+        return f'out{index}'
+
+    outputs = run_crew_tasks(crew, run_task, restored={0: 'saved0'})
+    assert contexts == {1: 'saved0', 2: 'out1'}
+    assert crew.tasks[0].output == 'saved0'
+    assert outputs == ['out2']
@@ -13,6 +13,23 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Business information patterns, compiled once at import
+PHONE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # 123-456-7890 or 1234567890
+    r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',     # (123) 456-7890
+    r'\b\d{3}\s+\d{3}\s+\d{4}\b'        # 123 456 7890
+)]
+
+ADDRESS_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\d+\s+[A-Za-z0-9\s,]+(?:Road|Rd|Street|St|Avenue|Ave|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Circle|Cir|Trail|Trl|Highway|Hwy|Route|Rte)[,.\s]+(?:[A-Za-z\s]+,\s*)?[A-Z]{2}\s+\d{5}(?:-\d{4})?',
+    r'\d+\s+[A-Za-z\s]+(?:Road|Rd|Street|St|Avenue|Ave|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Circle|Cir|Trail|Trl|Highway|Hwy|Route|Rte)'
+)]
+
+HOURS_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*(?:day)?[-:\s]+(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM)[-\s]+\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM))',
+    r'\b(?:\d{1,2}:\d{2}|(?:1[0-2]|0?[1-9])(?::\d{2})?\s*(?:am|pm|AM|PM))[-\s]+(?:\d{1,2}:\d{2}|(?:1[0-2]|0?[1-9])(?::\d{2})?\s*(?:am|pm|AM|PM))'
+)]
+
 class BusinessCredibilityToolSchema(BaseModel):
     """Input schema for BusinessCredibilityTool."""
     text_content: str = Field(..., description="The text content to analyze")
@@ -95,25 +112,6 @@ class BusinessCredibilityTool(BaseTool):
 
     def _preprocess_content(self, text_content: str, html_content: str) -> Dict[str, Any]:
         """Pre-process content to detect common business information patterns."""
-        # Phone number patterns
-        phone_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # 123-456-7890 or 1234567890
-            r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',     # (123) 456-7890
-            r'\b\d{3}\s+\d{3}\s+\d{4}\b'        # 123 456 7890
-        ]
-        
-        # Address patterns
-        address_patterns = [
-            r'\d+\s+[A-Za-z0-9\s,]+(?:Road|Rd|Street|St|Avenue|Ave|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Circle|Cir|Trail|Trl|Highway|Hwy|Route|Rte)[,.\s]+(?:[A-Za-z\s]+,\s*)?[A-Z]{2}\s+\d{5}(?:-\d{4})?',
-            r'\d+\s+[A-Za-z\s]+(?:Road|Rd|Street|St|Avenue|Ave|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Circle|Cir|Trail|Trl|Highway|Hwy|Route|Rte)'
-        ]
-        
-        # Business hours patterns
-        hours_patterns = [
-            r'\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*(?:day)?[-:\s]+(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM)[-\s]+\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM))',
-            r'\b(?:\d{1,2}:\d{2}|(?:1[0-2]|0?[1-9])(?::\d{2})?\s*(?:am|pm|AM|PM))[-\s]+(?:\d{1,2}:\d{2}|(?:1[0-2]|0?[1-9])(?::\d{2})?\s*(?:am|pm|AM|PM))'
-        ]
-
         # Initialize results
         results = {
             "has_phone": False,
@@ -142,22 +140,22 @@ class BusinessCredibilityTool(BaseTool):
             # Check priority sections first
             for section in priority_sections:
                 # Check phone patterns
-                for pattern in phone_patterns:
-                    phones = re.findall(pattern, section)
+                for pattern in PHONE_PATTERNS:
+                    phones = pattern.findall(section)
                     if phones:
                         results["has_phone"] = True
                         results["found_patterns"]["phones"].extend(phones)
                 
                 # Check address patterns
-                for pattern in address_patterns:
-                    addresses = re.findall(pattern, section)
+                for pattern in ADDRESS_PATTERNS:
+                    addresses = pattern.findall(section)
                     if addresses:
                         results["has_address"] = True
                         results["found_patterns"]["addresses"].extend(addresses)
                 
                 # Check hours patterns
-                for pattern in hours_patterns:
-                    hours = re.findall(pattern, section)
+                for pattern in HOURS_PATTERNS:
+                    hours = pattern.findall(section)
                     if hours:
                         results["has_hours"] = True
                         results["found_patterns"]["hours"].extend(hours)
@@ -165,22 +163,22 @@ class BusinessCredibilityTool(BaseTool):
         # If not found in priority sections, check entire content
         if not (results["has_phone"] and results["has_address"] and results["has_hours"]):
             # Check phone patterns
-            for pattern in phone_patterns:
-                phones = re.findall(pattern, text_content)
+            for pattern in PHONE_PATTERNS:
+                phones = pattern.findall(text_content)
                 if phones:
                     results["has_phone"] = True
                     results["found_patterns"]["phones"].extend(phones)
             
             # Check address patterns
-            for pattern in address_patterns:
-                addresses = re.findall(pattern, text_content)
+            for pattern in ADDRESS_PATTERNS:
+                addresses = pattern.findall(text_content)
                 if addresses:
                     results["has_address"] = True
                     results["found_patterns"]["addresses"].extend(addresses)
             
             # Check hours patterns
-            for pattern in hours_patterns:
-                hours = re.findall(pattern, text_content)
+            for pattern in HOURS_PATTERNS:
+                hours = pattern.findall(text_content)
                 if hours:
                     results["has_hours"] = True
                     results["found_patterns"]["hours"].extend(hours)
@@ -1,5 +1,9 @@
 import os
-from typing import Any, Type, List, Dict, Optional
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, ClassVar, Type, List, Dict, Optional
+from urllib.parse import urlparse
 from pydantic import BaseModel, Field
 from apps.agents.tools.base_tool import BaseTool
 from apps.agents.tools.searxng_tool.searxng_tool import SearxNGSearchTool
@@ -9,6 +13,7 @@ from apps.common.utils import get_llm as utils_get_llm
 from langchain.prompts.chat import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from django.conf import settings
+from django.db import connections
 import json
 import logging
 from celery.exceptions import Ignore
@@ -101,6 +106,34 @@ class DeepResearchToolSchema(BaseModel):
         description="Optional guidance to influence content processing"
     )
 
+class ResearchBudget:
+    """Concurrency limits and claimed URLs shared by every level of one research run."""
+
+    def __init__(self, llm_concurrency: int, per_domain_limit: int, scrape_concurrency: int):
+        self.llm = threading.Semaphore(max(1, llm_concurrency))
+        # Scrapes in flight across every branch of the run
+        self.scrape = threading.Semaphore(max(1, scrape_concurrency))
+        self.per_domain_limit = max(1, per_domain_limit)
+        self._domains: Dict[str, threading.Semaphore] = {}
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def domain(self, url: str) -> threading.Semaphore:
+        """Semaphore limiting concurrent scrapes of the URL's host."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._domains:
+                self._domains[host] = threading.Semaphore(self.per_domain_limit)
+            return self._domains[host]
+
+    def claim(self, url: str) -> bool:
+        """Reserve a URL for analysis; False if another branch already has it."""
+        with self._lock:
+            if url in self._claimed:
+                return False
+            self._claimed.add(url)
+            return True
+
 class DeepResearchTool(BaseTool):
     name: str = "Deep Research Tool"
     description: str = "Performs deep recursive research on a topic by generating multiple search queries and analyzing content from multiple sources."
@@ -114,6 +147,12 @@ class DeepResearchTool(BaseTool):
     # Define token tracking fields as proper Pydantic fields with default values
     total_input_tokens: int = Field(0, description="Total input tokens used")
     total_output_tokens: int = Field(0, description="Total output tokens used")
+    # Concurrency budget for a research run
+    scrape_concurrency: int = Field(default_factory=lambda: getattr(settings, 'DEEP_RESEARCH_SCRAPE_CONCURRENCY', 8))
+    per_domain_limit: int = Field(default_factory=lambda: getattr(settings, 'DEEP_RESEARCH_PER_DOMAIN_LIMIT', 2))
+    llm_concurrency: int = Field(default_factory=lambda: getattr(settings, 'DEEP_RESEARCH_LLM_CONCURRENCY', 4))
+
+    _token_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -123,6 +162,10 @@ class DeepResearchTool(BaseTool):
 
     def _update_token_counters(self):
         """Update total token counts from the token counter callback"""
+        with self._token_lock:
+            return self._read_token_counters()
+
+    def _read_token_counters(self):
         if hasattr(self, 'token_counter_callback') and self.token_counter_callback:
             current_input = getattr(self.token_counter_callback, 'input_tokens', 0)
             current_output = getattr(self.token_counter_callback, 'output_tokens', 0)
@@ -286,12 +329,13 @@ class DeepResearchTool(BaseTool):
             
     def _update_token_counters_from_subtool(self, input_tokens: int, output_tokens: int):
         """Update token counters with usage from a sub-tool."""
-        self.total_input_tokens += input_tokens
-        self.total_output_tokens += output_tokens
+        with self._token_lock:
+            self.total_input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
         logger.debug(f"Added sub-tool token usage - Input: +{input_tokens}, Output: +{output_tokens}")
         logger.debug(f"Updated cumulative totals - Input: {self.total_input_tokens}, Output: {self.total_output_tokens}")
 
-    def _process_content(self, query: str, content: str, num_learnings: int = 3, guidance: Optional[str] = None) -> Dict:
+    def _process_content(self, query: str, content: str, num_learnings: int = 3, guidance: Optional[str] = None, url: Optional[str] = None) -> Dict:
         """Process content to extract learnings and follow-up questions using the CompressionTool."""
         # Log content size and type information
         logger.info(f"_process_content called with query: {query[:50]}...")
@@ -399,12 +443,132 @@ class DeepResearchTool(BaseTool):
         #return the first 5 urls
         return urls[:5]
 
-    def _deep_research(self, query: str, breadth: int, depth: int, user_id: int, guidance: Optional[str] = None, learnings: List[str] = None, visited_urls: set = None) -> Dict:
-        """Recursive function to perform deep research."""
+    def _run_concurrently(self, fn, items: List, max_workers: int) -> List:
+        """Apply fn to items on a thread pool and return the results in input order."""
+        if not items:
+            return []
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix='deep-research')
+        try:
+            # Copy context variables (e.g. the organization) into the worker threads
+            futures = [pool.submit(contextvars.copy_context().run, self._in_worker, fn, item) for item in items]
+            return [future.result() for future in futures]
+        finally:
+            # On cancellation, stop whatever has not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _in_worker(fn, item):
+        try:
+            return fn(item)
+        finally:
+            # Worker threads get their own DB connections; don't leave them open
+            connections.close_all()
+
+    def _search_urls(self, serp_query: Dict) -> List[str]:
+        """Run one SERP query and return the result URLs."""
+        if hasattr(self, 'progress_tracker') and self.progress_tracker.check_cancelled():
+            raise Ignore()
+        try:
+            # Use the new relevant_results_only parameter
+            search_results = self.search_tool._run(
+                search_query=serp_query['query'],
+                relevant_results_only=True  # Filter for relevant results only
+            )
+
+            # Extract and add token usage from SearxNGTool
+            input_tokens, output_tokens = self._extract_searxng_tool_tokens(search_results)
+            self._update_token_counters_from_subtool(input_tokens, output_tokens)
+
+            return self._extract_urls(search_results)
+        except Ignore:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing query {serp_query['query']}: {str(e)}")
+            return []
+
+    def _analyze_url(self, query: str, url: str, depth: int, user_id: int, guidance: Optional[str], budget: ResearchBudget) -> Optional[Dict]:
+        """Scrape one URL and extract learnings from it. Returns None if nothing was learned."""
+        if hasattr(self, 'progress_tracker') and self.progress_tracker.check_cancelled():
+            raise Ignore()
+        try:
+            # Host slot first, so a busy host does not hold run-wide scrape slots
+            with budget.domain(url), budget.scrape:
+                # Use ScrapperTool instead of CrawlWebsiteTool
+                scrape_result = self.scrapper_tool._run(
+                    url=url,
+                    user_id=user_id,
+                    output_type="text",
+                    cache=True,
+                    stealth=True
+                )
+        except Exception as e:
+            logger.error(f"Error scraping URL {url}: {str(e)}")
+            return None
+
+        try:
+            result_data = json.loads(scrape_result)
+            if not result_data.get("success", False):
+                logger.warning(f"Failed to scrape URL: {url} - {result_data.get('error')}")
+                return None
+
+            content = result_data.get("text", "")
+
+            if not content or len(content) < 100:
+                logger.warning(f"Insufficient content found for {url}")
+                return None
+
+            if len(content) > 400000:
+                logger.warning(f"Content too large ({len(content)} chars) for {url}, skipping")
+                return None
+
+            content_length = len(content)
+            logger.info(f"Processing {content_length/1024:.1f} KB from {url}")
+
+            # Notify about analyzing this source
+            if hasattr(self, 'progress_tracker'):
+                self.progress_tracker.send_update("reasoning", {
+                    "step": "content_analysis",
+                    "title": "Analyzing Source Content",
+                    "explanation": f"Phase {depth}\n{url}",
+                    "details": {
+                        "url": url,
+                        "source_length": content_length,
+                        "depth": depth
+                    }
+                })
+
+            with budget.llm:
+                result = self._process_content(query, content, guidance=guidance, url=url)
+
+            new_learnings = result.get('learnings', [])
+            if not new_learnings or new_learnings[0].startswith("Unable to extract"):
+                logger.error(f"Failed to extract learnings from {url}")
+                return None
+
+            logger.info(f"Extracted {len(new_learnings)} new learnings from {url}")
+            return result
+
+        except Ignore:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing URL {url}: {str(e)}", exc_info=True)
+            return None
+
+    def _deep_research(self, query: str, breadth: int, depth: int, user_id: int, guidance: Optional[str] = None, learnings: List[str] = None, visited_urls: set = None, budget: Optional[ResearchBudget] = None) -> Dict:
+        """
+        Recursive function to perform deep research.
+
+        The SERP queries of a level run concurrently, then every new URL is
+        scraped and analyzed concurrently within the run's budget, then the
+        follow-up branches run concurrently. Results are always merged in
+        query and URL order, so the outcome does not depend on timing.
+        """
         if learnings is None:
             learnings = []
         if visited_urls is None:
             visited_urls = set()
+        if budget is None:
+            budget = ResearchBudget(self.llm_concurrency, self.per_domain_limit, self.scrape_concurrency)
 
         if hasattr(self, 'progress_tracker'):
             self.progress_tracker.send_update("reasoning", {
@@ -419,191 +583,97 @@ class DeepResearchTool(BaseTool):
                 }
             })
 
-        urls_per_query = 5
-        expected_urls = breadth * urls_per_query
-        total_operations = expected_urls
-        current_operation = 0
-
         # Check for cancellation before starting
         if hasattr(self, 'progress_tracker') and self.progress_tracker.check_cancelled():
             raise Ignore()
 
         serp_queries = self._generate_serp_queries(query, breadth, learnings, guidance)
         logger.debug(f"SERP queries: {serp_queries}")
-        all_learnings = learnings.copy()
-        all_urls = visited_urls.copy()
-        
-        # Log initial state
-        logger.info(f"_deep_research initial state: local learnings={len(learnings)}, all_learnings={len(all_learnings)}")
+        all_learnings = list(learnings)
+        all_urls = dict.fromkeys(visited_urls)  # Ordered set
 
-        for query_index, serp_query in enumerate(serp_queries, 1):
-            if hasattr(self, 'progress_tracker') and self.progress_tracker.check_cancelled():
-                raise Ignore()
+        # Log initial state
+        logger.info(f"_deep_research initial state: learnings={len(all_learnings)}, visited_urls={len(all_urls)}")
+
+        # Search all queries at once
+        urls_by_query = self._run_concurrently(self._search_urls, serp_queries, breadth)
+
+        # Each URL is analyzed once per run, for the first query that found it
+        jobs = []
+        for serp_query, urls in zip(serp_queries, urls_by_query):
+            for url in urls:
+                if url not in all_urls and budget.claim(url):
+                    jobs.append((serp_query, url))
+
+        results = self._run_concurrently(
+            lambda job: self._analyze_url(query, job[1], depth, user_id, guidance, budget),
+            jobs,
+            self.scrape_concurrency
+        )
+
+        follow_ups = []
+        for (serp_query, url), result in zip(jobs, results):
+            if result is None:
+                continue
+            all_urls[url] = None
+            all_learnings.extend(result['learnings'])
+
+            # Handle follow-up questions for deeper research
+            if depth > 1 and result.get('follow_up_questions'):
+                next_query = f"""
+                Previous research goal: {serp_query['research_goal']}
+                Follow-up questions:
+                {chr(10).join(f'- {q}' for q in result['follow_up_questions'])}
+                """.strip()
+                follow_ups.append(next_query)
+
+        logger.info(f"Depth {depth} sources analyzed: {len(jobs)} URLs, {len(all_learnings)} learnings")
+
+        if follow_ups:
+            # Branches start from this level's findings and are merged in order
+            branch_learnings = list(all_learnings)
+            branch_urls = set(all_urls)
+            deeper_results = self._run_concurrently(
+                lambda next_query: self._deep_research(
+                    query=next_query,
+                    breadth=max(2, breadth // 2),
+                    depth=depth - 1,
+                    user_id=user_id,
+                    guidance=guidance,
+                    learnings=branch_learnings,
+                    visited_urls=branch_urls,
+                    budget=budget
+                ),
+                follow_ups,
+                breadth
+            )
+            for deeper in deeper_results:
+                all_learnings.extend(deeper['learnings'])
+                all_urls.update(dict.fromkeys(deeper['visited_urls']))
 
-            try:
-                # Use the new relevant_results_only parameter
-                search_results = self.search_tool._run(
-                    search_query=serp_query['query'],
-                    relevant_results_only=True  # Filter for relevant results only
-                )
-                
-                # Extract and add token usage from SearxNGTool
-                input_tokens, output_tokens = self._extract_searxng_tool_tokens(search_results)
-                self._update_token_counters_from_subtool(input_tokens, output_tokens)
-                
-                urls = self._extract_urls(search_results)
-                #logger.debug(f"Search results: {search_results[:100]}")
+            logger.info(f"After recursive calls: all_learnings={len(all_learnings)}")
 
-                new_urls = [url for url in urls if url not in all_urls]
-                if not new_urls:
-                    continue
-                
-                for url in new_urls:
-                    try:
-                        # Use ScrapperTool instead of CrawlWebsiteTool
-                        scrape_result = self.scrapper_tool._run(
-                            url=url,
-                            user_id=user_id,
-                            output_type="text",
-                            cache=True,
-                            stealth=True
-                        )
-
-                        result_data = json.loads(scrape_result)
-                        if not result_data.get("success", False):
-                            logger.warning(f"Failed to scrape URL: {url} - {result_data.get('error')}")
-                            continue
-
-                        content = result_data.get("text", "")
-
-                        if not content or len(content) < 100:
-                            logger.warning(f"Insufficient content found for {url}")
-                            continue
-
-                        if len(content) > 400000:
-                            logger.warning(f"Content too large ({len(content)} chars) for {url}, skipping")
-                            continue
-
-                        all_urls.add(url)
-
-                        try:
-                            # Notify about analyzing this source
-                            if hasattr(self, 'progress_tracker'):
-                                self.progress_tracker.send_update("reasoning", {
-                                    "step": "content_analysis",
-                                    "title": "Analyzing Source Content",
-                                    "explanation": f"Phase {depth}\n{url}",
-                                    "details": {
-                                        "url": url,
-                                        "depth": depth
-                                    }
-                                })
-
-                            content_length = len(content)
-                            logger.info(f"Processing {content_length/1024:.1f} KB from {url}")
-
-                            if hasattr(self, 'progress_tracker'):
-                                self.progress_tracker.send_update("reasoning", {
-                                    "step": "content_analysis",
-                                    "title": "Analyzing Source Content",
-                                    "explanation": f"Phase {depth}\n{url}",
-                                    "details": {
-                                        "url": url,
-                                        "source_length": content_length,
-                                        "depth": depth
-                                    }
-                                })
-
-                            # Store current URL for subclasses to access
-                            self._current_url = url
-                            
-                            # Process the content
-                            result = self._process_content(query, content, guidance=guidance)
-                            
-                            # Clear current URL after processing
-                            self._current_url = None
-                            
-                            new_learnings = result.get('learnings', [])
-
-                            if not new_learnings or new_learnings[0].startswith("Unable to extract"):
-                                logger.error(f"Failed to extract learnings from {url}")
-                                continue
-
-                            # Log learnings being added
-                            logger.info(f"Adding {len(new_learnings)} new learnings from {url}")
-                            logger.debug(f"First learning sample: {new_learnings[0][:100]}...")
-                            
-                            learnings.extend(new_learnings)
-                            # Add new learnings to all_learnings as well
-                            all_learnings.extend(new_learnings)
-                            logger.info(f"After adding: local learnings={len(learnings)}, all_learnings={len(all_learnings)}")
-
-                            # Handle follow-up questions for deeper research
-                            if depth > 1 and result.get('follow_up_questions'):
-                                next_query = f"""
-                                Previous research goal: {serp_query['research_goal']}
-                                Follow-up questions:
-                                {chr(10).join(f'- {q}' for q in result['follow_up_questions'])}
-                                """.strip()
-
-                                deeper_results = self._deep_research(
-                                    query=next_query,
-                                    breadth=max(2, breadth // 2),
-                                    depth=depth - 1,
-                                    user_id=user_id,
-                                    guidance=guidance,
-                                    learnings=all_learnings,
-                                    visited_urls=all_urls
-                                )
-
-                                all_learnings = list(set(all_learnings + deeper_results['learnings']))
-                                all_urls.update(deeper_results['visited_urls'])
-                                
-                                # Log after recursive call
-                                logger.info(f"After recursive call: local learnings={len(learnings)}, all_learnings={len(all_learnings)}")
-
-                        except Exception as e:
-                            logger.error(f"Error processing URL {url}: {str(e)}", exc_info=True)
-                            continue
-
-                    except Exception as e:
-                        logger.error(f"Error scraping URL {url}: {str(e)}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Error processing query {serp_query['query']}: {str(e)}")
-                continue
-            
         if hasattr(self, 'progress_tracker'):
             self.progress_tracker.send_update("reasoning", {
                 "step": "depth_complete",
                 "title": f"Completed Depth Level {depth}",
                 "explanation": "Finished current research iteration",
                 "details": {
-                    "new_learnings": len(all_learnings) - (len(learnings) if learnings else 0),
-                    "new_urls": len(all_urls) - (len(visited_urls) if visited_urls else 0)
+                    "new_learnings": len(all_learnings) - len(learnings),
+                    "new_urls": len(all_urls) - len(visited_urls)
                 }
             })
 
         # Log the state of learnings before return
         logger.info(f"Depth {depth} complete - Collected {len(all_learnings)} total learnings")
-        if all_learnings:
-            logger.debug(f"Sample learnings: {all_learnings[0][:100]}...")
-            
-        # Before deduplication
-        logger.info(f"Before deduplication: {len(all_learnings)} learnings")
-        if len(all_learnings) == 0:
+        if not all_learnings:
             logger.error("No learnings collected - check processing or content extraction!")
-        
-        deduplicated_learnings = list(set(all_learnings))  # Deduplicate learnings
+
+        deduplicated_learnings = list(dict.fromkeys(all_learnings))  # Deduplicate, keeping order
         logger.info(f"After deduplication: {len(deduplicated_learnings)} learnings")
-        
-        # Check if any learnings were lost during deduplication
-        if len(deduplicated_learnings) < len(all_learnings):
-            logger.warning(f"Lost {len(all_learnings) - len(deduplicated_learnings)} learnings during deduplication")
 
         return {
-            'learnings': deduplicated_learnings,  # Using the tracked deduplicated list
+            'learnings': deduplicated_learnings,
             'visited_urls': list(all_urls)
             }
 
@@ -18,10 +18,12 @@ from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 
 # Import Django models
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from apps.seo_manager.models import SearchConsoleCredentials
 
 from apps.common.utils import DateProcessor
+from .search_analytics_fetcher import MAX_PAGE_SIZE, SearchAnalyticsFetcher, SHARD_DAYS
 
 logger = logging.getLogger(__name__)
 
@@ -115,12 +117,20 @@ class GoogleSearchConsoleRequest(BaseModel):
     )
     row_limit: int = Field(
         default=250,
-        description="Number of rows to return (1-25000)"
+        description="Number of rows to return (1-25000); ignored when fetch_all is set"
     )
     start_row: int = Field(
         default=0,
         description="Starting row for pagination"
     )
+    fetch_all: bool = Field(
+        default=False,
+        description="Keep requesting pages of 25000 rows until Search Console has no more (full keyword universe)"
+    )
+    date_shard: Optional[str] = Field(
+        default=None,
+        description="Split the date range into 'day' or 'week' ranges fetched in parallel; rows are merged back per dimension"
+    )
     aggregation_type: str = Field(
         default="auto",
         description="How to aggregate results (auto, byPage, byProperty)"
@@ -280,7 +290,59 @@ class GoogleSearchConsoleRequest(BaseModel):
             raise ValueError("Row limit must be between 1 and 25000")
         return value
 
+    @field_validator("date_shard")
+    @classmethod
+    def validate_date_shard(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in SHARD_DAYS:
+            raise ValueError(f"Invalid date shard. Must be one of {list(SHARD_DAYS)}")
+        return value
+
 class SearchConsoleDataProcessor:
+    @staticmethod
+    def rows_to_frame(rows: List[dict], dimensions: List[str]) -> pd.DataFrame:
+        """Turn one page of API rows into a DataFrame (raw ctr and position)."""
+        columns = {dimension: [row['keys'][i] for row in rows] for i, dimension in enumerate(dimensions)}
+        for metric in ('clicks', 'impressions', 'ctr', 'position'):
+            columns[metric] = [row.get(metric, 0) for row in rows]
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def combine_frames(frames: List[pd.DataFrame], dimensions: List[str], merge: bool = False) -> pd.DataFrame:
+        """
+        Concatenate page frames into the tool's row format.
+
+        With ``merge``, rows of different date shards that share dimension
+        values are combined (all rows when there are no dimensions): clicks
+        and impressions are summed, CTR is recomputed and position is
+        averaged weighted by impressions.
+        """
+        if not frames:
+            return pd.DataFrame(columns=[*dimensions, 'clicks', 'impressions', 'ctr', 'position'])
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+        if merge:
+            df = df.assign(weighted_position=df['position'] * df['impressions'])
+            totals = dict(
+                clicks=('clicks', 'sum'),
+                impressions=('impressions', 'sum'),
+                weighted_position=('weighted_position', 'sum')
+            )
+            if dimensions:
+                df = df.groupby(dimensions, as_index=False, sort=False).agg(**totals)
+            else:
+                # Without dimensions every shard is one totals row
+                df = pd.DataFrame({name: [df[column].sum()] for name, (column, _) in totals.items()})
+            impressions = df['impressions'].where(df['impressions'] > 0)
+            df['ctr'] = (df['clicks'] / impressions).fillna(0)
+            df['position'] = (df.pop('weighted_position') / impressions).fillna(0)
+
+        if len(frames) > 1:
+            # Pages arrive out of order; Search Console sorts by clicks
+            df = df.sort_values('clicks', ascending=False, kind='stable', ignore_index=True)
+        df['ctr'] = (df['ctr'] * 100).round(2)
+        df['position'] = df['position'].round(2)
+        return df
+
     @staticmethod
     def _add_period_comparison(df: pd.DataFrame) -> pd.DataFrame:
         """Add period-over-period comparison metrics"""
@@ -329,12 +391,16 @@ class SearchConsoleDataProcessor:
         return df
 
     @staticmethod
-    def process_data(data: List[dict], params: GoogleSearchConsoleRequest) -> List[dict]:
-        """Process the search console data based on request parameters"""
-        if not data:
+    def process_data(data, params: GoogleSearchConsoleRequest) -> List[dict]:
+        """Process the search console data (rows or a DataFrame) based on request parameters"""
+        if isinstance(data, pd.DataFrame):
+            if data.empty:
+                return []
+            df = data
+        elif not data:
             return data
-
-        df = pd.DataFrame(data)
+        else:
+            df = pd.DataFrame(data)
 
         # Apply time granularity aggregation if needed
         if params.time_granularity != TimeGranularity.DAILY and 'date' in df.columns:
@@ -475,6 +541,8 @@ class GenericGoogleSearchConsoleTool(BaseTool):
     - end_date: End date for data range (default: "yesterday")
     - dimensions: List of dimensions to fetch (default: ["query"])
     - search_type: Type of search results (default: "web")
+    - fetch_all: Page through every row instead of stopping at row_limit
+    - date_shard: Fetch the date range as parallel 'day' or 'week' shards
     
     Key Features:
     - Flexible date ranges (e.g., '7daysAgo', '3monthsAgo', 'YYYY-MM-DD')
@@ -517,6 +585,8 @@ class GenericGoogleSearchConsoleTool(BaseTool):
         search_type: str = "web",
         row_limit: int = 250,
         start_row: int = 0,
+        fetch_all: bool = False,
+        date_shard: Optional[str] = None,
         aggregation_type: str = "auto",
         data_state: str = "final",
         dimension_filters: Optional[List[dict]] = None,
@@ -542,6 +612,8 @@ class GenericGoogleSearchConsoleTool(BaseTool):
                 "search_type": search_type,
                 "row_limit": row_limit,
                 "start_row": start_row,
+                "fetch_all": fetch_all,
+                "date_shard": date_shard,
                 "aggregation_type": aggregation_type,
                 "data_state": data_state,
                 "dimension_filters": dimension_filters,
@@ -597,6 +669,13 @@ class GenericGoogleSearchConsoleTool(BaseTool):
                 logger.debug("Building Search Console service")
                 service = build('searchconsole', 'v1', credentials=creds)
                 property_url = params.search_console_property_url
+                fetcher = SearchAnalyticsFetcher(
+                    service_factory=lambda: build('searchconsole', 'v1', credentials=creds),
+                    property_url=property_url,
+                    max_workers=getattr(settings, 'GSC_MAX_PARALLEL_REQUESTS', 4),
+                    queries_per_minute=getattr(settings, 'GSC_QUERIES_PER_MINUTE', 1200),
+                    service=service
+                )
                 
             except Exception as cred_error:
                 logger.error(f"Failed to create Search Console service: {str(cred_error)}")
@@ -650,14 +729,24 @@ class GenericGoogleSearchConsoleTool(BaseTool):
                     'filters': filters
                 }]
 
-            # Execute the request
+            # Execute the request; each page becomes a DataFrame and they are concatenated at the end
+            dimensions = [d.strip() for d in params.dimensions]
             try:
                 logger.debug(f"Executing Search Console query with dimensions: {params.dimensions}")
-                response = service.searchanalytics().query(
-                    siteUrl=property_url,
-                    body=request_body
-                ).execute()
-                logger.debug(f"Received response with {len(response.get('rows', []))} rows")
+                frames = [
+                    SearchConsoleDataProcessor.rows_to_frame(rows, dimensions)
+                    for rows in fetcher.iter_pages(
+                        request_body,
+                        # Full pages keep the number of quota-limited requests down
+                        page_size=MAX_PAGE_SIZE if params.fetch_all else params.row_limit,
+                        fetch_all=params.fetch_all,
+                        shard=params.date_shard
+                    )
+                ]
+                logger.debug(
+                    f"Received {sum(len(frame) for frame in frames)} rows "
+                    f"in {len(frames)} pages from {fetcher.requests} requests"
+                )
             except HttpError as http_error:
                 error_message = str(http_error)
                 logger.error(f"HTTP error in Search Console API: {error_message}")
@@ -682,37 +771,35 @@ class GenericGoogleSearchConsoleTool(BaseTool):
                 # Convert to JSON string to match other working tools
                 return json.dumps(result)
 
-            # Process the response
-            raw_data = self._format_response(response, params.dimensions)
-            
-            if raw_data['success']:
-                processed_data = SearchConsoleDataProcessor.process_data(
-                    raw_data['search_console_data'],
-                    params
-                )
-                
-                # Handle period comparison format
-                if isinstance(processed_data, dict) and 'period_comparison' in processed_data:
-                    result = {
-                        'success': True,
-                        'search_console_data': processed_data['data'],
-                        'period_comparison': processed_data['period_comparison'],
-                        'property_url': property_url,
-                        'start_date': params.start_date,
-                        'end_date': params.end_date
-                    }
-                else:
-                    result = {
+            # Process the response; shards only overlap when rows are not split by date
+            frame = SearchConsoleDataProcessor.combine_frames(
+                frames,
+                dimensions,
+                merge=bool(params.date_shard) and 'date' not in dimensions
+            )
+            if not params.fetch_all:
+                # Each date shard returns up to row_limit rows of its own
+                frame = frame.head(params.row_limit)
+            processed_data = SearchConsoleDataProcessor.process_data(frame, params)
+
+            # Handle period comparison format
+            if isinstance(processed_data, dict) and 'period_comparison' in processed_data:
+                result = {
                     'success': True,
-                        'search_console_data': processed_data,
-                        'property_url': property_url,
-                        'start_date': params.start_date,
-                        'end_date': params.end_date
+                    'search_console_data': processed_data['data'],
+                    'period_comparison': processed_data['period_comparison'],
+                    'property_url': property_url,
+                    'start_date': params.start_date,
+                    'end_date': params.end_date
                 }
             else:
-                # Add property reference to raw data
-                raw_data['property_url'] = property_url
-                result = raw_data
+                result = {
+                    'success': True,
+                    'search_console_data': processed_data,
+                    'property_url': property_url,
+                    'start_date': params.start_date,
+                    'end_date': params.end_date
+                }
             
             # Convert to JSON string to match other working tools
             return json.dumps(result)
@@ -742,33 +829,3 @@ class GenericGoogleSearchConsoleTool(BaseTool):
             
             # Convert to JSON string to match other working tools
             return json.dumps(result)
-
-    def _format_response(self, response: dict, dimensions: List[str]) -> dict:
-        """Format the Search Console API response into a structured format."""
-        search_console_data = []
-        
-        # Clean dimension names - strip whitespace
-        dimensions = [d.strip() for d in dimensions]
-        
-        for row in response.get('rows', []):
-            data_point = {}
-            
-            # Process dimension values
-            for i, dimension in enumerate(dimensions):
-                value = row['keys'][i]
-                data_point[dimension] = value
-            
-            # Add metrics
-            data_point.update({
-                'clicks': row.get('clicks', 0),
-                'impressions': row.get('impressions', 0),
-                'ctr': round(row.get('ctr', 0) * 100, 2),
-                'position': round(row.get('position', 0), 2)
-            })
-            
-            search_console_data.append(data_point)
-
-        return {
-            'success': True,
-            'search_console_data': search_console_data
-        }
\ No newline at end of file
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 25000  # Search Console's rowLimit ceiling
+SHARD_DAYS = {'day': 1, 'week': 7}
+RETRY_STATUSES = {429, 500, 503}
+
+def date_shards(start_date: str, end_date: str, shard: Optional[str]) -> List[Tuple[str, str]]:
+    """Split an inclusive YYYY-MM-DD range into day or week ranges (or keep it whole)."""
+    if not shard:
+        return [(start_date, end_date)]
+    if shard not in SHARD_DAYS:
+        raise ValueError(f"Invalid date shard: {shard}. Must be one of {list(SHARD_DAYS)}")
+
+    step = timedelta(days=SHARD_DAYS[shard])
+    current, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    shards = []
+    while current <= last:
+        shard_end = min(current + step - timedelta(days=1), last)
+        shards.append((current.isoformat(), shard_end.isoformat()))
+        current = shard_end + timedelta(days=1)
+    return shards
+
+class SearchAnalyticsFetcher:
+    """
+    Fetches every row of a Search Analytics query.
+
+    Each date shard is paged with ``startRow`` until a short page comes back;
+    pages of all shards are requested from a thread pool and yielded as soon
+    as they arrive. Requests are spaced to stay under ``queries_per_minute``
+    and retried with backoff on quota and server errors.
+
+    The Google API client is not thread-safe, so ``service_factory`` is
+    called once per worker thread to build its own service. An already built
+    ``service`` is used for requests made from the constructing thread.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable[[], Any],
+        property_url: str,
+        max_workers: int = 4,
+        queries_per_minute: int = 1200,
+        max_retries: int = 3,
+        service: Any = None
+    ):
+        self.service_factory = service_factory
+        self.property_url = property_url
+        self.max_workers = max(1, max_workers)
+        self.min_interval = 60.0 / queries_per_minute if queries_per_minute else 0.0
+        self.max_retries = max_retries
+        self.requests = 0
+        self._local = threading.local()
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+        if service is not None:
+            self._local.service = service
+
+    def iter_pages(
+        self,
+        request_body: Dict[str, Any],
+        page_size: int,
+        fetch_all: bool = True,
+        shard: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield pages of raw API rows as they arrive, in no particular order.
+
+        Without ``fetch_all`` only the first page of each shard is fetched,
+        starting at the body's ``startRow``.
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        first_row = request_body.get('startRow', 0)
+        shards = date_shards(request_body['startDate'], request_body['endDate'], shard)
+
+        def request(shard_range, start_row):
+            body = {
+                **request_body,
+                'startDate': shard_range[0],
+                'endDate': shard_range[1],
+                'rowLimit': page_size,
+                'startRow': start_row
+            }
+            return shard_range, start_row, self._execute(body)
+
+        # A single unsharded page needs no pool
+        if len(shards) == 1 and not fetch_all:
+            yield request(shards[0], first_row)[2]
+            return
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards)), thread_name_prefix='gsc-fetch')
+        try:
+            running = {pool.submit(request, shard_range, first_row) for shard_range in shards}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard_range, start_row, rows = future.result()
+                    if fetch_all and len(rows) == page_size:
+                        running.add(pool.submit(request, shard_range, start_row + page_size))
+                    if rows:
+                        yield rows
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
+
+    def _throttle(self):
+        with self._throttle_lock:
+            self.requests += 1
+            if not self.min_interval:
+                return
+            now = time.monotonic()
+            wait_for = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+    def _execute(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            try:
+                response = self._service().searchanalytics().query(
+                    siteUrl=self.property_url,
+                    body=body
+                ).execute()
+                rows = response.get('rows', [])
+                logger.debug(
+                    f"Search Console {body['startDate']}..{body['endDate']} "
+                    f"startRow={body['startRow']} returned {len(rows)} rows"
+                )
+                return rows
+            except HttpError as e:
+                status = getattr(e.resp, 'status', None)
+                if attempt >= self.max_retries or (status not in RETRY_STATUSES and 'quota' not in str(e).lower()):
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"Search Console request failed with {status}, retrying in {delay}s: {str(e)}")
+                time.sleep(delay)
+        return []
@@ -0,0 +1,87 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from .search_analytics_fetcher import SearchAnalyticsFetcher, date_shards
+
+
+class FakeSearchConsole:
+    """Serves a fixed number of rows per date range, honouring startRow/rowLimit."""
+
+    def __init__(self, rows_per_range):
+        self.rows_per_range = rows_per_range
+        self.bodies = []
+        self.lock = threading.Lock()
+
+    def searchanalytics(self):
+        return self
+
+    def query(self, siteUrl, body):
+        with self.lock:
+            self.bodies.append(body)
+        total = self.rows_per_range(body['startDate'], body['endDate'])
+        end = min(total, body['startRow'] + body['rowLimit'])
+        rows = [
+            {'keys': [f"{body['startDate']}-q{i}"], 'clicks': 1, 'impressions': 2, 'ctr': 0.5, 'position': 3.0}
+            for i in range(body['startRow'], end)
+        ]
+        return FakeRequest({'rows': rows} if rows else {})
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+def make_fetcher(service):
+    return SearchAnalyticsFetcher(lambda: service, "https://example.com/", max_workers=3, queries_per_minute=0)
+
+
+BODY = {'startDate': '2026-01-01', 'endDate': '2026-01-10', 'dimensions': ['query'], 'startRow': 0}
+
+
+class DateShardTests(SimpleTestCase):
+    def test_week_shards_cover_the_range(self):
+        self.assertEqual(date_shards('2026-01-01', '2026-01-10', 'week'), [
+            ('2026-01-01', '2026-01-07'),
+            ('2026-01-08', '2026-01-10'),
+        ])
+
+    def test_no_shard_keeps_the_range(self):
+        self.assertEqual(date_shards('2026-01-01', '2026-01-10', None), [('2026-01-01', '2026-01-10')])
+
+    def test_invalid_shard_is_rejected(self):
+        with self.assertRaises(ValueError):
+            date_shards('2026-01-01', '2026-01-10', 'month')
+
+
+class SearchAnalyticsFetcherTests(SimpleTestCase):
+    """Tests for paging and date sharding against a fake Search Console"""
+
+    def test_fetch_all_walks_pages_until_a_short_page(self):
+        service = FakeSearchConsole(lambda start, end: 25)
+        pages = list(make_fetcher(service).iter_pages(BODY, page_size=10, fetch_all=True))
+
+        self.assertEqual(sorted(len(page) for page in pages), [5, 10, 10])
+        self.assertEqual(sorted(body['startRow'] for body in service.bodies), [0, 10, 20])
+
+    def test_without_fetch_all_only_the_first_page_is_fetched(self):
+        service = FakeSearchConsole(lambda start, end: 25)
+        pages = list(make_fetcher(service).iter_pages(BODY, page_size=10, fetch_all=False))
+
+        self.assertEqual([len(page) for page in pages], [10])
+        self.assertEqual(len(service.bodies), 1)
+
+    def test_day_shards_are_each_paged(self):
+        service = FakeSearchConsole(lambda start, end: 12)
+        body = {**BODY, 'endDate': '2026-01-03'}
+        pages = list(make_fetcher(service).iter_pages(body, page_size=10, fetch_all=True, shard='day'))
+
+        self.assertEqual(sum(len(page) for page in pages), 36)
+        self.assertEqual({(b['startDate'], b['endDate']) for b in service.bodies}, {
+            ('2026-01-01', '2026-01-01'), ('2026-01-02', '2026-01-02'), ('2026-01-03', '2026-01-03')
+        })
+        self.assertEqual(len(service.bodies), 6)
@@ -0,0 +1,260 @@
+"""Registry-based page check pipeline for the SEO Audit Tool."""
+import logging
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .seo_checkers import SEOChecker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PageRecord:
+    """
+    Compact, picklable view of a crawled page that every page check reads.
+
+    Supports ``get`` and ``[]`` so checks written against page dicts work
+    unchanged. The raw HTML is left out to keep records cheap to send to
+    worker processes.
+    """
+    url: str
+    status_code: int = 200
+    crawl_timestamp: Optional[str] = None
+    title: str = ""
+    meta_description: str = ""
+    h1_tags: List[str] = field(default_factory=list)
+    text_content: str = ""
+    content_type: Optional[str] = None
+    links: Set[str] = field(default_factory=set)
+    internal_links: Set[str] = field(default_factory=set)
+    viewport: Optional[str] = None
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    # OpenGraph data
+    og_title: Optional[str] = None
+    og_description: Optional[str] = None
+    og_image: Optional[str] = None
+    # Canonical data
+    canonical_url: Optional[str] = None
+    canonical_count: int = 0
+    is_pagination: bool = False
+    canonical_chain: List[str] = field(default_factory=list)
+    # Semantic structure data
+    has_semantic_markup: bool = False
+    has_header: bool = False
+    has_nav: bool = False
+    has_main: bool = False
+    has_footer: bool = False
+    has_article: bool = False
+    has_section: bool = False
+    has_aside: bool = False
+    semantic_nesting_issues: List[Dict[str, Any]] = field(default_factory=list)
+    empty_semantic_elements: List[str] = field(default_factory=list)
+    page_type: str = "content"
+    # Robots indexing data
+    noindex: bool = False
+    noindex_source: Optional[str] = None
+    noindex_intentional: bool = False
+    x_robots_tag: Optional[str] = None
+    robots_blocked: bool = False
+    robots_directive: Optional[str] = None
+    robots_user_agent: str = "*"
+    # E-E-A-T data
+    has_author: bool = False
+    author_info: Optional[Any] = None
+    has_expertise: bool = False
+    expertise_indicators: List[str] = field(default_factory=list)
+    has_factual_accuracy: bool = False
+    factual_accuracy_indicators: List[str] = field(default_factory=list)
+    # Redirect data
+    redirect_chain: List[str] = field(default_factory=list)
+    meta_refresh: bool = False
+    meta_refresh_url: Optional[str] = None
+    meta_refresh_delay: Optional[float] = None
+    # Incremental audit data
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    unchanged: bool = False
+
+    @classmethod
+    def from_page(cls, page) -> "PageRecord":
+        """Build a record from a crawled SEOPage, copying the fields both define."""
+        values = vars(page)
+        record = cls(**{name: values[name] for name in RECORD_FIELDS if name in values})
+        record.canonical_count = len(values.get("canonical_tags") or [])
+        return record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in RECORD_FIELDS else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+RECORD_FIELDS = frozenset(f.name for f in fields(PageRecord))
+
+
+@dataclass
+class PageCheck:
+    """A registered page check and the issue list its results go to."""
+    name: str
+    category: str
+    func: Callable[[PageRecord], List[Dict[str, Any]]]
+    # Keep in the calling process, e.g. checks that mostly wait on an LLM
+    in_process: bool = False
+
+
+CHECKS: Dict[str, PageCheck] = {}
+
+
+def register_check(name: str, category: str, in_process: bool = False):
+    """Decorator adding a page check to the registry under ``name``."""
+    def decorator(func):
+        CHECKS[name] = PageCheck(name=name, category=category, func=func, in_process=in_process)
+        return func
+    return decorator
+
+
+for _name, _category, _func, _in_process in (
+    ("meta_tags", "meta_tag_issues", SEOChecker.check_meta_tags, False),
+    ("headings", "heading_issues", SEOChecker.check_headings, False),
+    ("images", "image_issues", SEOChecker.check_images, False),
+    ("content", "content_issues", SEOChecker.check_content, False),
+    ("social_media", "social_media_issues", SEOChecker.check_social_media_tags, False),
+    ("canonical", "canonical_issues", SEOChecker.check_canonical_tags, False),
+    ("semantic_structure", "semantic_issues", SEOChecker.check_semantic_structure, False),
+    ("robots_indexing", "robots_issues", SEOChecker.check_robots_indexing, False),
+    ("eeat", "eeat_issues", SEOChecker.check_eeat_signals, True),
+    ("redirect_chains", "redirect_issues", SEOChecker.check_redirect_chains, False),
+):
+    register_check(_name, _category, in_process=_in_process)(_func)
+
+
+def run_checks(record: PageRecord, names: Iterable[str]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+    """Run the named checks on one page, returning issues and wall time by check."""
+    results = {}
+    timings = {}
+    for name in names:
+        check = CHECKS[name]
+        started = time.perf_counter()
+        try:
+            results[name] = check.func(record) or []
+        except Exception as e:
+            logger.error(f"Check {name} failed for {record.url}: {str(e)}")
+            results[name] = []
+        timings[name] = time.perf_counter() - started
+    return results, timings
+
+
+class CheckPipeline:
+    """
+    Runs the enabled page checks and keeps per-check timing and issue counts.
+
+    Checks can be limited with ``enabled`` or switched off with ``disabled``
+    (registry names, see ``CHECKS``). With ``processes`` the CPU-bound checks
+    run in a process pool while ``in_process`` checks run in the caller;
+    results are then delivered by ``collect``, always on the calling thread.
+    Without a pool, or when one cannot be started (e.g. inside a daemonic
+    Celery worker), checks run inline and results are delivered straight
+    away.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[Iterable[str]] = None,
+        disabled: Optional[Iterable[str]] = None,
+        processes: int = 0
+    ):
+        enabled = set(enabled) if enabled is not None else None
+        disabled = set(disabled or [])
+        unknown = ((enabled or set()) | disabled) - CHECKS.keys()
+        if unknown:
+            raise ValueError(f"Unknown SEO checks: {', '.join(sorted(unknown))}")
+
+        self.checks = [
+            check for name, check in CHECKS.items()
+            if (enabled is None or name in enabled) and name not in disabled
+        ]
+        self.categories = {check.category for check in self.checks}
+        self.stats = {check.name: {"calls": 0, "seconds": 0.0, "issues": 0} for check in self.checks}
+        self._pool = ProcessPoolExecutor(max_workers=processes) if processes > 0 else None
+        # (future, record, pooled check names, inline results, inline timings, callback)
+        self._pending: List[Tuple[Future, PageRecord, List[str], Dict, Dict, Callable]] = []
+
+    def submit(self, record: PageRecord, callback: Callable[[PageRecord, Dict[str, List[Dict[str, Any]]]], None]):
+        """Check a page; ``callback(record, issues_by_category)`` gets the results."""
+        pooled = [check.name for check in self.checks if self._pool is not None and not check.in_process]
+        future = None
+        if pooled:
+            try:
+                future = self._pool.submit(run_checks, record, pooled)
+            except Exception as e:
+                logger.warning(f"Could not use the check process pool, running checks inline: {str(e)}")
+                self._shutdown_pool()
+                pooled = []
+
+        local = [check.name for check in self.checks if check.name not in pooled]
+        results, timings = run_checks(record, local)
+        if future is None:
+            self._finish(record, results, timings, callback)
+        else:
+            self._pending.append((future, record, pooled, results, timings, callback))
+
+    def collect(self, wait: bool = False):
+        """Deliver the results of pooled checks that have finished (or all, with ``wait``)."""
+        pending, self._pending = self._pending, []
+        for item in pending:
+            future, record, pooled, results, timings, callback = item
+            if not wait and not future.done():
+                self._pending.append(item)
+                continue
+            try:
+                remote_results, remote_timings = future.result()
+            except Exception as e:
+                logger.warning(f"Pooled checks failed for {record.url}, running them inline: {str(e)}")
+                remote_results, remote_timings = run_checks(record, pooled)
+            self._finish(record, {**results, **remote_results}, {**timings, **remote_timings}, callback)
+
+    def close(self):
+        """Wait for outstanding pages and stop the process pool."""
+        try:
+            self.collect(wait=True)
+        finally:
+            self._shutdown_pool()
+
+    def timing_report(self) -> List[Dict[str, Any]]:
+        """Per-check totals, slowest first."""
+        categories = {check.name: check.category for check in self.checks}
+        report = [
+            {
+                "check": name,
+                "category": categories[name],
+                "calls": stats["calls"],
+                "seconds": round(stats["seconds"], 4),
+                "avg_ms": round(stats["seconds"] * 1000 / stats["calls"], 2) if stats["calls"] else 0.0,
+                "issues": stats["issues"]
+            }
+            for name, stats in self.stats.items()
+        ]
+        report.sort(key=lambda row: row["seconds"], reverse=True)
+        return report
+
+    def _finish(self, record, results, timings, callback):
+        issues_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for check in self.checks:
+            check_issues = results.get(check.name, [])
+            stats = self.stats[check.name]
+            stats["calls"] += 1
+            stats["seconds"] += timings.get(check.name, 0.0)
+            stats["issues"] += len(check_issues)
+            issues_by_category.setdefault(check.category, []).extend(check_issues)
+        callback(record, issues_by_category)
+
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,99 @@
+"""Incremental issue aggregation for the SEO Audit Tool."""
+from collections import Counter
+from typing import Callable, Dict, List, Any, Optional
+
+
+class IssueAccumulator:
+    """
+    Collects audit issues as pages are analysed.
+
+    Issues are appended per page instead of rebuilding the full list after
+    every page. Running per-type and per-severity counters are kept alongside,
+    and only the issues added since the last progress update are handed to the
+    progress callback.
+
+    With a ``sink``, every batch of new issues is also passed to it as it is
+    found, e.g. to persist them during the audit. ``keep=False`` then leaves
+    the issue lists out of the results altogether.
+    """
+
+    def __init__(
+        self,
+        audit_results: Dict[str, Any],
+        sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        keep: bool = True
+    ):
+        self.audit_results = audit_results
+        self.sink = sink
+        self.keep = keep
+        self.total = 0
+        self.by_type: Counter = Counter()
+        self.by_severity: Counter = Counter()
+        self._categories: Dict[str, List[Dict[str, Any]]] = {}
+        self._recent: List[Dict[str, Any]] = []
+
+    def add(self, category: str, issues: Optional[List[Dict[str, Any]]], store: bool = True, notify: bool = True) -> int:
+        """
+        Record new issues for a category and return how many were added.
+
+        Args:
+            category: Issue list name, e.g. "meta_tag_issues"
+            issues: Issues found for one page or check
+            store: Also extend ``audit_results[category]``. Pass False for
+                issues that already live elsewhere in the results (sitemap,
+                SSL) so they are only counted and flattened.
+            notify: Queue the issues for the next progress update
+        """
+        if not issues:
+            return 0
+
+        if self.sink is not None:
+            self.sink(issues)
+
+        if self.keep:
+            if category not in self._categories:
+                if store:
+                    self._categories[category] = self.audit_results.setdefault(category, [])
+                else:
+                    self._categories[category] = []
+            self._categories[category].extend(issues)
+
+        for issue in issues:
+            self.by_type[issue.get('type') or category] += 1
+            self.by_severity[issue.get('severity', 'medium')] += 1
+            if notify:
+                self._recent.append(self.format_for_progress(issue))
+
+        self.total += len(issues)
+        return len(issues)
+
+    def drain_recent(self) -> List[Dict[str, Any]]:
+        """Return the issues added since the last call and forget them."""
+        recent, self._recent = self._recent, []
+        return recent
+
+    def flatten(self) -> List[Dict[str, Any]]:
+        """Build the flat issue list for the final report, grouped by category."""
+        all_issues = []
+        for issues in self._categories.values():
+            all_issues.extend(issues)
+        return all_issues
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters for the audit summary."""
+        return {
+            "issues_by_type": dict(self.by_type),
+            "issues_by_severity": dict(self.by_severity)
+        }
+
+    @staticmethod
+    def format_for_progress(issue: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape an issue the way the audit progress UI expects."""
+        return {
+            'severity': issue.get('severity', 'medium'),
+            'issue_type': issue.get('type'),
+            'url': issue.get('url'),
+            'details': issue.get('issue'),
+            'value': issue.get('value'),
+            'additional_details': issue.get('details', {})
+        }
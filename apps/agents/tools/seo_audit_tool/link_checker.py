@@ -0,0 +1,262 @@
+"""Pooled broken-link checker for the SEO Audit Tool."""
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Any, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+}
+
+CACHE_PREFIX = "link_status:"
+
+
+class LinkChecker:
+    """
+    Validates link targets with one pooled aiohttp session.
+
+    Targets are de-duplicated before checking, so a link that appears on every
+    page is requested once. Cached statuses are read and written in bulk
+    (``cache.get_many``/``cache.set_many``) under the ``link_status:*`` keys.
+    Checks in flight are capped overall and per host before a request starts,
+    so time spent queueing for a connection never counts towards ``timeout``,
+    which applies to connecting and to each socket read.
+
+    A HEAD request is tried first and GET is used when the server rejects or
+    fails it. The ETag and Last-Modified validators of healthy links are kept
+    in the cache beyond ``fresh_for``. When such an entry goes stale, the link
+    is revalidated with a conditional request, and a 304 reuses the previous
+    result.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_connections_per_host: int = 4,
+        timeout: float = 5.0,
+        max_retries: int = 3,
+        fresh_for: int = 86400,
+        cache_timeout: int = 7 * 86400,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.fresh_for = fresh_for
+        self.cache_timeout = cache_timeout
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "LinkChecker":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the shared session and connection pool."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+            )
+            self._slots = asyncio.Semaphore(self.max_connections)
+            self._host_slots = {}
+
+    async def close(self):
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def check_links(self, links: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Check (source_url, target_url) pairs and return the broken ones.
+
+        Each broken target is reported once for every page linking to it.
+        """
+        sources_by_target: Dict[str, List[str]] = defaultdict(list)
+        for source_url, target_url in links:
+            sources_by_target[target_url].append(source_url)
+
+        statuses = await self.check_urls(sources_by_target.keys())
+
+        broken_links = []
+        for target_url, sources in sources_by_target.items():
+            result = statuses.get(target_url)
+            if not result or not result.get('is_broken'):
+                continue
+            for source_url in sources:
+                broken_links.append({
+                    "source_url": source_url,
+                    "target_url": target_url,
+                    "status_code": result.get('status_code'),
+                    "error": result.get('error'),
+                    "timestamp": datetime.now().isoformat()
+                })
+        return broken_links
+
+    async def check_urls(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the status of each distinct URL, from cache where still fresh."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+
+        cached = self._cache_get_many(urls)
+        results: Dict[str, Dict[str, Any]] = {}
+        to_check: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        for url in urls:
+            entry = cached.get(url)
+            if entry is not None and self._is_fresh(entry):
+                results[url] = entry
+            else:
+                to_check.append((url, entry))
+
+        logger.info(f"Checking {len(to_check)} links ({len(results)} cached of {len(urls)} unique)")
+        if not to_check:
+            return results
+
+        await self.open()
+        checked = await asyncio.gather(*(self._check(url, entry) for url, entry in to_check))
+        updates = dict(zip((url for url, _ in to_check), checked))
+        results.update(updates)
+        self._cache_set_many(updates)
+        return results
+
+    async def check_url(self, url: str) -> Dict[str, Any]:
+        """Status of a single URL."""
+        return (await self.check_urls([url]))[url]
+
+    async def _check(self, url: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        conditional = self._conditional_headers(previous)
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with self._slot(url):
+                    status, response_headers = await self._request('HEAD', url, conditional)
+                    # Some servers reject or mishandle HEAD, so confirm failures with GET
+                    if status >= 400:
+                        status, response_headers = await self._request('GET', url, conditional)
+
+                if status == 304 and previous is not None:
+                    return {**previous, 'checked_at': datetime.now().isoformat()}
+                return self._result(status, response_headers)
+
+            except asyncio.TimeoutError:
+                if attempt == self.max_retries:
+                    return self._error_result(f"Timeout after {self.max_retries} retries")
+                await asyncio.sleep(1)  # Wait before retrying
+            except Exception as e:
+                return self._error_result(str(e))
+
+        return self._error_result('Unknown error')
+
+    @asynccontextmanager
+    async def _slot(self, url: str):
+        """Hold one of the host's slots, then one of the overall slots."""
+        host = urlparse(url).netloc
+        host_slots = self._host_slots.get(host)
+        if host_slots is None:
+            host_slots = self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        async with host_slots, self._slots:
+            yield
+
+    async def _request(self, method: str, url: str, headers: Dict[str, str]) -> Tuple[int, Mapping[str, str]]:
+        try:
+            async with self._session.request(method, url, headers=headers, allow_redirects=True) as response:
+                # The body is never read; releasing the response drops it
+                return response.status, response.headers.copy()
+        except asyncio.TimeoutError:
+            # ServerTimeoutError is also a ClientError; timeouts go to the retry path
+            raise
+        except aiohttp.ClientError:
+            if method == 'HEAD':
+                return await self._request('GET', url, headers)
+            raise
+
+    def _result(self, status: int, response_headers: Mapping[str, str]) -> Dict[str, Any]:
+        is_broken = status >= 400
+        result = {
+            'is_broken': is_broken,
+            'status_code': status,
+            'error': f"HTTP {status}" if is_broken else None,
+            'checked_at': datetime.now().isoformat()
+        }
+        if not is_broken:
+            result['etag'] = response_headers.get('ETag')
+            result['last_modified'] = response_headers.get('Last-Modified')
+        return result
+
+    @staticmethod
+    def _error_result(error: str) -> Dict[str, Any]:
+        return {
+            'is_broken': True,
+            'status_code': None,
+            'error': error,
+            'checked_at': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _conditional_headers(previous: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not previous or previous.get('is_broken'):
+            return {}
+        headers = {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        try:
+            checked_at = datetime.fromisoformat(entry['checked_at'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now() - checked_at < timedelta(seconds=self.fresh_for)
+
+    def _cache_get_many(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            cached = cache.get_many([f"{CACHE_PREFIX}{url}" for url in urls])
+        except Exception as e:
+            logger.warning(f"Error reading link status cache: {str(e)}")
+            return {}
+        return {key[len(CACHE_PREFIX):]: value for key, value in cached.items()}
+
+    def _cache_set_many(self, results: Dict[str, Dict[str, Any]]):
+        # Healthy links with validators are kept past their freshness window so
+        # they can be revalidated conditionally; everything else expires with it
+        long_lived = {}
+        short_lived = {}
+        for url, result in results.items():
+            if result.get('etag') or result.get('last_modified'):
+                long_lived[f"{CACHE_PREFIX}{url}"] = result
+            else:
+                short_lived[f"{CACHE_PREFIX}{url}"] = result
+        try:
+            if long_lived:
+                cache.set_many(long_lived, timeout=self.cache_timeout)
+            if short_lived:
+                cache.set_many(short_lived, timeout=self.fresh_for)
+        except Exception as e:
+            logger.warning(f"Error writing link status cache: {str(e)}")
@@ -0,0 +1,184 @@
+"""Near-duplicate content detection for the SEO Audit Tool using MinHash LSH."""
+import logging
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+# Mersenne prime used for the universal hash family; products of two values
+# below it fit in uint64 without overflow
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+class NearDuplicateIndex:
+    """
+    Streaming MinHash LSH index over page text.
+
+    Each page is reduced to word shingles and a fixed-size MinHash signature.
+    Signatures are split into bands; pages sharing a band bucket become
+    candidate pairs, and only those are compared. Indexing and querying are
+    therefore roughly linear in the number of pages instead of comparing
+    every pair.
+
+    Pages whose estimated Jaccard similarity reaches ``threshold`` are merged
+    into clusters with union-find.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        self._parent: Dict[str, str] = {}
+        self._edges: Dict[Tuple[str, str], float] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hash the word n-grams of a text to 31-bit integers."""
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return set()
+        if len(words) < self.shingle_size:
+            return {zlib.crc32(' '.join(words).encode('utf-8')) & 0x7FFFFFFF}
+        return {
+            zlib.crc32(' '.join(words[i:i + self.shingle_size]).encode('utf-8')) & 0x7FFFFFFF
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text, or None if it has no words."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Estimated Jaccard similarity of two texts."""
+        sig1, sig2 = self.signature(text1), self.signature(text2)
+        if sig1 is None or sig2 is None:
+            return 0.0
+        return float(np.mean(sig1 == sig2))
+
+    def add(self, url: str, text: str) -> List[Tuple[str, float]]:
+        """
+        Index a page and return the already indexed pages it near-duplicates.
+
+        Returns a list of (url, estimated similarity) pairs.
+        """
+        if not text or url in self._signatures:
+            return []
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        return self._index(url, sig)
+
+    def export_signature(self, url: str) -> Optional[str]:
+        """Signature of an indexed page as a compact string, for ``add_signature``."""
+        sig = self._signatures.get(url)
+        if sig is None:
+            return None
+        # Values are below the 31-bit prime, so they fit in uint32
+        return sig.astype('<u4').tobytes().hex()
+
+    def add_signature(self, url: str, exported: Optional[str]) -> List[Tuple[str, float]]:
+        """Index a page from a signature saved with ``export_signature``."""
+        if not exported or url in self._signatures:
+            return []
+        try:
+            sig = np.frombuffer(bytes.fromhex(exported), dtype='<u4').astype(np.uint64)
+        except ValueError:
+            return []
+        if len(sig) != self.num_perm:
+            return []
+        return self._index(url, sig)
+
+    def _index(self, url: str, sig: np.ndarray) -> List[Tuple[str, float]]:
+        candidates = set()
+        for band in range(self.bands):
+            key = (band, sig[band * self.rows:(band + 1) * self.rows].tobytes())
+            bucket = self._buckets[key]
+            candidates.update(bucket)
+            bucket.append(url)
+
+        self._signatures[url] = sig
+        self._parent[url] = url
+
+        matches = []
+        for other in candidates:
+            score = float(np.mean(sig == self._signatures[other]))
+            if score >= self.threshold:
+                matches.append((other, score))
+                self._edges[(other, url)] = score
+                self._union(other, url)
+        return matches
+
+    def clusters(self) -> List[Dict[str, Any]]:
+        """
+        Near-duplicate clusters of two or more pages.
+
+        ``similarity`` is the lowest pairwise score (as a percentage) that
+        linked the cluster together, ``average_similarity`` the mean.
+        """
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for url in self._signatures:
+            groups[self._find(url)].append(url)
+
+        scores: Dict[str, List[float]] = defaultdict(list)
+        for (url1, _), score in self._edges.items():
+            scores[self._find(url1)].append(score)
+
+        clusters = []
+        for root, urls in groups.items():
+            if len(urls) < 2:
+                continue
+            cluster_scores = scores[root]
+            clusters.append({
+                "urls": urls,
+                "similarity": round(min(cluster_scores) * 100),
+                "average_similarity": round(sum(cluster_scores) / len(cluster_scores) * 100, 1),
+                "cluster_size": len(urls),
+                "timestamp": datetime.now().isoformat()
+            })
+        clusters.sort(key=lambda cluster: cluster["cluster_size"], reverse=True)
+        return clusters
+
+    def _find(self, url: str) -> str:
+        root = url
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Path compression
+        while self._parent[url] != root:
+            self._parent[url], url = root, self._parent[url]
+        return root
+
+    def _union(self, url1: str, url2: str):
+        root1, root2 = self._find(url1), self._find(url2)
+        if root1 != root2:
+            self._parent[root2] = root1
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, List, Any, Optional, Type, Set
+from typing import Callable, Dict, List, Any, Optional, Type, Set
 from datetime import datetime
 import logging
 import asyncio
@@ -12,6 +12,7 @@ from urllib.parse import urlparse, urljoin
 from pydantic import BaseModel, Field
 from apps.agents.tools.base_tool import BaseTool
 import dotenv
+from django.conf import settings
 from django.core.cache import cache
 import re
 
@@ -19,7 +20,11 @@ from apps.agents.tools.crawl_website_tool.crawl_website_tool import CrawlWebsite
 from apps.agents.tools.seo_crawler_tool.seo_crawler_tool import SEOCrawlerTool
 from apps.common.utils import normalize_url
 from apps.agents.utils import URLDeduplicator
-from .seo_checkers import SEOChecker
+from .seo_checkers import SEOChecker, SITEMAP_DIRECTIVE_PATTERN
+from .issue_accumulator import IssueAccumulator
+from .check_pipeline import CheckPipeline, PageRecord
+from .near_duplicates import NearDuplicateIndex
+from .link_checker import LinkChecker
 from apps.agents.tools.pagespeed_tool.pagespeed_tool import PageSpeedTool
 
 dotenv.load_dotenv()
@@ -60,6 +65,10 @@ class SEOAuditTool(BaseTool):
     url_deduplicator: URLDeduplicator = Field(default_factory=URLDeduplicator)
     checker: SEOChecker = Field(default_factory=SEOChecker)
     pagespeed_tool: PageSpeedTool = Field(default_factory=PageSpeedTool)
+    duplicate_similarity_threshold: float = Field(
+        default=0.85,
+        description="Estimated Jaccard similarity at which pages are reported as near-duplicates"
+    )
 
     model_config = {"arbitrary_types_allowed": True}
     
@@ -79,9 +88,33 @@ class SEOAuditTool(BaseTool):
         check_external_links: bool = False,
         crawl_delay: float = 1.0,
         progress_callback = None,
+        issue_callback = None,
+        previous_state: Optional[Dict[str, Dict[str, Any]]] = None,
+        load_previous_state: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = None,
+        page_state_callback = None,
+        checks: Optional[List[str]] = None,
+        skip_checks: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
-        """Run SEO audit."""
+        """
+        Run SEO audit.
+
+        With an ``issue_callback``, issues are handed to it in batches as they
+        are found and are left out of the returned results.
+
+        Each page's state (validators, links, check results, metrics and
+        near-duplicate signature) is handed to ``page_state_callback`` as the
+        page is analysed. ``previous_state`` maps the URLs of an earlier audit
+        of the same site to their validators and links. Pages are then
+        fetched conditionally, and pages that have not changed keep their
+        earlier check results instead of being checked again; those results
+        are read with ``load_previous_state(urls)`` (by default from
+        ``previous_state`` itself).
+
+        ``checks`` limits the page checks to the given registry names and
+        ``skip_checks`` switches checks off (see ``check_pipeline.CHECKS``).
+        Per-check timings are reported in ``summary['check_timings']``.
+        """
         logger.info(f"Starting SEO audit for: {website}")
         start_time = datetime.now()
         
@@ -93,7 +126,13 @@ class SEOAuditTool(BaseTool):
                 max_pages=max_pages,
                 check_external_links=check_external_links,
                 crawl_delay=crawl_delay,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                issue_callback=issue_callback,
+                previous_state=previous_state,
+                load_previous_state=load_previous_state,
+                page_state_callback=page_state_callback,
+                checks=checks,
+                skip_checks=skip_checks
             ))
             end_time = datetime.now()
             if 'summary' not in result:
@@ -119,7 +158,13 @@ class SEOAuditTool(BaseTool):
         max_pages: int = 100,
         check_external_links: bool = False,
         crawl_delay: float = 1.0,
-        progress_callback = None
+        progress_callback = None,
+        issue_callback = None,
+        previous_state: Optional[Dict[str, Dict[str, Any]]] = None,
+        load_previous_state: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = None,
+        page_state_callback = None,
+        checks: Optional[List[str]] = None,
+        skip_checks: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Run SEO audit asynchronously."""
         logger.info("Starting crawler...")
@@ -132,7 +177,6 @@ class SEOAuditTool(BaseTool):
                 'status': 'Starting crawler...'
             })
 
-        total_issues = 0  # Initialize total_issues at the module level
         audit_results = {
             "broken_links": [],
             "duplicate_content": [],
@@ -144,110 +188,85 @@ class SEOAuditTool(BaseTool):
             "robots_txt_present": False,
             "page_analysis": []
         }
+        issues = IssueAccumulator(audit_results, sink=issue_callback, keep=issue_callback is None)
+        # Pages are shingled into the near-duplicate index as they stream in
+        duplicate_index = NearDuplicateIndex(threshold=self.duplicate_similarity_threshold)
 
         last_progress_data = {}
         all_links = set()
         base_domain = urlparse(website).netloc
+        previous_state = previous_state or {}
+        # Unchanged pages, restored from the previous audit once the crawl is done
+        unchanged_records: List[PageRecord] = []
+        not_found_urls: List[str] = []
+        pipeline = CheckPipeline(
+            enabled=checks,
+            disabled=skip_checks,
+            processes=getattr(settings, 'SEO_AUDIT_CHECK_PROCESSES', 0)
+        )
 
-        def page_callback(page_data):
-            nonlocal total_issues, last_progress_data
-            
-            # Check meta tags
-            meta_issues = self.checker.check_meta_tags(page_data)
-            if meta_issues:
-                audit_results["meta_tag_issues"].extend(meta_issues)
-                total_issues += len(meta_issues)
-            
-            # Check headings
-            heading_issues = self.checker.check_headings(page_data)
-            if heading_issues:
-                audit_results["heading_issues"] = audit_results.get("heading_issues", [])
-                audit_results["heading_issues"].extend(heading_issues)
-                total_issues += len(heading_issues)
-            
-            # Check images
-            image_issues = self.checker.check_images(page_data)
-            if image_issues:
-                audit_results["image_issues"] = audit_results.get("image_issues", [])
-                audit_results["image_issues"].extend(image_issues)
-                total_issues += len(image_issues)
-            
-            # Check content
-            content_issues = self.checker.check_content(page_data)
-            if content_issues:
-                audit_results["content_issues"] = audit_results.get("content_issues", [])
-                audit_results["content_issues"].extend(content_issues)
-                total_issues += len(content_issues)
-
-            # Check social media tags
-            social_media_issues = self.checker.check_social_media_tags(page_data)
-            if social_media_issues:
-                audit_results["social_media_issues"] = audit_results.get("social_media_issues", [])
-                audit_results["social_media_issues"].extend(social_media_issues)
-                total_issues += len(social_media_issues)
-
-            # Check canonical tags
-            canonical_issues = self.checker.check_canonical_tags(page_data)
-            if canonical_issues:
-                audit_results["canonical_issues"] = audit_results.get("canonical_issues", [])
-                audit_results["canonical_issues"].extend(canonical_issues)
-                total_issues += len(canonical_issues)
-
-            # Add semantic structure checks
-            semantic_issues = self.checker.check_semantic_structure(page_data)
-            if semantic_issues:
-                audit_results["semantic_issues"] = audit_results.get("semantic_issues", [])
-                audit_results["semantic_issues"].extend(semantic_issues)
-                total_issues += len(semantic_issues)
-
-            # Add robots indexing checks
-            robots_issues = self.checker.check_robots_indexing(page_data)
-            if robots_issues:
-                audit_results["robots_issues"] = audit_results.get("robots_issues", [])
-                audit_results["robots_issues"].extend(robots_issues)
-                total_issues += len(robots_issues)
-
-            # Add E-E-A-T signal checks
-            eeat_issues = self.checker.check_eeat_signals(page_data)
-            if eeat_issues:
-                audit_results["eeat_issues"] = audit_results.get("eeat_issues", [])
-                audit_results["eeat_issues"].extend(eeat_issues)
-                total_issues += len(eeat_issues)
-
-            # Add redirect chain checks
-            redirect_issues = self.checker.check_redirect_chains(page_data)
-            if redirect_issues:
-                audit_results["redirect_issues"] = audit_results.get("redirect_issues", [])
-                audit_results["redirect_issues"].extend(redirect_issues)
-                total_issues += len(redirect_issues)
-            
-            # Collect internal links
-            internal_links = self.checker.check_links(page_data, base_domain)
-            for link in internal_links:
-                all_links.add((page_data["url"], link))
-            
-            # Update progress data with all issues
-            all_issues = []
-            for issue_type, issues in audit_results.items():
-                if issue_type.endswith('_issues'):
-                    for issue in issues:
-                        all_issues.append({
-                            'severity': issue.get('severity', 'medium'),
-                            'issue_type': issue.get('type'),
-                            'url': issue.get('url'),
-                            'details': issue.get('issue'),
-                            'value': issue.get('value'),
-                            'additional_details': issue.get('details', {})
-                        })
+        def page_callback(record: PageRecord):
+            if record.unchanged and record.url in previous_state:
+                unchanged_records.append(record)
+            else:
+                pipeline.submit(record, analyse_page)
+            # Pick up pages whose checks finished in the process pool
+            pipeline.collect()
+
+        def restore_page(record: PageRecord, previous: Dict[str, Any]):
+            # Unchanged since the previous audit, so its results still hold
+            found = {
+                category: category_issues
+                for category, category_issues in (previous.get("checks") or {}).items()
+                if category in pipeline.categories
+            }
+            metrics = {**(previous.get("metrics") or {}), "timestamp": record.crawl_timestamp}
+            duplicate_index.add_signature(record.url, previous.get("signature"))
+            record_page(record, found, metrics, previous.get("is_404", False))
+
+        def analyse_page(record: PageRecord, found: Dict[str, List[Dict[str, Any]]]):
+            is_404 = self.checker.is_404_page(record)
+            # Index content for near-duplicate detection, skipping 404 pages
+            if record.text_content and not is_404:
+                duplicate_index.add(record.url, record.text_content)
+            record_page(record, found, self.checker.get_page_metrics(record), is_404)
+
+        def record_page(record: PageRecord, found: Dict[str, List[Dict[str, Any]]], metrics: Dict[str, Any], is_404: bool):
+            url = record.url
+            new_issues = 0
+            for category, category_issues in found.items():
+                new_issues += issues.add(category, category_issues)
+            if is_404:
+                not_found_urls.append(url)
+
+            if page_state_callback:
+                page_state_callback({
+                    "url": url,
+                    "etag": record.etag,
+                    "last_modified": record.last_modified,
+                    "content_hash": record.content_hash,
+                    "status_code": record.status_code,
+                    "links": sorted(record.links),
+                    "internal_links": sorted(record.internal_links),
+                    "checks": {category: category_issues for category, category_issues in found.items() if category_issues},
+                    "metrics": metrics,
+                    "is_404": is_404,
+                    "signature": duplicate_index.export_signature(url)
+                })
+
+            # Collect internal links, plus external ones when requested
+            if check_external_links:
+                page_links = record.links
+            else:
+                page_links = self.checker.check_links(record, base_domain)
+            for link in page_links:
+                all_links.add((url, link))
             
-            if all_issues:
-                last_progress_data['recent_issues'] = all_issues
-                last_progress_data['status'] = f"Found {len(all_issues)} issues on {page_data['url']}"
+            if new_issues:
+                last_progress_data['status'] = f"Found {new_issues} issues on {url}"
             
             # Add page metrics
-            audit_results["page_analysis"].append(
-                self.checker.get_page_metrics(page_data)
-            )
+            audit_results["page_analysis"].append(metrics)
 
         # Modify crawler call to use page callback
         def wrapped_progress_callback(data):
@@ -255,88 +274,63 @@ class SEOAuditTool(BaseTool):
                 update_data = {
                     'percent_complete': int(data.get('percent_complete', 0) * 0.7),  # First 70% for crawling
                     'pages_analyzed': data.get('pages_analyzed', 0),
-                    'issues_found': total_issues,  # Now using the correct total_issues
-                    'status': last_progress_data.get('status', f"Analyzing: {data.get('status', '')}")
+                    'issues_found': issues.total,
+                    'status': last_progress_data.pop('status', f"Analyzing: {data.get('status', '')}")
                 }
-                if 'recent_issues' in last_progress_data:
-                    update_data['recent_issues'] = last_progress_data['recent_issues']
-                    last_progress_data.clear()  # Clear after sending
+                # Only the issues found since the previous update
+                recent_issues = issues.drain_recent()
+                if recent_issues:
+                    update_data['recent_issues'] = recent_issues
                 progress_callback(update_data)
 
-        # Create a wrapper for the page callback that ensures it's called for each page
         def wrapped_page_callback(page):
-            page_data = {
-                "url": page.url,
-                "title": page.title,
-                "meta_description": page.meta_description,
-                "h1_tags": page.h1_tags,
-                "links": page.links,
-                "text_content": page.text_content,
-                "crawl_timestamp": page.crawl_timestamp,
-                "status_code": page.status_code,
-                "canonical_url": getattr(page, 'canonical_url', None),
-                "canonical_count": len(page.canonical_tags) if hasattr(page, 'canonical_tags') else 0,
-                "is_pagination": bool(page.pagination_info) if hasattr(page, 'pagination_info') else False,
-                "canonical_chain": page.canonical_chain if hasattr(page, 'canonical_chain') else [],
-                # Add semantic structure data
-                "has_semantic_markup": getattr(page, 'has_semantic_markup', False),
-                "has_header": getattr(page, 'has_header', False),
-                "has_nav": getattr(page, 'has_nav', False),
-                "has_main": getattr(page, 'has_main', False),
-                "has_footer": getattr(page, 'has_footer', False),
-                "semantic_nesting_issues": getattr(page, 'semantic_nesting_issues', []),
-                "empty_semantic_elements": getattr(page, 'empty_semantic_elements', []),
-                "page_type": getattr(page, 'page_type', 'content'),
-                # Add robots indexing data
-                "noindex": getattr(page, 'noindex', False),
-                "noindex_source": getattr(page, 'noindex_source', None),
-                "noindex_intentional": getattr(page, 'noindex_intentional', False),
-                "x_robots_tag": getattr(page, 'x_robots_tag', None),
-                "robots_blocked": getattr(page, 'robots_blocked', False),
-                "robots_directive": getattr(page, 'robots_directive', None),
-                "robots_user_agent": getattr(page, 'robots_user_agent', '*'),
-                # Add E-E-A-T data
-                "has_author": getattr(page, 'has_author', False),
-                "author_info": getattr(page, 'author_info', None),
-                "has_expertise": getattr(page, 'has_expertise', False),
-                "expertise_indicators": getattr(page, 'expertise_indicators', []),
-                "has_factual_accuracy": getattr(page, 'has_factual_accuracy', False),
-                "factual_accuracy_indicators": getattr(page, 'factual_accuracy_indicators', []),
-                "content_type": getattr(page, 'content_type', None),
-                # Add redirect chain data
-                "redirect_chain": getattr(page, 'redirect_chain', []),
-                "meta_refresh": getattr(page, 'meta_refresh', False),
-                "meta_refresh_url": getattr(page, 'meta_refresh_url', None),
-                "meta_refresh_delay": getattr(page, 'meta_refresh_delay', None)
-            }
-            page_callback(page_data)
+            page_callback(PageRecord.from_page(page))
             return page
 
-        crawler_results = await asyncio.to_thread(
-            self.seo_crawler._run,
-            website_url=website,
-            max_pages=max_pages,
-            respect_robots_txt=True,
-            crawl_delay=crawl_delay,
-            page_callback=wrapped_page_callback,
-            progress_callback=wrapped_progress_callback
-        )
+        try:
+            crawler_results = await asyncio.to_thread(
+                self.seo_crawler._run,
+                website_url=website,
+                max_pages=max_pages,
+                respect_robots_txt=True,
+                crawl_delay=crawl_delay,
+                page_callback=wrapped_page_callback,
+                progress_callback=wrapped_progress_callback,
+                previous_pages=previous_state
+            )
+        finally:
+            # Wait for pages still being checked in the process pool
+            pipeline.close()
+
+        if unchanged_records:
+            if load_previous_state is None:
+                load_previous_state = lambda urls: {url: previous_state[url] for url in urls}
+            # Read off the event loop; the stored results may come from the database
+            stored = await asyncio.to_thread(load_previous_state, [record.url for record in unchanged_records])
+            for record in unchanged_records:
+                restore_page(record, stored.get(record.url) or {})
+        check_timings = pipeline.timing_report()
+        logger.info("Slowest checks: " + ", ".join(
+            f"{row['check']} {row['seconds']}s ({row['calls']} pages)" for row in check_timings[:3]
+        ))
         pages = crawler_results.get('pages', [])
         total_pages = len(pages)
-        logger.info(f"Crawler completed. Found {total_pages} pages")
+        unchanged_pages = crawler_results.get('unchanged_pages', 0)
+        logger.info(f"Crawler completed. Found {total_pages} pages ({unchanged_pages} unchanged)")
 
         # Check broken links (70-85%)
         if progress_callback:
             progress_callback({
                 'percent_complete': 70,
                 'pages_analyzed': total_pages,
-                'issues_found': total_issues,
+                'issues_found': issues.total,
                 'status': 'Checking broken links...'
             })
 
         logger.info("Checking for broken links...")
-        await self._check_broken_links(all_links, audit_results)
-        total_issues += len(audit_results["broken_links"])
+        link_results = {"broken_links": []}
+        await self._check_broken_links(all_links, link_results)
+        issues.add("broken_links", link_results["broken_links"])
         logger.info(f"Found {len(audit_results['broken_links'])} broken links")
 
         # Check duplicate content (85-95%)
@@ -344,45 +338,36 @@ class SEOAuditTool(BaseTool):
             progress_callback({
                 'percent_complete': 75,
                 'pages_analyzed': total_pages,
-                'issues_found': total_issues,
+                'issues_found': issues.total,
                 'status': 'Checking for duplicate content...'
             })
 
         logger.info("Checking for duplicate content...")
-        # Filter out 404 pages before duplicate content check
-        valid_pages = [page for page in pages if not self.checker.is_404_page(page)]
-        logger.info(f"Found {len(pages) - len(valid_pages)} potential 404 pages out of {len(pages)} total pages")
+        # 404 pages were left out of the near-duplicate index during the crawl
+        logger.info(f"Found {len(not_found_urls)} potential 404 pages out of {total_pages} total pages")
 
         # Add 404 pages as issues
-        for page in pages:
-            if self.checker.is_404_page(page):
-                audit_results["meta_tag_issues"].append({
-                    "url": page["url"],
-                    "issues": [{
-                        "type": "404",
-                        "issue": "Page returns 404 status or appears to be a 404 page",
-                        "value": None,
-                        "severity": "high"
-                    }]
-                })
-                total_issues += 1
-
-        # Check duplicate content
-        content_map = defaultdict(list)
-        for page in valid_pages:
-            content = page.get('text_content', '').strip()
-            if content:
-                content_hash = hash(content)
-                content_map[content_hash].append(page['url'])
-        
-        for urls in content_map.values():
-            if len(urls) > 1:
-                audit_results["duplicate_content"].append({
-                    "urls": urls,
-                    "similarity": 100,
-                    "timestamp": datetime.now().isoformat()
-                })
-                total_issues += 1
+        issues.add("meta_tag_issues", [
+            self.checker.create_issue(
+                issue_type="404",
+                issue="Page returns 404 status or appears to be a 404 page",
+                url=url,
+                severity="high"
+            )
+            for url in not_found_urls
+        ])
+
+        # Report near-duplicate clusters from the index built during the crawl
+        issues.add("duplicate_content", [
+            {
+                **cluster,
+                "type": "duplicate_content",
+                "url": cluster["urls"][0],
+                "issue": f"{cluster['cluster_size']} pages share at least {cluster['similarity']}% of their content",
+                "severity": "medium"
+            }
+            for cluster in duplicate_index.clusters()
+        ])
 
         logger.info(f"Found {len(audit_results['duplicate_content'])} duplicate content issues")
 
@@ -390,22 +375,23 @@ class SEOAuditTool(BaseTool):
             progress_callback({
                 'percent_complete': 80,
                 'pages_analyzed': total_pages,
-                'issues_found': total_issues,
+                'issues_found': issues.total,
                 'status': 'Checking SSL, robots.txt and sitemap...'
             })
 
         logger.info("Checking SSL...")
         await self._check_ssl(website, audit_results)
+        issues.add("ssl_errors", audit_results["ssl_issues"].get("errors", []), store=False)
         
         logger.info("Checking robots.txt and sitemap...")
-        sitemap_issues = await self._check_robots_sitemap(website, audit_results)
-        total_issues += sitemap_issues
+        await self._check_robots_sitemap(website, audit_results)
+        issues.add("sitemap_issues", audit_results["sitemap"]["issues"], store=False)
 
         if progress_callback:
             progress_callback({
                 'percent_complete': 85,
                 'pages_analyzed': total_pages,
-                'issues_found': total_issues,
+                'issues_found': issues.total,
                 'status': 'Checking PageSpeed metrics...'
             })
 
@@ -414,12 +400,7 @@ class SEOAuditTool(BaseTool):
             {"url": website}, 
             self.pagespeed_tool
         )
-
-        if pagespeed_issues:
-            if "performance_issues" not in audit_results:
-                audit_results["performance_issues"] = []
-            audit_results["performance_issues"].extend(pagespeed_issues)
-            total_issues += len(pagespeed_issues)
+        issues.add("performance_issues", pagespeed_issues)
 
         logger.info(f"Found {len(pagespeed_issues)} PageSpeed issues")
 
@@ -427,24 +408,19 @@ class SEOAuditTool(BaseTool):
             progress_callback({
                 'percent_complete': 100,
                 'pages_analyzed': total_pages,
-                'issues_found': total_issues,
+                'issues_found': issues.total,
                 'status': 'Completed',
-                'recent_issues': [{
-                    'severity': issue.get('severity', 'high'),
-                    'issue_type': issue.get('type', 'sitemap_issue'),
-                    'url': issue.get('url', ''),
-                    'details': issue.get('issue', ''),
-                    'value': issue.get('value', '')
-                } for issue in audit_results.get("sitemap", {}).get("issues", [])]
+                'recent_issues': issues.drain_recent()
             })
 
-        # Add PageSpeed analysis for the main URL
-
         # Add summary stats
         audit_results["summary"] = {
             "total_pages": total_pages,
+            "unchanged_pages": unchanged_pages,
+            "check_timings": check_timings,
             "total_links": len(all_links),
-            "total_issues": total_issues,
+            "total_issues": issues.total,
+            **issues.summary(),
             "start_time": crawler_results["start_time"],
             "end_time": crawler_results["end_time"],
             "crawl_time_seconds": crawler_results["crawl_time_seconds"],
@@ -452,44 +428,9 @@ class SEOAuditTool(BaseTool):
                         datetime.fromisoformat(crawler_results["start_time"])).total_seconds()
         }
 
-        # Flatten all issues into a single list
-        all_issues = []
-
-        # Add all issues from each category
-        for issue in audit_results.get('meta_tag_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('content_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('image_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('broken_links', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('duplicate_content', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('canonical_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('social_media_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('sitemap', {}).get('issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('performance_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('semantic_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('robots_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('eeat_issues', []):
-            all_issues.append(issue)
-        for issue in audit_results.get('redirect_issues', []):
-            all_issues.append(issue)
-
-        # Add SSL issues
-        ssl_results = audit_results.get('ssl_issues', {})
-        if ssl_results and ssl_results.get('errors'):
-            all_issues.extend(ssl_results['errors'])
-
-        # Replace individual issue lists with a single flattened list
-        audit_results['issues'] = all_issues
+        # Single flattened list built once from the accumulator
+        if issue_callback is None:
+            audit_results['issues'] = issues.flatten()
 
         logger.info("SEO audit completed successfully")
 
@@ -629,7 +570,7 @@ class SEOAuditTool(BaseTool):
                         content = await response.text()
                         audit_results["robots_txt"]["content"] = content
                         # Check for sitemap directive
-                        sitemap_matches = re.findall(r'Sitemap:\s*(.+)', content, re.IGNORECASE)
+                        sitemap_matches = SITEMAP_DIRECTIVE_PATTERN.findall(content)
                         audit_results["robots_txt"]["sitemap_directives"] = sitemap_matches
         except Exception as e:
             audit_results["robots_txt"] = {
@@ -658,147 +599,9 @@ class SEOAuditTool(BaseTool):
         return len(sitemap_validation["issues"])
 
     async def _check_broken_links(self, links: Set[tuple], audit_results: Dict[str, Any]):
-        """Check for broken internal links using HEAD requests with caching."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        
-        async with aiohttp.ClientSession(headers=headers) as session:
-            semaphore = asyncio.Semaphore(5)  # Allow more concurrent requests since HEAD is lightweight
-            
-            async def check_link(source_url: str, target_url: str):
-                """Check if a link is broken using HEAD request with caching."""
-                async with semaphore:
-                    # Generate cache key
-                    cache_key = f"link_status:{target_url}"
-                    cached_result = cache.get(cache_key)
-                    
-                    if cached_result is not None:
-                        # If link was broken in cache, add to audit results
-                        if cached_result.get('is_broken', False):
-                            audit_results["broken_links"].append({
-                                "source_url": source_url,
-                                "target_url": target_url,
-                                "status_code": cached_result.get('status_code'),
-                                "error": cached_result.get('error'),
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        return
-                    
-                    max_retries = 3
-                    retry_count = 0
-                    
-                    while retry_count < max_retries:
-                        try:
-                            # Try HEAD first
-                            try:
-                                async with session.head(target_url, allow_redirects=True, timeout=5) as response:
-                                    # If HEAD request is successful (status < 400), cache and return
-                                    if response.status < 400:
-                                        cache.set(cache_key, {
-                                            'is_broken': False,
-                                            'status_code': response.status,
-                                            'checked_at': datetime.now().isoformat()
-                                        }, timeout=86400)
-                                        return
-                                        
-                                    # If HEAD fails, try GET
-                                    async with session.get(target_url, allow_redirects=True, timeout=5) as get_response:
-                                        result = {
-                                            'is_broken': get_response.status >= 400,
-                                            'status_code': get_response.status,
-                                            'error': f"HTTP {get_response.status}" if get_response.status >= 400 else None,
-                                            'checked_at': datetime.now().isoformat()
-                                        }
-                                        cache.set(cache_key, result, timeout=86400)
-                                        
-                                        if result['is_broken']:
-                                            audit_results["broken_links"].append({
-                                                "source_url": source_url,
-                                                "target_url": target_url,
-                                                "status_code": get_response.status,
-                                                "error": f"HTTP {get_response.status}",
-                                                "timestamp": datetime.now().isoformat()
-                                            })
-                                        return
-                                        
-                            except aiohttp.ClientError:
-                                # If HEAD fails with client error, try GET
-                                async with session.get(target_url, allow_redirects=True, timeout=5) as response:
-                                    result = {
-                                        'is_broken': response.status >= 400,
-                                        'status_code': response.status,
-                                        'error': f"HTTP {response.status}" if response.status >= 400 else None,
-                                        'checked_at': datetime.now().isoformat()
-                                    }
-                                    cache.set(cache_key, result, timeout=86400)
-                                    
-                                    if result['is_broken']:
-                                        audit_results["broken_links"].append({
-                                            "source_url": source_url,
-                                            "target_url": target_url,
-                                            "status_code": response.status,
-                                            "error": f"HTTP {response.status}",
-                                            "timestamp": datetime.now().isoformat()
-                                        })
-                                    return
-                            
-                        except asyncio.TimeoutError:
-                            retry_count += 1
-                            if retry_count == max_retries:
-                                result = {
-                                    'is_broken': True,
-                                    'status_code': None,
-                                    'error': f"Timeout after {max_retries} retries",
-                                    'checked_at': datetime.now().isoformat()
-                                }
-                                cache.set(cache_key, result, timeout=86400)
-                                
-                                audit_results["broken_links"].append({
-                                    "source_url": source_url,
-                                    "target_url": target_url,
-                                    "status_code": None,
-                                    "error": f"Timeout after {max_retries} retries",
-                                    "timestamp": datetime.now().isoformat()
-                                })
-                            else:
-                                await asyncio.sleep(1)  # Wait before retrying
-                                continue
-                                
-                        except Exception as e:
-                            result = {
-                                'is_broken': True,
-                                'status_code': None,
-                                'error': str(e),
-                                'checked_at': datetime.now().isoformat()
-                            }
-                            cache.set(cache_key, result, timeout=86400)
-                            
-                            audit_results["broken_links"].append({
-                                "source_url": source_url,
-                                "target_url": target_url,
-                                "status_code": None,
-                                "error": str(e),
-                                "timestamp": datetime.now().isoformat()
-                            })
-                            return
-            
-            # Process links in smaller batches
-            batch_size = 50
-            all_links = list(links)
-            for i in range(0, len(all_links), batch_size):
-                batch = all_links[i:i + batch_size]
-                tasks = []
-                for source_url, target_url in batch:
-                    tasks.append(asyncio.create_task(check_link(source_url, target_url)))
-                
-                if tasks:
-                    await asyncio.gather(*tasks)
-                    # Add a small delay between batches to prevent overwhelming
-                    await asyncio.sleep(1)
+        """Check (source_url, target_url) pairs for broken links with the pooled link checker."""
+        async with LinkChecker() as checker:
+            audit_results["broken_links"].extend(await checker.check_links(links))
 
     def _generate_report(self, audit_results: Dict[str, Any]) -> Dict[str, Any]:
         """Format the audit results into a detailed report."""
@@ -895,103 +698,10 @@ class SEOAuditTool(BaseTool):
 
     async def _check_link(self, source_url: str, target_url: str) -> Dict[str, Any]:
         """Check if a link is broken using HEAD/GET requests with retries."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        
-        # Generate cache key
-        cache_key = f"link_status:{target_url}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result is not None:
-            return cached_result
-        
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                async with aiohttp.ClientSession(headers=headers) as session:
-                    # Try HEAD first
-                    try:
-                        async with session.head(target_url, allow_redirects=True, timeout=5) as response:
-                            # If HEAD request is successful (status < 400), cache and return
-                            if response.status < 400:
-                                result = {
-                                    'is_broken': False,
-                                    'status_code': response.status,
-                                    'error': None,
-                                    'checked_at': datetime.now().isoformat()
-                                }
-                                cache.set(cache_key, result, timeout=86400)  # Cache for 24 hours
-                                return result
-                                
-                            # If HEAD fails, try GET
-                            async with session.get(target_url, allow_redirects=True, timeout=5) as get_response:
-                                result = {
-                                    'is_broken': get_response.status >= 400,
-                                    'status_code': get_response.status,
-                                    'error': f"HTTP {get_response.status}" if get_response.status >= 400 else None,
-                                    'checked_at': datetime.now().isoformat()
-                                }
-                                cache.set(cache_key, result, timeout=86400)
-                                return result
-                                
-                    except aiohttp.ClientError:
-                        # If HEAD fails with client error, try GET
-                        async with session.get(target_url, allow_redirects=True, timeout=5) as response:
-                            result = {
-                                'is_broken': response.status >= 400,
-                                'status_code': response.status,
-                                'error': f"HTTP {response.status}" if response.status >= 400 else None,
-                                'checked_at': datetime.now().isoformat()
-                            }
-                            cache.set(cache_key, result, timeout=86400)
-                            return result
-                    
-            except asyncio.TimeoutError:
-                retry_count += 1
-                if retry_count == max_retries:
-                    result = {
-                        'is_broken': True,
-                        'status_code': None,
-                        'error': f"Timeout after {max_retries} retries",
-                        'checked_at': datetime.now().isoformat()
-                    }
-                    cache.set(cache_key, result, timeout=86400)
-                    return result
-                else:
-                    await asyncio.sleep(1)  # Wait before retrying
-                    continue
-                    
-            except Exception as e:
-                result = {
-                    'is_broken': True,
-                    'status_code': None,
-                    'error': str(e),
-                    'checked_at': datetime.now().isoformat()
-                }
-                cache.set(cache_key, result, timeout=86400)
-                return result
-
-        # Should never reach here, but just in case
-        return {
-            'is_broken': True,
-            'status_code': None,
-            'error': 'Unknown error',
-            'checked_at': datetime.now().isoformat()
-        }
+        async with LinkChecker() as checker:
+            return await checker.check_url(target_url)
 
     async def _check_content_similarity(self, page1: Dict[str, Any], page2: Dict[str, Any]) -> float:
-        """Check content similarity between two pages."""
-        from difflib import SequenceMatcher
-        
-        # Get text content
-        text1 = page1.get('text_content', '')
-        text2 = page2.get('text_content', '')
-        
-        # Use SequenceMatcher for similarity ratio
-        return SequenceMatcher(None, text1, text2).ratio()
+        """Check content similarity between two pages (MinHash estimate of shingle overlap)."""
+        index = NearDuplicateIndex(threshold=self.duplicate_similarity_threshold)
+        return index.similarity(page1.get('text_content', ''), page2.get('text_content', ''))
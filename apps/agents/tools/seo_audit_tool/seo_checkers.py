@@ -13,6 +13,11 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; checks run for every crawled page
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+LASTMOD_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2}(\+\d{2}:\d{2}|Z)?)?$')
+SITEMAP_DIRECTIVE_PATTERN = re.compile(r'Sitemap:\s*(.+)', re.IGNORECASE)
+
 class SEOChecker:
     """Base class for SEO checks."""
     
@@ -325,7 +330,7 @@ class SEOChecker:
         # Check for keyword density and readability if content exists
         if text_content:
             # Add readability score check
-            sentences = len(re.split(r'[.!?]+', text_content))
+            sentences = len(SENTENCE_END_PATTERN.split(text_content))
             if sentences > 0:
                 avg_words_per_sentence = word_count / sentences
                 if avg_words_per_sentence > 25:
@@ -589,7 +594,7 @@ class SEOChecker:
                                     result["last_modified_dates"] += 1
                                     # Validate lastmod format
                                     lastmod = url.find('lastmod').text
-                                    if not re.match(r'^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2}(\+\d{2}:\d{2}|Z)?)?$', lastmod):
+                                    if not LASTMOD_PATTERN.match(lastmod):
                                         sitemap_issues.append(SEOChecker.create_issue(
                                             issue_type="invalid_lastmod",
                                             issue="Invalid lastmod date format",
@@ -677,7 +682,7 @@ class SEOChecker:
                 async with session.get(f"{base_url}/robots.txt", timeout=10) as response:
                     if response.status == 200:
                         robots_content = await response.text()
-                        sitemap_matches = re.findall(r'Sitemap:\s*(.+)', robots_content, re.IGNORECASE)
+                        sitemap_matches = SITEMAP_DIRECTIVE_PATTERN.findall(robots_content)
                         for sitemap_url in sitemap_matches:
                             sitemap_url = sitemap_url.strip()
                             if sitemap_url not in sitemap_urls:
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from .check_pipeline import CheckPipeline, PageRecord
+
+
+def make_record(**overrides):
+    values = {
+        "url": "https://example.com/about/",
+        "title": "About",
+        "meta_description": "",
+        "h1_tags": ["About us", "Our team"],
+        "text_content": "Short page.",
+    }
+    values.update(overrides)
+    return PageRecord(**values)
+
+
+class PageRecordTests(SimpleTestCase):
+    """Tests for the typed page record"""
+
+    def test_reads_like_a_page_dict(self):
+        record = make_record()
+        self.assertEqual(record["url"], "https://example.com/about/")
+        self.assertEqual(record.get("title", ""), "About")
+        self.assertEqual(record.get("meta_type", ""), "")
+        with self.assertRaises(KeyError):
+            record["meta_type"]
+
+    def test_from_page_copies_shared_fields(self):
+        page = SimpleNamespace(
+            url="https://example.com/",
+            title="Home",
+            html="<html></html>",
+            canonical_tags=["https://example.com/", "https://example.com/index"],
+            og_title="Home",
+        )
+        record = PageRecord.from_page(page)
+        self.assertEqual(record.title, "Home")
+        self.assertEqual(record.og_title, "Home")
+        self.assertEqual(record.canonical_count, 2)
+        self.assertFalse(hasattr(record, "html"))
+
+
+class CheckPipelineTests(SimpleTestCase):
+    """Tests for check selection and per-check stats"""
+
+    def run_pipeline(self, pipeline, record):
+        delivered = []
+        pipeline.submit(record, lambda rec, found: delivered.append(found))
+        pipeline.close()
+        return delivered
+
+    def test_only_enabled_checks_run(self):
+        pipeline = CheckPipeline(enabled=["meta_tags", "headings"])
+        delivered = self.run_pipeline(pipeline, make_record())
+
+        self.assertEqual(len(delivered), 1)
+        self.assertEqual(set(delivered[0]), {"meta_tag_issues", "heading_issues"})
+        self.assertEqual(pipeline.categories, {"meta_tag_issues", "heading_issues"})
+        self.assertEqual([issue["type"] for issue in delivered[0]["heading_issues"]], ["h1"])
+
+    def test_disabled_checks_are_skipped(self):
+        pipeline = CheckPipeline(disabled=["eeat"])
+        self.assertNotIn("eeat_issues", pipeline.categories)
+        self.assertIn("meta_tag_issues", pipeline.categories)
+
+    def test_unknown_check_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CheckPipeline(disabled=["spelling"])
+
+    def test_timing_report_counts_calls_and_issues(self):
+        pipeline = CheckPipeline(enabled=["meta_tags", "headings"])
+        self.run_pipeline(pipeline, make_record())
+
+        report = {row["check"]: row for row in pipeline.timing_report()}
+        self.assertEqual(report["headings"]["calls"], 1)
+        self.assertEqual(report["headings"]["issues"], 1)
+        self.assertEqual(report["headings"]["category"], "heading_issues")
+        self.assertGreaterEqual(report["meta_tags"]["seconds"], 0)
+
+    def test_process_pool_delivers_results_on_collect(self):
+        pipeline = CheckPipeline(enabled=["meta_tags", "headings"], processes=1)
+        delivered = self.run_pipeline(pipeline, make_record())
+
+        self.assertEqual(len(delivered), 1)
+        self.assertEqual([issue["type"] for issue in delivered[0]["heading_issues"]], ["h1"])
@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from .issue_accumulator import IssueAccumulator
+
+
+def make_issue(issue_type, url, severity="medium"):
+    return {"type": issue_type, "issue": f"{issue_type} problem", "url": url, "severity": severity}
+
+
+class IssueAccumulatorTests(SimpleTestCase):
+    """Tests for incremental issue aggregation"""
+
+    def test_issues_are_kept_in_results_by_default(self):
+        results = {}
+        issues = IssueAccumulator(results)
+        issues.add("meta_tag_issues", [make_issue("title", "https://example.com/")])
+        issues.add("image_issues", [make_issue("missing_alt", "https://example.com/", "low")])
+
+        self.assertEqual(len(results["meta_tag_issues"]), 1)
+        self.assertEqual([issue["type"] for issue in issues.flatten()], ["title", "missing_alt"])
+        self.assertEqual(issues.summary()["issues_by_severity"], {"medium": 1, "low": 1})
+
+    def test_sink_receives_batches_without_keeping_them(self):
+        results = {}
+        batches = []
+        issues = IssueAccumulator(results, sink=batches.append, keep=False)
+        issues.add("meta_tag_issues", [make_issue("title", "https://example.com/a")])
+        issues.add("meta_tag_issues", [make_issue("h1", "https://example.com/b")])
+
+        self.assertEqual([len(batch) for batch in batches], [1, 1])
+        self.assertNotIn("meta_tag_issues", results)
+        self.assertEqual(issues.flatten(), [])
+        # Counters still cover every issue
+        self.assertEqual(issues.total, 2)
+        self.assertEqual(len(issues.drain_recent()), 2)
@@ -0,0 +1,64 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.test import SimpleTestCase
+
+from .link_checker import LinkChecker
+
+
+class LinkCheckerTests(SimpleTestCase):
+    """Tests for the pooled link checker against a local slow server"""
+
+    def setUp(self):
+        # Keep the shared cache out of these checks
+        patcher = mock.patch.multiple(
+            LinkChecker,
+            _cache_get_many=lambda self, urls: {},
+            _cache_set_many=lambda self, results: None
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @asynccontextmanager
+    async def serve(self, handler):
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            yield server
+        finally:
+            await server.close()
+
+    async def test_queued_links_on_one_host_are_not_timed_out(self):
+        """Waiting for a per-host slot does not count towards the timeout"""
+        async def slow(request):
+            await asyncio.sleep(0.1)
+            return web.Response(text="ok")
+
+        async with self.serve(slow) as server:
+            urls = [str(server.make_url(f"/page-{i}")) for i in range(30)]
+            async with LinkChecker(max_connections_per_host=2, timeout=0.5) as checker:
+                results = await checker.check_urls(urls)
+
+        self.assertEqual(len(results), 30)
+        self.assertFalse(any(result['is_broken'] for result in results.values()))
+
+    async def test_timeouts_are_retried_without_a_get_fallback(self):
+        methods = []
+
+        async def hang(request):
+            methods.append(request.method)
+            await asyncio.sleep(1)
+            return web.Response(text="late")
+
+        async with self.serve(hang) as server:
+            async with LinkChecker(timeout=0.2, max_retries=2) as checker:
+                result = await checker.check_url(str(server.make_url("/slow")))
+
+        self.assertTrue(result['is_broken'])
+        self.assertIn("Timeout", result['error'])
+        self.assertEqual(methods, ['HEAD', 'HEAD'])
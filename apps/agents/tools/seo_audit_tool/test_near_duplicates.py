@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+
+from .near_duplicates import NearDuplicateIndex
+
+SERVICE_PAGE = (
+    "Emergency plumbing in {city}. Our licensed plumbers repair leaks, unblock drains and "
+    "replace water heaters across the {city} area. We offer upfront pricing, same day "
+    "appointments and a twelve month guarantee on every repair. Call our friendly team "
+    "today to book a visit from a local plumber who knows the homes and pipes of the region. "
+    "We also install new bathrooms, kitchens and gas appliances with full certification."
+)
+
+
+class NearDuplicateIndexTests(SimpleTestCase):
+    """Tests for the MinHash near-duplicate index"""
+
+    def test_templated_pages_form_one_cluster(self):
+        """Location pages generated from one template are clustered together"""
+        index = NearDuplicateIndex(threshold=0.6)
+        for city in ("Leeds", "York", "Hull"):
+            index.add(f"https://example.com/{city.lower()}/", SERVICE_PAGE.format(city=city))
+        index.add("https://example.com/about/", "We are a family business founded in 1982 by two brothers.")
+
+        clusters = index.clusters()
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["cluster_size"], 3)
+        self.assertNotIn("https://example.com/about/", clusters[0]["urls"])
+        self.assertGreaterEqual(clusters[0]["similarity"], 60)
+
+    def test_identical_text_scores_one(self):
+        index = NearDuplicateIndex()
+        text = SERVICE_PAGE.format(city="Leeds")
+        self.assertEqual(index.similarity(text, text), 1.0)
+        self.assertEqual(index.similarity(text, ""), 0.0)
+
+    def test_distinct_pages_are_not_clustered(self):
+        index = NearDuplicateIndex()
+        index.add("https://example.com/a/", SERVICE_PAGE.format(city="Leeds"))
+        index.add("https://example.com/b/", "Read our privacy policy to learn how customer data is stored and processed.")
+        self.assertEqual(index.clusters(), [])
+
+    def test_exported_signature_indexes_like_the_text(self):
+        """Signatures saved by one audit cluster with pages indexed by the next"""
+        previous = NearDuplicateIndex(threshold=0.6)
+        previous.add("https://example.com/leeds/", SERVICE_PAGE.format(city="Leeds"))
+        exported = previous.export_signature("https://example.com/leeds/")
+
+        index = NearDuplicateIndex(threshold=0.6)
+        index.add_signature("https://example.com/leeds/", exported)
+        matches = index.add("https://example.com/york/", SERVICE_PAGE.format(city="York"))
+
+        self.assertEqual([url for url, _ in matches], ["https://example.com/leeds/"])
+        self.assertEqual(index.export_signature("https://example.com/leeds/"), exported)
+        self.assertEqual(index.add_signature("https://example.com/hull/", "not hex"), [])
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for the single-pass SEO page extractor.
+
+Compares extract_page_data against the per-field BeautifulSoup extraction the
+crawler used before, over the saved HTML fixtures in ./fixtures (or any
+directory of .html files), and checks that both produce the same fields.
+
+Usage (from the project root):
+    python -m apps.agents.tools.seo_crawler_tool.benchmark_extractor [--dir PATH] [--repeat N]
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Dict
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from apps.agents.tools.seo_crawler_tool.extractor import extract_page_data
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+FIXTURE_URL = "https://example.com/blog/choose-a-plumber/"
+
+
+def beautifulsoup_extract(html: str, page_url: str) -> Dict[str, Any]:
+    """Reference implementation: one soup.find/find_all call per field."""
+    soup = BeautifulSoup(html, 'lxml')
+    content_type = "general"
+    if soup.find('article'):
+        content_type = "article"
+    elif soup.find(['form', 'input']):
+        content_type = "form"
+    elif soup.find(['table', 'tbody']):
+        content_type = "data"
+
+    og_title = soup.find('meta', property='og:title')
+    og_description = soup.find('meta', property='og:description')
+    og_image = soup.find('meta', property='og:image')
+    canonical_tag = soup.find('link', rel='canonical')
+    viewport = soup.find('meta', attrs={'name': 'viewport'})
+
+    images = []
+    for img in soup.find_all('img'):
+        src = img.get('src', '')
+        images.append({
+            "src": urljoin(page_url, src) if src else src,
+            "alt": img.get('alt', ''),
+            "width": img.get('width', ''),
+            "height": img.get('height', ''),
+            "title": img.get('title', ''),
+            "loading": img.get('loading', ''),
+            "srcset": img.get('srcset', ''),
+            "size": 0
+        })
+
+    base_domain = urlparse(page_url).netloc
+    internal_links, external_links = set(), set()
+    for a in soup.find_all('a', href=True):
+        href = a["href"].strip()
+        if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#', 'data:', 'file:', 'about:')):
+            continue
+        absolute_url = urljoin(page_url, href)
+        if urlparse(absolute_url).netloc == base_domain:
+            internal_links.add(absolute_url)
+        else:
+            external_links.add(absolute_url)
+
+    return {
+        "text_content": " ".join(soup.stripped_strings),
+        "h1_tags": [h1.get_text(strip=True) for h1 in soup.find_all('h1')],
+        "content_type": content_type,
+        "has_header": bool(soup.find('header')),
+        "has_nav": bool(soup.find('nav')),
+        "has_main": bool(soup.find('main')),
+        "has_footer": bool(soup.find('footer')),
+        "has_article": bool(soup.find('article')),
+        "has_section": bool(soup.find('section')),
+        "has_aside": bool(soup.find('aside')),
+        "og_title": og_title.get('content') if og_title else None,
+        "og_description": og_description.get('content') if og_description else None,
+        "og_image": og_image.get('content') if og_image else None,
+        "canonical_url": canonical_tag.get('href') if canonical_tag else None,
+        "canonical_tags": [tag['href'] for tag in soup.find_all('link', rel='canonical') if tag.get('href')],
+        "viewport": viewport.get('content') if viewport else None,
+        "images": images,
+        "internal_links": internal_links,
+        "external_links": external_links,
+    }
+
+
+def compare(reference: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, tuple]:
+    """Return the fields on which the two extractions disagree."""
+    return {
+        key: (value, extracted.get(key))
+        for key, value in reference.items()
+        if extracted.get(key) != value
+    }
+
+
+def time_call(func, documents, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in documents:
+            func(html, FIXTURE_URL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=str(FIXTURES_DIR), help="Directory of .html files to benchmark")
+    parser.add_argument('--repeat', type=int, default=200, help="Passes over the corpus per implementation")
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.dir).glob('*.html'))
+    if not paths:
+        raise SystemExit(f"No .html files found in {args.dir}")
+    documents = [path.read_text(encoding='utf-8', errors='replace') for path in paths]
+
+    for path, html in zip(paths, documents):
+        mismatches = compare(beautifulsoup_extract(html, FIXTURE_URL), extract_page_data(html, FIXTURE_URL))
+        status = "ok" if not mismatches else f"MISMATCH {sorted(mismatches)}"
+        print(f"{path.name:<30} {status}")
+
+    corpus_kb = sum(len(html) for html in documents) / 1024
+    soup_time = time_call(beautifulsoup_extract, documents, args.repeat)
+    lxml_time = time_call(extract_page_data, documents, args.repeat)
+    pages = len(documents) * args.repeat
+
+    print(f"\n{len(documents)} documents ({corpus_kb:.1f} KB), {args.repeat} passes")
+    print(f"BeautifulSoup per-field: {soup_time:.3f}s ({soup_time / pages * 1000:.3f} ms/page)")
+    print(f"Single-pass lxml:        {lxml_time:.3f}s ({lxml_time / pages * 1000:.3f} ms/page)")
+    print(f"Speed-up:                {soup_time / lxml_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Single-pass HTML extractor for SEO page data.
+
+Parses a document once with lxml and collects every field SEOPage needs
+(text, title, meta tags, OpenGraph, canonical, viewport, headings, images,
+links and semantic structure) in one walk over the tree, instead of running
+a separate BeautifulSoup find/find_all for each field.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+from lxml.html import HTMLParser, document_fromstring
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_TAGS = frozenset(['header', 'nav', 'main', 'footer', 'article', 'section', 'aside'])
+# Tags whose text is not page content (mirrors BeautifulSoup's stripped_strings)
+NON_CONTENT_TAGS = frozenset(['script', 'style', 'template'])
+SKIPPED_LINK_PREFIXES = ('javascript:', 'mailto:', 'tel:', '#', 'data:', 'file:', 'about:')
+META_NAMES = frozenset(['description', 'keywords', 'viewport'])
+OG_PROPERTIES = frozenset(['og:title', 'og:description', 'og:image'])
+
+_PARSER = HTMLParser(encoding='utf-8', remove_comments=False)
+
+
+def empty_page_data() -> Dict[str, Any]:
+    """Return the extractor output for a page without parseable HTML."""
+    return {
+        "text_content": "",
+        "title": None,
+        "meta_description": None,
+        "meta_keywords": None,
+        "h1_tags": [],
+        "content_type": "general",
+        "has_header": False,
+        "has_nav": False,
+        "has_main": False,
+        "has_footer": False,
+        "has_article": False,
+        "has_section": False,
+        "has_aside": False,
+        "og_title": None,
+        "og_description": None,
+        "og_image": None,
+        "canonical_url": None,
+        "canonical_tags": [],
+        "viewport": None,
+        "images": [],
+        "internal_links": set(),
+        "external_links": set(),
+    }
+
+
+def extract_page_data(
+    html: str,
+    page_url: str,
+    internal_link_filter: Optional[Callable[[str], bool]] = None
+) -> Dict[str, Any]:
+    """
+    Extract SEO fields from an HTML document in a single traversal.
+
+    Args:
+        html: Raw HTML of the page
+        page_url: URL the page was fetched from, used to resolve relative URLs
+        internal_link_filter: Optional predicate applied to same-domain links;
+            links for which it returns False are dropped
+
+    Returns:
+        A dict keyed by SEOPage field names. ``title``, ``meta_description``
+        and ``meta_keywords`` are None when the page does not define them.
+    """
+    data = empty_page_data()
+    if not html or not html.strip():
+        return data
+
+    try:
+        root = document_fromstring(html.encode('utf-8', errors='replace'), parser=_PARSER)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse HTML for {page_url}: {str(e)}")
+        return data
+
+    base_domain = urlparse(page_url).netloc
+    text_parts: List[str] = []
+    h1_parts: Optional[List[str]] = None
+    title_parts: Optional[List[str]] = None
+    seen_tags = set()
+    skip_depth = 0
+
+    for event, el in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        if event in ('comment', 'pi'):
+            # Only the text following a comment or processing instruction is content
+            if skip_depth == 0 and el.tail:
+                _add_text(el.tail, text_parts, h1_parts, title_parts)
+            continue
+
+        tag = el.tag
+
+        if event == 'end':
+            if tag in NON_CONTENT_TAGS:
+                skip_depth -= 1
+            elif tag == 'h1' and h1_parts is not None:
+                data["h1_tags"].append(''.join(h1_parts))
+                h1_parts = None
+            elif tag == 'title' and title_parts is not None:
+                if data["title"] is None:
+                    data["title"] = ''.join(title_parts)
+                title_parts = None
+            if skip_depth == 0 and el.tail:
+                _add_text(el.tail, text_parts, h1_parts, title_parts)
+            continue
+
+        # start event
+        seen_tags.add(tag)
+        if tag in NON_CONTENT_TAGS:
+            skip_depth += 1
+            continue
+        if tag == 'h1':
+            h1_parts = []
+        elif tag == 'title':
+            title_parts = []
+        elif tag == 'meta':
+            _collect_meta(el, data)
+        elif tag == 'link':
+            rel = (el.get('rel') or '').lower().split()
+            if 'canonical' in rel:
+                href = el.get('href')
+                if data["canonical_url"] is None:
+                    data["canonical_url"] = href
+                if href:
+                    data["canonical_tags"].append(href)
+        elif tag == 'img':
+            src = el.get('src', '')
+            data["images"].append({
+                "src": urljoin(page_url, src) if src else src,
+                "alt": el.get('alt', ''),
+                "width": el.get('width', ''),
+                "height": el.get('height', ''),
+                "title": el.get('title', ''),
+                "loading": el.get('loading', ''),
+                "srcset": el.get('srcset', ''),
+                "size": 0  # Will be populated for local images
+            })
+        elif tag == 'a':
+            href = el.get('href')
+            if href is not None:
+                _collect_link(href.strip(), page_url, base_domain, internal_link_filter, data)
+
+        if skip_depth == 0 and el.text:
+            _add_text(el.text, text_parts, h1_parts, title_parts)
+
+    data["text_content"] = " ".join(text_parts)
+
+    for tag in SEMANTIC_TAGS:
+        data[f"has_{tag}"] = tag in seen_tags
+
+    # Determine content type based on HTML structure
+    if 'article' in seen_tags:
+        data["content_type"] = "article"
+    elif 'form' in seen_tags or 'input' in seen_tags:
+        data["content_type"] = "form"
+    elif 'table' in seen_tags or 'tbody' in seen_tags:
+        data["content_type"] = "data"
+
+    return data
+
+
+def _add_text(text: str, text_parts: List[str], h1_parts: Optional[List[str]], title_parts: Optional[List[str]]):
+    stripped = text.strip()
+    if not stripped:
+        return
+    text_parts.append(stripped)
+    if h1_parts is not None:
+        h1_parts.append(stripped)
+    if title_parts is not None:
+        title_parts.append(stripped)
+
+
+def _collect_meta(el, data: Dict[str, Any]):
+    name = el.get('name')
+    if name in META_NAMES:
+        if name == 'viewport':
+            if data["viewport"] is None:
+                data["viewport"] = el.get('content')
+        else:
+            key = "meta_description" if name == 'description' else "meta_keywords"
+            if data[key] is None:
+                data[key] = el.get('content', '')
+        return
+    prop = el.get('property')
+    if prop in OG_PROPERTIES:
+        key = prop.replace(':', '_')
+        if data[key] is None:
+            data[key] = el.get('content')
+
+
+def _collect_link(
+    href: str,
+    page_url: str,
+    base_domain: str,
+    internal_link_filter: Optional[Callable[[str], bool]],
+    data: Dict[str, Any]
+):
+    # Skip empty, javascript, mailto, tel links
+    if not href or href.startswith(SKIPPED_LINK_PREFIXES):
+        return
+    try:
+        absolute_url = urljoin(page_url, href)
+        parsed_url = urlparse(absolute_url)
+    except ValueError as e:
+        logger.warning(f"Error processing link {href}: {str(e)}")
+        return
+
+    # Categorize as internal or external
+    if parsed_url.netloc == base_domain:
+        if internal_link_filter is None or internal_link_filter(absolute_url):
+            data["internal_links"].add(absolute_url)
+    else:
+        data["external_links"].add(absolute_url)
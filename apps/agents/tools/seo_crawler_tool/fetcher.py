@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional
+
+import aiohttp
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# aiohttp only decodes brotli responses when a brotli package is installed,
+# so only advertise "br" when we can actually handle it.
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Markers of client-side rendered apps that ship an (almost) empty body
+JS_APP_ROOT_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+SCRIPT_PATTERN = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+STYLE_PATTERN = re.compile(r'<style\b[^>]*>.*?</style>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+class FetchResult(BaseModel):
+    """Result of fetching a single page over HTTP."""
+    url: str = Field(..., description="Requested URL")
+    final_url: str = Field(..., description="URL after following redirects")
+    status_code: int = Field(..., description="HTTP status code")
+    html: str = Field(default="", description="Decoded response body")
+    content_type: str = Field(default="", description="Response Content-Type header")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Response headers")
+    redirect_chain: List[str] = Field(default_factory=list, description="URLs visited while following redirects")
+
+    @property
+    def is_html(self) -> bool:
+        """Whether the response body is an HTML document."""
+        return not self.content_type or self.content_type.lower().startswith(HTML_CONTENT_TYPES)
+
+    @property
+    def not_modified(self) -> bool:
+        """Whether a conditional request found the page unchanged."""
+        return self.status_code == 304
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """ETag and Last-Modified of the response, for the next conditional request."""
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        return {
+            key: headers[header]
+            for key, header in (('etag', 'etag'), ('last_modified', 'last-modified'))
+            if headers.get(header)
+        }
+
+
+class SEOPageFetcher:
+    """
+    Pooled aiohttp fetcher for the SEO crawler.
+
+    A single ClientSession is shared for the whole crawl so connections are
+    reused (HTTP/1.1 keep-alive) and pooled per host. gzip/deflate are always
+    decoded; brotli is decoded when the brotli package is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_connections_per_host: int = 5,
+        timeout: float = 30.0,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "SEOPageFetcher":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the pooled session if it does not exist yet."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auto_decompress=True
+            )
+
+    async def close(self):
+        """Close the pooled session and release its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch(self, url: str, validators: Optional[Dict[str, str]] = None) -> Optional[FetchResult]:
+        """
+        Fetch a URL, returning None on network errors or timeouts.
+
+        With ``validators`` (``etag``/``last_modified`` from an earlier fetch)
+        the request is conditional, and an unchanged page comes back as a 304
+        without a body.
+        """
+        await self.open()
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        try:
+            async with self._session.get(url, allow_redirects=True, headers=headers) as response:
+                content_type = response.headers.get('Content-Type', '')
+                # Every URL visited on the way, ending with the final URL
+                redirect_chain = [str(hop.url) for hop in response.history]
+                if redirect_chain:
+                    redirect_chain.append(str(response.url))
+
+                result = FetchResult(
+                    url=url,
+                    final_url=str(response.url),
+                    status_code=response.status,
+                    content_type=content_type,
+                    headers={key: value for key, value in response.headers.items()},
+                    redirect_chain=redirect_chain
+                )
+                # Don't download bodies we are not going to parse
+                if result.is_html and not result.not_modified:
+                    body = await response.content.read(self.max_body_bytes)
+                    result.html = body.decode(response.get_encoding(), errors='replace')
+                return result
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout fetching {url} after {self.timeout} seconds")
+        except aiohttp.ClientError as e:
+            logger.warning(f"Client error fetching {url}: {str(e)}")
+        except (LookupError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not decode response from {url}: {str(e)}")
+        return None
+
+    @staticmethod
+    def needs_js_rendering(html: str, min_text_length: int = 200) -> bool:
+        """
+        Heuristic check for pages that only render their content client-side.
+
+        Such pages are handed to the Firecrawl fallback, which runs a browser.
+        """
+        if not html:
+            return True
+        if JS_APP_ROOT_PATTERN.search(html):
+            return True
+        visible = TAG_PATTERN.sub(' ', STYLE_PATTERN.sub(' ', SCRIPT_PATTERN.sub(' ', html)))
+        return len(' '.join(visible.split())) < min_text_length
@@ -0,0 +1,100 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    """
+    Bounded priority frontier of URLs waiting to be crawled.
+
+    URLs are ordered by sitemap membership first and link depth second, so
+    pages listed in the sitemap and pages close to the start URL are crawled
+    before deep pagination. URLs that arrive while the queue is full are kept
+    in a ``backlog`` heap with the same ordering and moved into the queue as
+    it empties, so none are lost.
+    """
+
+    def __init__(self, maxsize: int, priority_urls: Optional[Set[str]] = None):
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=maxsize)
+        self.priority_urls = priority_urls or set()
+        self.seen: Set[str] = set()
+        self.backlog: List[Tuple[Tuple[int, int], int, str, int]] = []
+        self._queued: Set[str] = set()
+        self._counter = itertools.count()
+
+    def add(self, url: str, depth: int) -> bool:
+        """Queue a URL unless it has already been seen. Returns True if it is new."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        priority = (0 if url in self.priority_urls else 1, depth)
+        # The counter keeps FIFO order within the same priority
+        item = (priority, next(self._counter), url, depth)
+        self._queued.add(url)
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            heapq.heappush(self.backlog, item)
+        return True
+
+    async def get(self) -> Tuple[str, int]:
+        """Wait for the next URL to crawl and return it with its depth."""
+        _, _, url, depth = await self.queue.get()
+        self._queued.discard(url)
+        # Refill before the URL is marked done so queue.join() waits for the backlog
+        while self.backlog and not self.queue.full():
+            self.queue.put_nowait(heapq.heappop(self.backlog))
+        return url, depth
+
+    def task_done(self):
+        self.queue.task_done()
+
+    def pending_urls(self) -> Set[str]:
+        """URLs that were discovered but not crawled yet."""
+        return set(self._queued)
+
+    def __len__(self) -> int:
+        return self.queue.qsize() + len(self.backlog)
+
+
+class HostPoliteness:
+    """
+    Per-host token bucket used instead of a global sleep between batches.
+
+    Each host may receive ``burst`` requests back to back, refilled at
+    ``burst / delay`` tokens per second. A host therefore gets at most
+    ``burst`` requests per ``delay`` seconds on average (the same pace as
+    the earlier crawl of ``burst`` concurrent pages followed by a sleep of
+    ``delay``), not one request per ``delay``. Workers never wait on each
+    other's hosts.
+    """
+
+    def __init__(self, delay: float, burst: int = 1):
+        self.delay = max(delay, 0.0)
+        self.burst = max(burst, 1)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, url: str):
+        """Wait until a request to the URL's host is allowed."""
+        if self.delay <= 0:
+            return
+        host = urlparse(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        rate = self.burst / self.delay
+        async with lock:
+            tokens, updated = self._buckets.get(host, (float(self.burst), time.monotonic()))
+            now = time.monotonic()
+            tokens = min(float(self.burst), tokens + (now - updated) * rate)
+            if tokens < 1:
+                wait = (1 - tokens) / rate
+                await asyncio.sleep(wait)
+                now = time.monotonic()
+                tokens = 1.0
+            self._buckets[host] = (tokens - 1, now)
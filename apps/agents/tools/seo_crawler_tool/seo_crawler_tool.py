@@ -1,7 +1,8 @@
 import asyncio
+import hashlib
 import logging
 import json
-from typing import Dict, List, Any, Optional, Type, Set, Literal, Union
+from typing import Dict, List, Any, Optional, Type, Set, Literal, Union, Tuple
 from datetime import datetime
 from urllib.parse import urljoin, urlparse, urlunparse
 from bs4 import BeautifulSoup
@@ -17,6 +18,9 @@ from apps.agents.tools.crawl_website_tool.crawl_website_tool import CrawlWebsite
 from apps.crawl_website.models import CrawlResult
 from apps.common.utils import normalize_url
 from apps.agents.utils import URLDeduplicator
+from .fetcher import SEOPageFetcher
+from .frontier import CrawlFrontier, HostPoliteness
+from .extractor import extract_page_data
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +33,15 @@ PageSection = Literal[
     "canonical_url", "canonical_tags",
     "viewport",
     "images",
-    "internal_links", "external_links"
+    "internal_links", "external_links",
+    "redirect_chain",
+    "etag", "last_modified", "content_hash", "unchanged"
 ]
 
+def content_hash(html: str) -> str:
+    """Fingerprint of a page body, used to spot unchanged pages between crawls."""
+    return hashlib.sha256(html.encode('utf-8', errors='replace')).hexdigest()
+
 class SEOCrawlerToolSchema(BaseModel):
     """Input schema for SEOCrawlerTool."""
     website_url: str = Field(
@@ -95,6 +105,13 @@ class SEOPage(BaseModel):
     # Link categorization
     internal_links: Set[str] = Field(default_factory=set, description="Internal links")
     external_links: Set[str] = Field(default_factory=set, description="External links")
+    # Redirect data
+    redirect_chain: List[str] = Field(default_factory=list, description="URLs visited while following redirects")
+    # Validators for incremental crawls
+    etag: Optional[str] = Field(default=None, description="ETag response header")
+    last_modified: Optional[str] = Field(default=None, description="Last-Modified response header")
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of the raw HTML")
+    unchanged: bool = Field(default=False, description="Page is unchanged since the previous crawl and was not parsed again")
 
     model_config = {"arbitrary_types_allowed": True}
 
@@ -128,12 +145,19 @@ class SEOCrawlerToolConfig(BaseModel):
     """Configuration model for SEOCrawlerTool."""
     max_pages: int = Field(default=100, description="Maximum number of pages to crawl")
     max_concurrent: int = Field(default=5, description="Maximum number of concurrent requests")
+    max_concurrent_per_host: int = Field(default=5, description="Maximum number of pooled connections per host")
+    request_timeout: float = Field(default=30.0, description="Timeout in seconds for a single page fetch")
+    use_firecrawl_fallback: bool = Field(default=True, description="Fall back to Firecrawl for failed or JavaScript-rendered pages")
     visited_urls: Set[str] = Field(default_factory=set, description="Set of visited URLs")
     found_links: Set[str] = Field(default_factory=set, description="Set of links found during crawling")
     pages: List[SEOPage] = Field(default_factory=list, description="List of crawled pages")
     url_deduplicator: URLDeduplicator = Field(default_factory=URLDeduplicator, description="URL deduplication utility")
     crawl_tool: CrawlWebsiteTool = Field(default_factory=CrawlWebsiteTool, description="Crawl tool for making requests")
     page_callback: Optional[Any] = Field(default=None, description="Callback function for processing pages")
+    previous_pages: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Validators and links of pages from a previous crawl, by canonical URL"
+    )
 
     model_config = {"arbitrary_types_allowed": True}
 
@@ -147,6 +171,8 @@ class SEOCrawlerTool(BaseTool):
     def __init__(self, **data):
         super().__init__(**data)
         self._semaphore = None
+        self._fetcher: Optional[SEOPageFetcher] = None
+        self._politeness: Optional[HostPoliteness] = None
         # Ensure tools are initialized
         if not self.config.url_deduplicator:
             self.config.url_deduplicator = URLDeduplicator()
@@ -171,9 +197,22 @@ class SEOCrawlerTool(BaseTool):
         progress_callback = None,
         page_callback = None,
         sections: Optional[Union[List[PageSection], str]] = None,
+        sitemap_urls: Optional[List[str]] = None,
+        previous_pages: Optional[Dict[str, Dict[str, Any]]] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Run the crawler asynchronously."""
+        """
+        Run the crawler asynchronously.
+
+        URLs listed in ``sitemap_urls`` are crawled ahead of other URLs at the
+        same depth.
+
+        ``previous_pages`` maps canonical URLs to what an earlier crawl stored
+        for them (``etag``, ``last_modified``, ``content_hash`` and
+        ``internal_links``). Those pages are fetched conditionally; pages that
+        did not change are returned with ``unchanged`` set instead of being
+        parsed again, and their stored links are followed.
+        """
         # Convert sections from string to list if provided as a string
         if sections and isinstance(sections, str):
             try:
@@ -189,15 +228,27 @@ class SEOCrawlerTool(BaseTool):
         
         self.semaphore = asyncio.Semaphore(self.config.max_concurrent)
         self.config.page_callback = page_callback
+        self.config.previous_pages = previous_pages or {}
         
-        return await self._async_crawl(
-            website_url=website_url,
-            max_pages=self.config.max_pages,
-            respect_robots_txt=respect_robots_txt,
-            crawl_delay=crawl_delay,
-            progress_callback=progress_callback,
-            sections=sections
-        )
+        # One pooled session for the whole crawl so connections are kept alive
+        async with SEOPageFetcher(
+            max_connections=self.config.max_concurrent,
+            max_connections_per_host=self.config.max_concurrent_per_host,
+            timeout=self.config.request_timeout
+        ) as fetcher:
+            self._fetcher = fetcher
+            try:
+                return await self._async_crawl(
+                    website_url=website_url,
+                    max_pages=self.config.max_pages,
+                    respect_robots_txt=respect_robots_txt,
+                    crawl_delay=crawl_delay,
+                    progress_callback=progress_callback,
+                    sections=sections,
+                    priority_urls=set(sitemap_urls or [])
+                )
+            finally:
+                self._fetcher = None
 
     def _run(
         self,
@@ -209,6 +260,8 @@ class SEOCrawlerTool(BaseTool):
         progress_callback = None,
         page_callback = None,
         sections: Optional[Union[List[PageSection], str]] = None,
+        sitemap_urls: Optional[List[str]] = None,
+        previous_pages: Optional[Dict[str, Dict[str, Any]]] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """Run the crawler synchronously."""
@@ -238,6 +291,8 @@ class SEOCrawlerTool(BaseTool):
                     progress_callback=progress_callback,
                     page_callback=page_callback,
                     sections=sections,
+                    sitemap_urls=sitemap_urls,
+                    previous_pages=previous_pages,
                     **kwargs
                 )
             )
@@ -253,115 +308,123 @@ class SEOCrawlerTool(BaseTool):
         respect_robots_txt: bool,
         crawl_delay: float,
         progress_callback = None,
-        sections: Optional[List[PageSection]] = None
+        sections: Optional[List[PageSection]] = None,
+        priority_urls: Optional[Set[str]] = None
     ) -> Dict[str, Any]:
-        """Crawl the website asynchronously."""
+        """
+        Crawl the website asynchronously.
+
+        URLs are pulled from a priority frontier by ``max_concurrent`` long-lived
+        workers, so a slow page only occupies its own worker instead of
+        stalling a whole batch. Politeness is enforced per host by a token
+        bucket derived from ``crawl_delay``.
+        """
         start_time = datetime.now()
-        
+
         logger.info(f"Starting _async_crawl with max_pages: {max_pages}")
-        
+
         # Ensure website_url has protocol
         if not website_url.startswith(('http://', 'https://')):
             website_url = 'https://' + website_url
-            
+
         # IMPORTANT: Clear state to ensure we start fresh
         self.config.visited_urls = set()
         self.config.pages = []
         self.config.found_links = set()
-        
+
+        canonicalize = self.config.url_deduplicator.canonicalize_url
+        frontier = CrawlFrontier(
+            maxsize=max(max_pages * 2, self.config.max_concurrent),
+            priority_urls={canonicalize(url) for url in (priority_urls or set())}
+        )
+        self._politeness = HostPoliteness(crawl_delay, burst=self.config.max_concurrent_per_host)
+
         # Initialize with the start URL
-        self.config.found_links.add(website_url)
-        
-        # Safety counter to prevent infinite loops
-        iterations = 0
-        max_iterations = max(100, max_pages * 2)
-        
+        start_url = canonicalize(website_url)
+        frontier.add(start_url, depth=0)
+        self.config.found_links.add(start_url)
+
         # Error tracking to stop on consecutive failures
         consecutive_errors = 0
-        max_consecutive_errors = 3
-        
-        while len(self.config.visited_urls) < max_pages and self.config.found_links and iterations < max_iterations:
-            iterations += 1
-            logger.info(f"Crawl iteration {iterations}/{max_iterations}")
-            
-            # Safety check - stop if we've reached max_pages
-            if len(self.config.visited_urls) >= max_pages:
-                logger.info(f"Reached max_pages ({max_pages}), stopping crawl")
-                break
-                
-            # Get next batch of URLs to process
-            batch_size = min(self.config.max_concurrent, max_pages - len(self.config.visited_urls))
-            if batch_size <= 0:
-                logger.info(f"No more capacity to crawl pages (visited: {len(self.config.visited_urls)}, max: {max_pages})")
-                break
-                
-            batch_urls = set(list(self.config.found_links)[:batch_size])
-            self.config.found_links -= batch_urls
-            
-            logger.info(f"Crawl loop: visited_urls count: {len(self.config.visited_urls)}, max_pages: {max_pages}, found_links: {len(self.config.found_links)}")
-            logger.info(f"Processing batch of {len(batch_urls)} URLs: {batch_urls}")
-            
-            # Process batch concurrently
-            tasks = []
-            for url in batch_urls:
-                if url not in self.config.visited_urls and len(self.config.visited_urls) < max_pages:
-                    tasks.append(self._process_url(url))
-                else:
-                    logger.info(f"Skipping URL {url}, already visited or at max_pages limit")
-            
-            if tasks:
-                # Use wait instead of gather to not block if a task hangs
-                done, pending = await asyncio.wait(tasks, timeout=30)
-                
-                # Track success/failure for this batch
-                successful_pages = 0
-                
-                if pending:
-                    logger.warning(f"{len(pending)} tasks timed out and will be cancelled")
-                    for task in pending:
-                        task.cancel()
-                
-                # Check the results from done tasks
-                for task in done:
+        max_consecutive_errors = 3 * self.config.max_concurrent
+        stop_event = asyncio.Event()
+        # Pages handed to workers so far; claimed synchronously so concurrent
+        # workers cannot overshoot max_pages
+        claimed = 0
+
+        def enqueue_links(page: SEOPage, depth: int):
+            for link in page.internal_links:
+                if self._is_media_url(link):
+                    continue
+                canonical_link = canonicalize(link)
+                if canonical_link in self.config.visited_urls or canonical_link in frontier.seen:
+                    continue
+                frontier.add(canonical_link, depth + 1)
+                self.config.found_links.add(canonical_link)
+
+        async def worker(worker_id: int):
+            nonlocal consecutive_errors, claimed
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    self.config.found_links.discard(url)
+                    if stop_event.is_set() or claimed >= max_pages:
+                        continue
+                    claimed += 1
+
                     try:
-                        result = task.result()
-                        if result is not None:
-                            successful_pages += 1
-                    except Exception as e:
-                        logger.error(f"Error in task: {str(e)}", exc_info=True)
-                
-                # If no pages were successfully processed in this batch, increment consecutive errors
-                if successful_pages == 0 and len(tasks) > 0:
-                    consecutive_errors += 1
-                    logger.warning(f"No pages successfully processed in this batch. Consecutive errors: {consecutive_errors}")
-                    if consecutive_errors >= max_consecutive_errors:
-                        logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping crawl")
-                        break
-                else:
-                    # Reset consecutive errors on success
+                        page = await asyncio.wait_for(self._process_url(url), timeout=90)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"Worker {worker_id} timed out processing {url}")
+                        page = None
+
+                    if page is None and url not in self.config.visited_urls:
+                        # Skipped without being fetched, give the slot back
+                        claimed -= 1
+                        continue
+
+                    if page is None:
+                        consecutive_errors += 1
+                        if consecutive_errors >= max_consecutive_errors:
+                            logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping crawl")
+                            stop_event.set()
+                        continue
+
                     consecutive_errors = 0
-                
-                await asyncio.sleep(crawl_delay)  # Respect crawl delay between batches
-
-                # Send progress update
-                if progress_callback:
-                    pages_analyzed = len(self.config.visited_urls)
-                    percent_complete = min(100, int((pages_analyzed / max_pages) * 100))
-                    total_links = len(self.config.visited_urls) + len(self.config.found_links)
-                    progress_callback({
-                        'percent_complete': percent_complete,
-                        'pages_analyzed': pages_analyzed,
-                        'total_links': total_links,
-                        'status': f'Page {pages_analyzed} of {max_pages}...',
-                        'current_url': list(batch_urls)[-1] if batch_urls else None,
-                        'new_links_found': len(self.config.found_links),
-                        'remaining_urls': len(self.config.found_links)
-                    })
-            
-            # Extra safety check - stop if we've reached max_pages
-            if len(self.config.visited_urls) >= max_pages:
-                logger.info(f"Reached max_pages ({max_pages}) after processing batch, stopping crawl")
-                break
+                    enqueue_links(page, depth)
+
+                    # Send progress update
+                    if progress_callback:
+                        pages_analyzed = len(self.config.visited_urls)
+                        percent_complete = min(100, int((pages_analyzed / max_pages) * 100))
+                        total_links = len(self.config.visited_urls) + len(self.config.found_links)
+                        progress_callback({
+                            'percent_complete': percent_complete,
+                            'pages_analyzed': pages_analyzed,
+                            'total_links': total_links,
+                            'status': f'Page {pages_analyzed} of {max_pages}...',
+                            'current_url': url,
+                            'new_links_found': len(self.config.found_links),
+                            'remaining_urls': len(self.config.found_links)
+                        })
+                except Exception as e:
+                    logger.error(f"Error in crawl worker {worker_id} for {url}: {str(e)}", exc_info=True)
+                finally:
+                    frontier.task_done()
+
+        workers = [asyncio.create_task(worker(i)) for i in range(self.config.max_concurrent)]
+        drained = asyncio.create_task(frontier.queue.join())
+        stopped = asyncio.create_task(stop_event.wait())
+        try:
+            await asyncio.wait({drained, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in [*workers, drained, stopped]:
+                task.cancel()
+            await asyncio.gather(*workers, drained, stopped, return_exceptions=True)
+            self._politeness = None
+
+        # Anything still queued or in the backlog remains to visit
+        self.config.found_links = frontier.pending_urls() - self.config.visited_urls
 
         logger.info(f"Crawl loop completed. Final visited_urls count: {len(self.config.visited_urls)}, max_pages: {max_pages}")
 
@@ -370,6 +433,7 @@ class SEOCrawlerTool(BaseTool):
         return {
             "pages": [page.filtered_dump(sections) for page in self.config.pages],
             "total_pages": len(self.config.pages),
+            "unchanged_pages": sum(1 for page in self.config.pages if page.unchanged),
             "total_links": len(self.config.visited_urls),
             "crawl_time_seconds": (end_time - start_time).total_seconds(),
             "start_time": start_time.isoformat(),
@@ -384,19 +448,19 @@ class SEOCrawlerTool(BaseTool):
         if not url or not self.config.url_deduplicator.should_process_url(url):
             logger.info(f"URL not processable: {url}")
             return None
-            
+
         # Normalize early to prevent duplicate processing
         normalized_url = self.config.url_deduplicator.canonicalize_url(url)
-        
+
         # Check if we've already visited this URL
         if normalized_url in self.config.visited_urls:
             logger.info(f"URL already visited, skipping: {normalized_url}")
             return None
-            
+
         # Mark URL as visited early to prevent duplicates in concurrent processing
         self.config.visited_urls.add(normalized_url)
         logger.info(f"Added URL to visited_urls: {normalized_url} (count now: {len(self.config.visited_urls)})")
-            
+
         # Check if URL points to an image or media file
         async with self.semaphore:
             if self._is_media_url(url):
@@ -406,199 +470,25 @@ class SEOCrawlerTool(BaseTool):
             logger.info(f"Processing URL: {url} (normalized: {normalized_url})")
 
             try:
-                # Add a timeout for the crawl_tool._run call
-                try:
-                    # Use asyncio.wait_for to add a timeout to the to_thread operation
-                    result = await asyncio.wait_for(
-                        asyncio.to_thread(
-                            self.config.crawl_tool._run,
-                            website_url=normalized_url,
-                            user_id=1,  # TODO: Pass user_id properly
-                            max_pages=1,
-                            max_depth=0,
-                            output_type="full"
-                        ),
-                        timeout=60  # 60 second timeout for page processing
-                    )
-                except asyncio.TimeoutError:
-                    logger.error(f"Timeout processing URL {normalized_url} after 60 seconds")
-                    return None
-                
-                if isinstance(result, dict):
-                    data = result
-                else:
-                    try:
-                        data = json.loads(result)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse result for {normalized_url}: {result[:100]}...", exc_info=True)
-                        return None
-                
-                if data.get("status") != "success" or not data.get("results"):
-                    logger.warning(f"Failed to get content for {normalized_url}")
+                previous = self.config.previous_pages.get(normalized_url)
+                fetched = await self._fetch_page(normalized_url, previous)
+                if not fetched:
                     return None
 
-                # Handle different possible response structures
-                page_data = None
-                if isinstance(data.get("results"), list) and data["results"]:
-                    if isinstance(data["results"][0], dict):
-                        page_data = data["results"][0].get("content", {})
-                elif isinstance(data.get("result"), dict):
-                    page_data = data["result"].get("content", {})
-                
-                if not page_data:
-                    logger.warning(f"Invalid page data structure for {normalized_url}")
+                html_content, status_code, metadata = fetched
+                if previous and (status_code == 304 or content_hash(html_content) == previous.get("content_hash")):
+                    page = self._build_unchanged_page(normalized_url, previous, metadata)
+                else:
+                    page = self._build_page(normalized_url, html_content, status_code, metadata)
+                if page is None:
                     return None
 
-                html_content = page_data.get("html", "")
-                if not isinstance(html_content, str):
-                    if html_content is None:
-                        html_content = ""
-                    else:
-                        try:
-                            html_content = str(html_content)
-                        except Exception as e:
-                            logger.error(f"Error converting HTML content to string for {normalized_url}: {str(e)}")
-                            return None
-
-                metadata = page_data.get("metadata", {})
-                
-                # Parse HTML to extract additional data
-                try:
-                    soup = BeautifulSoup(html_content, 'lxml')
-                except Exception as e:
-                    logger.error(f"Error parsing HTML for {normalized_url}: {str(e)}")
-                    return None
-                
-                # Extract text content from HTML
-                text_content = " ".join(soup.stripped_strings)
-                
-                # Extract h1 tags
-                h1_tags = [h1.get_text(strip=True) for h1 in soup.find_all('h1')]
-                
-                # Determine content type based on HTML structure
-                content_type = "general"
-                if soup.find('article'):
-                    content_type = "article"
-                elif soup.find(['form', 'input']):
-                    content_type = "form"
-                elif soup.find(['table', 'tbody']):
-                    content_type = "data"
-
-                # Extract semantic structure data
-                has_header = bool(soup.find('header'))
-                has_nav = bool(soup.find('nav'))
-                has_main = bool(soup.find('main'))
-                has_footer = bool(soup.find('footer'))
-                has_article = bool(soup.find('article'))
-                has_section = bool(soup.find('section'))
-                has_aside = bool(soup.find('aside'))
-
-                # Extract OpenGraph tags
-                og_title = soup.find('meta', property='og:title')
-                og_description = soup.find('meta', property='og:description')
-                og_image = soup.find('meta', property='og:image')
-
-                # Extract canonical URL
-                canonical_tag = soup.find('link', rel='canonical')
-                canonical_url = canonical_tag['href'] if canonical_tag else None
-                # Extract all canonical tag URLs as strings
-                canonical_tag_objects = soup.find_all('link', rel='canonical')
-                canonical_tag_urls = [tag['href'] for tag in canonical_tag_objects if tag.get('href')] # Extract hrefs
-                
-                # Extract viewport meta tag
-                viewport = soup.find('meta', attrs={'name': 'viewport'})
-                
-                # Extract images with their attributes
-                images = []
-                for img in soup.find_all('img'):
-                    image_data = {
-                        "src": img.get('src', ''),
-                        "alt": img.get('alt', ''),
-                        "width": img.get('width', ''),
-                        "height": img.get('height', ''),
-                        "title": img.get('title', ''),
-                        "loading": img.get('loading', ''),
-                        "srcset": img.get('srcset', ''),
-                        "size": 0  # Will be populated for local images
-                    }
-                    
-                    # Normalize image URL
-                    if image_data["src"]:
-                        image_data["src"] = urljoin(url, image_data["src"])
-                    
-                    images.append(image_data)
-                
-                # Extract all links and categorize them
-                base_domain = urlparse(normalized_url).netloc
-                internal_links = set()
-                external_links = set()
-                
-                for a in soup.find_all('a', href=True):
-                    href = a["href"].strip()
-                    try:
-                        # Skip empty, javascript, mailto, tel links
-                        if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#', 'data:', 'file:', 'about:')):
-                            continue
-                            
-                        # Convert to absolute URL
-                        absolute_url = urljoin(normalized_url, href)
-                        parsed_url = urlparse(absolute_url)
-                        
-                        # Categorize as internal or external
-                        if parsed_url.netloc == base_domain:
-                            if self.config.url_deduplicator.should_process_url(absolute_url):
-                                internal_links.add(absolute_url)
-                        else:
-                            external_links.add(absolute_url)
-                            
-                    except Exception as e:
-                        logger.warning(f"Error processing link {href}: {str(e)}")
-
-                # Update found_links with internal links
-                self.config.found_links.update(internal_links)
-                logger.info(f"Added {len(internal_links)} new internal links from {normalized_url}")
-
-                # Create SEOPage object with enhanced data
-                page = SEOPage(
-                    url=normalized_url,
-                    html=html_content,
-                    text_content=text_content,
-                    title=metadata.get("title") or "",
-                    meta_description=metadata.get("description") or "",
-                    meta_keywords=metadata.get("keywords", "").split(",") if metadata.get("keywords") else [],
-                    h1_tags=h1_tags,
-                    links=internal_links | external_links,  # Combine internal and external links
-                    status_code=page_data.get("status_code", 200),
-                    content_type=content_type,
-                    crawl_timestamp=datetime.now().isoformat(),
-                    # Add semantic structure data
-                    has_header=has_header,
-                    has_nav=has_nav,
-                    has_main=has_main,
-                    has_footer=has_footer,
-                    has_article=has_article,
-                    has_section=has_section,
-                    has_aside=has_aside,
-                    # Add OpenGraph data
-                    og_title=og_title.get('content') if og_title else None,
-                    og_description=og_description.get('content') if og_description else None,
-                    og_image=og_image.get('content') if og_image else None,
-                    # Add canonical data
-                    canonical_url=canonical_url,
-                    canonical_tags=canonical_tag_urls, # Pass the list of strings
-                    # Add viewport data
-                    viewport=viewport.get('content') if viewport else None,
-                    # Add image data
-                    images=images,
-                    # Add link categorization
-                    internal_links=internal_links,
-                    external_links=external_links
-                )
+                logger.info(f"Found {len(page.internal_links)} internal links on {normalized_url}")
 
                 # Store the page
                 self.config.pages.append(page)
                 logger.info(f"Page processed and added to results: {normalized_url}")
-                
+
                 # Call the page callback if provided
                 if hasattr(self.config, 'page_callback') and self.config.page_callback:
                     try:
@@ -607,13 +497,170 @@ class SEOCrawlerTool(BaseTool):
                             page = processed_page
                     except Exception as e:
                         logger.error(f"Error in page callback for {normalized_url}: {str(e)}")
-                
+
                 return page
 
             except Exception as e:
                 logger.error(f"Error processing URL {normalized_url}: {str(e)}", exc_info=True)
                 return None
 
+    async def _fetch_page(self, url: str, previous: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, int, Dict[str, Any]]]:
+        """
+        Fetch a page with the native fetcher, falling back to Firecrawl.
+
+        The fallback is used when the native fetch fails or when the page looks
+        like it only renders its content with JavaScript. The request is
+        conditional when ``previous`` has validators; an unchanged page comes
+        back as a 304 with an empty body.
+        Returns (html, status_code, metadata) or None.
+        """
+        if self._politeness:
+            await self._politeness.acquire(url)
+        result = await self._fetcher.fetch(url, validators=previous) if self._fetcher else None
+
+        if result is not None and result.not_modified:
+            return "", 304, {"redirect_chain": result.redirect_chain, "final_url": result.final_url, **result.validators}
+
+        if result is not None and not result.is_html:
+            logger.info(f"Skipping non-HTML content at {url}: {result.content_type}")
+            return None
+
+        needs_fallback = result is None or (
+            result.status_code == 200 and SEOPageFetcher.needs_js_rendering(result.html)
+        )
+        if needs_fallback and self.config.use_firecrawl_fallback:
+            logger.info(f"Using Firecrawl fallback for {url}")
+            fallback = await self._fetch_with_crawl_tool(url)
+            if fallback is not None:
+                return fallback
+
+        if result is None:
+            logger.warning(f"Failed to get content for {url}")
+            return None
+
+        return result.html, result.status_code, {
+            "redirect_chain": result.redirect_chain,
+            "final_url": result.final_url,
+            **result.validators
+        }
+
+    async def _fetch_with_crawl_tool(self, url: str) -> Optional[Tuple[str, int, Dict[str, Any]]]:
+        """Fetch a single page through CrawlWebsiteTool (Firecrawl) for JS-rendered pages."""
+        try:
+            # Use asyncio.wait_for to add a timeout to the to_thread operation
+            result = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.config.crawl_tool._run,
+                    website_url=url,
+                    user_id=1,  # TODO: Pass user_id properly
+                    max_pages=1,
+                    max_depth=0,
+                    output_type="full"
+                ),
+                timeout=60  # 60 second timeout for page processing
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout processing URL {url} after 60 seconds")
+            return None
+
+        if isinstance(result, dict):
+            data = result
+        else:
+            try:
+                data = json.loads(result)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse result for {url}: {result[:100]}...", exc_info=True)
+                return None
+
+        if data.get("status") != "success" or not data.get("results"):
+            logger.warning(f"Failed to get content for {url}")
+            return None
+
+        # Handle different possible response structures
+        page_data = None
+        if isinstance(data.get("results"), list) and data["results"]:
+            if isinstance(data["results"][0], dict):
+                page_data = data["results"][0].get("content", {})
+        elif isinstance(data.get("result"), dict):
+            page_data = data["result"].get("content", {})
+
+        if not page_data:
+            logger.warning(f"Invalid page data structure for {url}")
+            return None
+
+        html_content = page_data.get("html", "")
+        if not isinstance(html_content, str):
+            if html_content is None:
+                html_content = ""
+            else:
+                try:
+                    html_content = str(html_content)
+                except Exception as e:
+                    logger.error(f"Error converting HTML content to string for {url}: {str(e)}")
+                    return None
+
+        return html_content, page_data.get("status_code", 200), page_data.get("metadata", {}) or {}
+
+    def _build_page(self, normalized_url: str, html_content: str, status_code: int, metadata: Dict[str, Any]) -> Optional[SEOPage]:
+        """Parse fetched HTML into a SEOPage object."""
+        # Relative links and the site's domain resolve against where redirects ended
+        page_url = metadata.get("final_url") or normalized_url
+        try:
+            extracted = extract_page_data(
+                html_content,
+                page_url,
+                internal_link_filter=self.config.url_deduplicator.should_process_url
+            )
+        except Exception as e:
+            logger.error(f"Error parsing HTML for {normalized_url}: {str(e)}")
+            return None
+
+        # Metadata comes from Firecrawl on the fallback path; otherwise use what the HTML defines
+        html_title = extracted.pop("title")
+        html_description = extracted.pop("meta_description")
+        html_keywords = extracted.pop("meta_keywords")
+        title = metadata.get("title", html_title)
+        description = metadata.get("description", html_description)
+        keywords = metadata.get("keywords", html_keywords)
+
+        internal_links = extracted["internal_links"]
+        external_links = extracted["external_links"]
+
+        # Create SEOPage object with enhanced data
+        return SEOPage(
+            **extracted,
+            url=normalized_url,
+            html=html_content,
+            title=title or "",
+            meta_description=(description or "").strip(),
+            meta_keywords=keywords.split(",") if keywords else [],
+            links=internal_links | external_links,  # Combine internal and external links
+            status_code=status_code,
+            crawl_timestamp=datetime.now().isoformat(),
+            redirect_chain=metadata.get("redirect_chain", []),
+            etag=metadata.get("etag"),
+            last_modified=metadata.get("last_modified"),
+            content_hash=content_hash(html_content)
+        )
+
+    def _build_unchanged_page(self, normalized_url: str, previous: Dict[str, Any], metadata: Dict[str, Any]) -> SEOPage:
+        """SEOPage for a page that did not change since the previous crawl, built from what was stored."""
+        internal_links = set(previous.get("internal_links", []))
+        return SEOPage(
+            url=normalized_url,
+            html="",
+            text_content="",
+            links=set(previous.get("links", [])) | internal_links,
+            internal_links=internal_links,
+            status_code=previous.get("status_code", 200),
+            crawl_timestamp=datetime.now().isoformat(),
+            redirect_chain=metadata.get("redirect_chain", []),
+            etag=metadata.get("etag") or previous.get("etag"),
+            last_modified=metadata.get("last_modified") or previous.get("last_modified"),
+            content_hash=previous.get("content_hash"),
+            unchanged=True
+        )
+
     def _is_media_url(self, url: str) -> bool:
         """Check if a URL points to an image or media file."""
         parsed_url = urlparse(url)
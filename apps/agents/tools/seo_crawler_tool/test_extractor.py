@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from .extractor import extract_page_data
+from .benchmark_extractor import FIXTURES_DIR, FIXTURE_URL, beautifulsoup_extract, compare
+
+
+class ExtractPageDataTests(SimpleTestCase):
+    """Tests for the single-pass SEO page extractor"""
+
+    def _fixture(self, name):
+        return (Path(FIXTURES_DIR) / name).read_text(encoding='utf-8')
+
+    def test_matches_beautifulsoup_on_fixtures(self):
+        """Every fixture yields the same fields as the per-field BeautifulSoup extraction"""
+        for path in sorted(Path(FIXTURES_DIR).glob('*.html')):
+            html = path.read_text(encoding='utf-8')
+            with self.subTest(fixture=path.name):
+                mismatches = compare(beautifulsoup_extract(html, FIXTURE_URL), extract_page_data(html, FIXTURE_URL))
+                self.assertEqual(mismatches, {})
+
+    def test_article_fields(self):
+        """Head metadata, headings and links are extracted from an article page"""
+        data = extract_page_data(self._fixture('article.html'), FIXTURE_URL)
+
+        self.assertEqual(data["title"], "How to Choose a Plumber | Example Plumbing")
+        self.assertEqual(data["meta_keywords"], "plumber,plumbing,repairs")
+        self.assertEqual(data["h1_tags"], ["How to Choose aPlumber"])
+        self.assertEqual(data["content_type"], "article")
+        self.assertTrue(data["has_main"] and data["has_aside"])
+        self.assertNotIn("dataLayer", data["text_content"])
+        self.assertIn("Always check the licence first.", data["text_content"])
+        self.assertIn("https://example.com/images/licence.png", [img["src"] for img in data["images"]])
+        self.assertEqual(data["external_links"], {"https://www.consumer.example.org/plumbing"})
+
+    def test_internal_link_filter(self):
+        """Same-domain links rejected by the filter are dropped"""
+        data = extract_page_data(
+            self._fixture('article.html'),
+            FIXTURE_URL,
+            internal_link_filter=lambda url: 'utm_' not in url
+        )
+        self.assertNotIn("https://example.com/blog/services/drain-cleaning/?utm_source=blog", data["internal_links"])
+        self.assertIn("https://example.com/services/", data["internal_links"])
+
+    def test_empty_document(self):
+        """Empty HTML returns defaults instead of raising"""
+        data = extract_page_data("", FIXTURE_URL)
+        self.assertEqual(data["text_content"], "")
+        self.assertIsNone(data["title"])
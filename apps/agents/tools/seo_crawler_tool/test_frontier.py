@@ -0,0 +1,31 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from .frontier import CrawlFrontier
+
+
+class CrawlFrontierTests(SimpleTestCase):
+    """Tests for the bounded crawl frontier"""
+
+    async def test_urls_over_the_queue_size_are_crawled_from_the_backlog(self):
+        frontier = CrawlFrontier(maxsize=2, priority_urls={"https://example.com/sitemap-page"})
+        for url in ("a", "b", "c", "sitemap-page", "d"):
+            frontier.add(f"https://example.com/{url}", depth=1)
+
+        crawled = []
+
+        async def worker():
+            while True:
+                url, _ = await frontier.get()
+                crawled.append(url)
+                frontier.task_done()
+
+        task = asyncio.create_task(worker())
+        await asyncio.wait_for(frontier.queue.join(), timeout=1)
+        task.cancel()
+
+        self.assertEqual(len(crawled), 5)
+        # The sitemap page overflowed but still goes ahead of the other backlog URLs
+        self.assertLess(crawled.index("https://example.com/sitemap-page"), crawled.index("https://example.com/c"))
+        self.assertEqual(frontier.pending_urls(), set())
@@ -242,7 +242,7 @@ def provide_human_input(request, execution_id):
 
         # Update execution status
         execution.status = 'RUNNING'
-        execution.save()
+        execution.save(update_fields=['status', 'updated_at'])
 
         # Use ExecutionMessageBus for consistent messaging
         message_bus = ExecutionMessageBus(execution_id)
@@ -290,7 +290,7 @@ def submit_human_input(request, execution_id):
     
     # Update execution status
     execution.status = 'RUNNING'
-    execution.save()
+    execution.save(update_fields=['status', 'updated_at'])
     
     # Use ExecutionMessageBus for consistent messaging
     message_bus = ExecutionMessageBus(execution_id)
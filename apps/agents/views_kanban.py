@@ -4,6 +4,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_protect
 from django.utils import timezone
+from django.db.models import Prefetch
 import json
 from django.core.cache import cache
 from celery import current_app
@@ -11,10 +12,16 @@ from celery import current_app
 from .models import Crew, CrewExecution, ExecutionStage, Task, Agent, CrewTask
 from apps.seo_manager.models import Client
 from apps.agents.tasks.messaging.execution_bus import ExecutionMessageBus
+from apps.agents.tasks.handlers.input import submit_human_input as deliver_human_input
+from apps.agents.tasks.core.checkpoints import CHECKPOINT_STAGE
 
 import logging
 logger = logging.getLogger(__name__)
 
+def board_stages():
+    """Prefetch of an execution's stages without its task checkpoints."""
+    return Prefetch('stages', queryset=ExecutionStage.objects.exclude(stage_type=CHECKPOINT_STAGE))
+
 @login_required
 def crew_kanban(request, crew_id):
     crew = get_object_or_404(Crew, id=crew_id)
@@ -31,7 +38,7 @@ def crew_kanban(request, crew_id):
         executions = CrewExecution.objects.filter(
             crew=crew,
             client=client
-        ).prefetch_related('stages')
+        ).prefetch_related(board_stages())
         
         execution_data = []
         for execution in executions:
@@ -124,7 +131,7 @@ def start_execution(request, crew_id):
         
         # Update execution with task_id immediately
         execution.task_id = task.id
-        execution.save()
+        execution.save(update_fields=['task_id', 'updated_at'])
         
         # Use ExecutionMessageBus for notifications
         message_bus = ExecutionMessageBus(execution.id)
@@ -168,7 +175,7 @@ def get_active_executions(request, crew_id):
     executions = CrewExecution.objects.filter(
         crew=crew,
         status__in=['pending', 'in_progress']
-    ).prefetch_related('stages')
+    ).prefetch_related(board_stages())
     
     execution_data = []
     for execution in executions:
@@ -205,6 +212,7 @@ def submit_human_input(request, execution_id):
     try:
         data = json.loads(request.body)
         input_text = data.get('input')
+        task_index = data.get('task_index')
         
         if not input_text:
             return JsonResponse({
@@ -212,14 +220,19 @@ def submit_human_input(request, execution_id):
                 'message': 'Input text is required'
             }, status=400)
         
+        if task_index is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Task index is required'
+            }, status=400)
+        
         # Update execution with human input
         execution.human_input_response = {'input': input_text}
         execution.status = 'RUNNING'
-        execution.save()
+        execution.save(update_fields=['human_input_response', 'status', 'updated_at'])
         
-        # Set response in cache with correct key format
-        input_key = f"execution_{execution_id}_task_0_input"  # We use task 0 as that's the current task
-        cache.set(input_key, input_text, timeout=3600)
+        # Deliver the response to the waiting crew task
+        deliver_human_input(execution_id, task_index, input_text)
         
         # Create human input stage
         stage = ExecutionStage.objects.create(
@@ -272,7 +285,7 @@ def cancel_execution(request, execution_id):
         
         # Update execution status
         execution.status = 'CANCELLED'
-        execution.save()
+        execution.save(update_fields=['status', 'updated_at'])
         
         # Notify about cancellation
         message_bus = ExecutionMessageBus(execution_id)
@@ -308,7 +321,7 @@ def execution_detail(request, execution_id):
     ]
     
     # Get all stages for this execution
-    stages = execution.stages.all().select_related('agent').order_by('created_at')
+    stages = execution.stages.exclude(stage_type=CHECKPOINT_STAGE).select_related('agent').order_by('created_at')
     
     # Get all messages for this execution
     messages = execution.messages.all().order_by('timestamp')
@@ -5,6 +5,7 @@ from ..tools.manager import AgentToolManager
 from ..clients.manager import ClientDataManager
 from ..chat.history import DjangoCacheMessageHistory
 from ..models import Conversation, CrewExecution, ChatMessage
+from ..tasks.handlers.input import submit_human_input
 from django.core.cache import cache
 import logging
 import uuid
@@ -37,6 +38,7 @@ class ChatConsumer(BaseWebSocketConsumer):
         self.agent_handler = AgentHandler(self)
         self.is_connected = False
         self.message_history = None
+        self.history_cursor = None  # Cursor for the next older page of history
         self.crew_chat_service = None  # Will be initialized if this is a crew chat
 
     @database_sync_to_async
@@ -123,7 +125,7 @@ class ChatConsumer(BaseWebSocketConsumer):
             await self.accept()
             self.is_connected = True
             
-            # Send historical messages directly
+            # Send the latest page of historical messages directly
             async for msg in self.get_historical_messages(conversation):
                 await self.send_json(msg)
             
@@ -132,7 +134,8 @@ class ChatConsumer(BaseWebSocketConsumer):
                 'message': 'Connected to chat server',
                 'connection_status': 'connected',
                 'session_id': self.session_id,
-                'participant_type': conversation.participant_type
+                'participant_type': conversation.participant_type,
+                'history_cursor': self.history_cursor
             })
             
         except Exception as e:
@@ -140,10 +143,18 @@ class ChatConsumer(BaseWebSocketConsumer):
             await self.close()
             return
 
-    async def get_historical_messages(self, conversation):
-        """Simple async generator for historical messages"""
+    async def get_historical_messages(self, conversation, before=None):
+        """
+        Async generator for one page of historical messages.
+        
+        Sets self.history_cursor to the cursor for the previous page, or None
+        when the start of the conversation has been reached.
+        """
         try:
-            messages = await self.message_history.aget_messages()
+            messages, self.history_cursor = await self.message_history.aget_message_window(
+                limit=self.message_history.message_manager.HISTORY_WINDOW,
+                before=before
+            )
             logger.debug(f"Retrieved {len(messages)} historical messages")
             
             for msg in messages:
@@ -156,7 +167,7 @@ class ChatConsumer(BaseWebSocketConsumer):
                 yield {
                     'type': message_type,
                     'message': msg.content,
-                    'timestamp': conversation.updated_at.isoformat(),
+                    'timestamp': msg.additional_kwargs.get('timestamp') or conversation.updated_at.isoformat(),
                     'id': msg.additional_kwargs.get('id', None),
                     'additional_kwargs': msg.additional_kwargs
                 }
@@ -173,6 +184,19 @@ class ChatConsumer(BaseWebSocketConsumer):
                 'timestamp': datetime.now().isoformat()
             }
 
+    async def send_history_page(self, before):
+        """Send the page of messages before the given cursor."""
+        conversation = await Conversation.objects.filter(session_id=self.session_id).afirst()
+        if not conversation or not before:
+            return
+        async for msg in self.get_historical_messages(conversation, before=before):
+            await self.send_json(msg)
+        await self.send_json({
+            'type': 'system_message',
+            'message': 'History page loaded',
+            'history_cursor': self.history_cursor
+        })
+
     async def disconnect(self, close_code):
         """Override to clean up resources"""
         # Clear organization context
@@ -330,6 +354,11 @@ class ChatConsumer(BaseWebSocketConsumer):
             if data.get('type') == 'keep_alive':
                 return
 
+            # Older history pages are requested with the cursor from the previous page
+            if data.get('type') == 'load_history':
+                await self.send_history_page(data.get('before'))
+                return
+
             # Process message
             await self.process_message(data)
 
@@ -367,15 +396,9 @@ class ChatConsumer(BaseWebSocketConsumer):
                     })
                     return
                 
-                # Store response in cache with additional logging
-                input_key = f"execution_{execution_id}_task_{task_index}_input"
-                logger.info(f"Storing human input response in cache with key: {input_key}, value: {message}")
-                
-                # Use Django cache directly for more reliable storage
-                cache.set(input_key, message, timeout=3600)  # 1 hour timeout
-                
-                # Store in Redis channel to notify waiting task
-                await sync_to_async(cache.set)(f"{input_key}_ready", "true", timeout=3600)
+                # Push the response onto the input channel the crew task is blocked on
+                logger.info(f"Submitting human input for execution {execution_id}, task {task_index}: {message}")
+                await sync_to_async(submit_human_input)(execution_id, task_index, message)
                 
                 # Send user message back to show in chat
                 await self.send_json({
@@ -521,6 +544,16 @@ class ChatConsumer(BaseWebSocketConsumer):
         """Disabled in favor of receive() to prevent duplicate message processing"""
         pass
 
+    async def execution_batch(self, event):
+        """Handle events coalesced by the execution message bus"""
+        for message in event.get('messages', []):
+            event_type = message.get('type')
+            handler = getattr(self, event_type, None) if event_type in ('execution_update', 'human_input_request') else None
+            if handler:
+                await handler(message)
+            else:
+                logger.warning(f"No handler for batched event type: {event_type}")
+
     async def human_input_request(self, event):
         """Handle human input request from crew tasks"""
         try:
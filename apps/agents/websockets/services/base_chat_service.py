@@ -20,6 +20,7 @@ from pydantic import Field
 from apps.common.utils import create_box, get_llm
 from apps.agents.chat.managers.token_manager import TokenManager
 from apps.agents.chat.managers.message_manager import MessageManager
+from apps.agents.chat.managers.executor_pool import agent_setup_pool
 
 logger = logging.getLogger(__name__)
 
@@ -131,11 +132,16 @@ class BaseChatService:
         
         self.message_history = self.message_manager
     
-    def _create_memory(self) -> CustomConversationSummaryBufferMemory:
-        """Create memory with summarization for token efficiency using standard LangChain patterns"""
+    def _create_memory(self, preload_history: bool = True) -> CustomConversationSummaryBufferMemory:
+        """
+        Create memory with summarization for token efficiency using standard LangChain patterns.
+        
+        With ``preload_history`` the latest stored messages are loaded into the
+        memory; services that fill it themselves pass False to skip the query.
+        """
         try:
-            # Get the summarizer LLM using the utility function
-            summarizer = get_llm(settings.SUMMARIZER)[0]  # Get just the LLM instance
+            # Shared summarizer LLM from the process-wide pool
+            summarizer = agent_setup_pool.get_llm(settings.SUMMARIZER)
             
             memory = CustomConversationSummaryBufferMemory(
                 memory_key="chat_history",
@@ -147,13 +153,14 @@ class BaseChatService:
                 token_manager=self.token_manager
             )
             
-            # Pre-load existing messages from our message store into the memory
-            messages = self.message_manager.get_messages_sync()
-            for message in messages:
-                if isinstance(message, HumanMessage):
-                    memory.chat_memory.add_user_message(message.content)
-                elif isinstance(message, AIMessage):
-                    memory.chat_memory.add_ai_message(message.content)
+            if preload_history:
+                # Pre-load existing messages from our message store into the memory
+                messages = self.message_manager.get_messages_sync(limit=self.message_manager.HISTORY_WINDOW)
+                for message in messages:
+                    if isinstance(message, HumanMessage):
+                        memory.chat_memory.add_user_message(message.content)
+                    elif isinstance(message, AIMessage):
+                        memory.chat_memory.add_ai_message(message.content)
             
             return memory
         except Exception as e:
@@ -10,7 +10,7 @@ from channels.db import database_sync_to_async
 from apps.common.utils import create_box
 import logging
 from django.utils import timezone
-from apps.common.utils import get_llm
+from apps.common.utils import get_llm, TokenCounterCallback
 from django.core.cache import cache
 from typing import Optional, List, Any, Dict
 import asyncio
@@ -28,6 +28,8 @@ from apps.agents.chat.managers.token_manager import TokenManager
 from apps.agents.chat.managers.tool_manager import ToolManager
 from apps.agents.chat.managers.prompt_manager import PromptManager
 from apps.agents.chat.managers.message_manager import MessageManager
+from apps.agents.chat.managers.memory_manager import MemoryManager
+from apps.agents.chat.managers.executor_pool import AgentSetup, agent_setup_pool
 from apps.agents.websockets.handlers.callback_handler import WebSocketCallbackHandler
 
 # Import the base class
@@ -58,11 +60,18 @@ class AgentChatService(BaseChatService):
         
         self.callback_handler = callback_handler
         self.agent_executor = None
+        self.token_callback = None
+        self.memory = None
         self.tool_cache = {}  # Cache for tool results
         
         # Initialize specialized managers
         self.tool_manager = ToolManager()
         self.prompt_manager = PromptManager()
+        self.memory_manager = MemoryManager(
+            conversation_id=None,
+            token_manager=self.token_manager,
+            window_tokens=getattr(settings, 'CHAT_MEMORY_WINDOW_TOKENS', 6000)
+        )
         
         # Update callback handler with managers
         if isinstance(self.callback_handler, WebSocketCallbackHandler):
@@ -88,50 +97,35 @@ class AgentChatService(BaseChatService):
             self.conversation_id = str(conversation.id)
             self.token_manager.conversation_id = self.conversation_id
             self.message_manager.conversation_id = self.conversation_id
+            self.memory_manager.conversation_id = self.conversation_id
 
-            # Get LLM with token tracking
-            self.llm, token_callback = get_llm(
-                model_name=self.model_name,
-                temperature=0.7,
-            )
-            
-            # Set up token tracking
-            self.llm.callbacks = [token_callback]
+            # Per-session token tracking; the pooled LLM itself carries no callbacks
+            token_callback = TokenCounterCallback(self.token_manager.tokenizer)
+            self.token_callback = token_callback
             logger.debug(f"Setting up token tracking with callback: {token_callback}")
             self.token_manager.set_token_callback(token_callback)
 
-            # Initialize memory with proper message handling
-            # Need to use sync_to_async here since _create_memory makes sync DB calls
-            create_memory_async = database_sync_to_async(partial(self._create_memory))
-            memory = await create_memory_async()
+            # Initialize memory; its messages come from the memory manager below
+            memory = self._create_memory(preload_history=False)
+            self.memory = memory
+            self.memory_manager.llm = memory.llm
             
-            # Get chat history for the agent executor
-            chat_history = await self.message_manager.get_messages()
+            # Summary of older turns plus the token-budgeted window of recent ones
+            await self._load_memory_context()
 
-            # Load tools using tool manager
-            tools = await self.tool_manager.load_tools(self.agent)
-            
             # Create the agent-specific system prompt with client context using prompt manager
             system_prompt = self.prompt_manager.create_agent_prompt(self.agent, self.client_data)
             
-            # Create prompt using prompt manager - pass raw data
-            prompt = self.prompt_manager.create_chat_prompt(
-                system_prompt=system_prompt,
-                tools=tools,
-                chat_history=chat_history
-            )
-
-            # Create the agent
-            agent = create_structured_chat_agent(
-                llm=self.llm,
-                tools=tools,
-                prompt=prompt
-            )
+            # Reuse this process's compiled LLM, tools, prompt and agent when nothing changed
+            setup_key = agent_setup_pool.key(self.agent.id, self.model_name, system_prompt)
+            setup = await agent_setup_pool.get(setup_key, partial(self._build_agent_setup, system_prompt))
+            self.llm = setup.llm
+            self.tool_manager.tools = setup.tools
 
-            # Create agent executor with memory
+            # Bind the shared agent to this session's memory and callbacks
             self.agent_executor = AgentExecutor.from_agent_and_tools(
-                agent=agent,
-                tools=tools,
+                agent=setup.agent,
+                tools=setup.tools,
                 memory=memory,
                 verbose=True,
                 max_iterations=25,
@@ -150,6 +144,42 @@ class AgentChatService(BaseChatService):
             logger.error(f"Error initializing chat service: {str(e)}", exc_info=True)
             raise
             
+    async def _build_agent_setup(self, system_prompt: str) -> AgentSetup:
+        """Build the session-independent parts of the agent."""
+        llm = agent_setup_pool.get_llm(self.model_name, temperature=0.7)
+        tools = await self.tool_manager.load_tools(self.agent)
+        prompt = self.prompt_manager.create_chat_prompt(
+            system_prompt=system_prompt,
+            tools=tools
+        )
+        agent = create_structured_chat_agent(
+            llm=llm,
+            tools=tools,
+            prompt=prompt
+        )
+        logger.debug(f"Built agent setup for agent {self.agent.id} with model {self.model_name}")
+        return AgentSetup(llm=llm, tools=tools, prompt=prompt, agent=agent)
+
+    async def _load_memory_context(self, current_input: Optional[str] = None) -> List[BaseMessage]:
+        """
+        Load the rolling summary and recent turns into the executor memory.
+        
+        The summary is only kept in the memory's ``moving_summary_buffer``,
+        which puts it ahead of the returned recent turns in ``chat_history``.
+        The consumer stores the user's message before it is processed, so it is
+        dropped from the window when it matches ``current_input``.
+        """
+        summary, recent = await self.memory_manager.get_context()
+        if current_input is not None and recent and isinstance(recent[-1], HumanMessage) \
+                and recent[-1].content == current_input:
+            recent = recent[:-1]
+
+        if self.memory is not None:
+            self.memory.moving_summary_buffer = summary
+            self.memory.chat_memory.messages = list(recent)
+
+        return recent
+
     @database_sync_to_async
     def _create_or_get_conversation(self, client=None) -> Any:
         """Create or get a conversation record."""
@@ -183,22 +213,22 @@ class AgentChatService(BaseChatService):
                 self.token_manager.reset_tracking()
                 logger.debug(create_box("Reset token tracking", ""))
 
-                # Get chat history
-                chat_history = await self.message_manager.get_messages()
+                # Get chat history: recent turns within the token budget (the summary is in the memory)
+                chat_history = await self._load_memory_context(current_input=message)
 
                 # Ensure chat history is a list of BaseMessage objects
                 if not all(isinstance(msg, BaseMessage) for msg in chat_history):
                     logger.warning("Chat history contains non-BaseMessage objects")
                     chat_history = []
 
-                logger.debug(create_box("Invoking agent with callbacks", f"{[self.callback_handler, self.llm.callbacks[0]]}"))
+                logger.debug(create_box("Invoking agent with callbacks", f"{[self.callback_handler, self.token_callback]}"))
                 # Get agent response
                 response = await self.agent_executor.ainvoke(
                     {
                         "input": message,
                         "chat_history": chat_history
                     },
-                    {"callbacks": [self.callback_handler, self.llm.callbacks[0]]}
+                    {"callbacks": [self.callback_handler, self.token_callback]}
                 )
                 
                 # Log response safely by extracting output string
@@ -215,7 +245,7 @@ class AgentChatService(BaseChatService):
                     # Only save the agent's response - user message is already saved by the consumer
                     # Check if this exact response content already exists in the database
                     # to avoid duplication during reconnections
-                    existing_messages = await self.message_manager.get_messages()
+                    existing_messages = await self.message_manager.get_messages(limit=self.message_manager.HISTORY_WINDOW)
                     duplicate_found = False
                     for msg in existing_messages:
                         if isinstance(msg, AIMessage) and msg.content == response['output']:
@@ -226,6 +256,9 @@ class AgentChatService(BaseChatService):
                     if not duplicate_found:
                         await self.message_manager.add_message(AIMessage(content=response['output']))
 
+                # Summarize what left the window while the user reads the reply
+                self.memory_manager.schedule_roll_over()
+
             except Exception as e:
                 logger.error(f"Error in process_message: {str(e)}", exc_info=True)
                 await self._handle_error(str(e), e, unexpected=True)
@@ -4,6 +4,7 @@ from .service import LLMService
 from .providers.base import BaseLLMProvider
 from .providers.gemini import GeminiProvider
 from .utils.cache import LLMCache
+from .utils.embedding_cache import EmbeddingCache
 from .utils.rate_limiter import RateLimiter
 from .utils.streaming import StreamingManager
 
@@ -12,6 +13,7 @@ __all__ = [
     'BaseLLMProvider',
     'GeminiProvider',
     'LLMCache',
+    'EmbeddingCache',
     'RateLimiter',
     'StreamingManager'
 ] 
\ No newline at end of file
@@ -1,13 +1,30 @@
 """Base class for LLM providers."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 
+import tiktoken
+
 from apps.common.models import LLMConfiguration
 
+@lru_cache(maxsize=1)
+def _embedding_encoding():
+    return tiktoken.get_encoding("cl100k_base")
+
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    # Embedding model used by get_embeddings/get_embeddings_batch (None: the chat model)
+    embedding_model: Optional[str] = None
+    # Most texts the provider's embeddings endpoint accepts in one request
+    max_embedding_batch_size: int = 1
+    # Most input tokens in one embeddings request (None: no token limit)
+    max_embedding_batch_tokens: Optional[int] = None
+    # Requests issued concurrently when a provider has no batch endpoint
+    embedding_concurrency: int = 8
+    
     def __init__(self, config: LLMConfiguration):
         """Initialize base provider with configuration."""
         self.config = config
@@ -36,6 +53,53 @@ class BaseLLMProvider(ABC):
         """Get embeddings from provider."""
         pass
     
+    async def get_embeddings_batch(self, texts: List[str]) -> List[list[float]]:
+        """
+        Get embeddings for up to max_embedding_batch_size texts, in order.
+        
+        Providers with a batch endpoint override this; the default issues
+        single-text requests concurrently.
+        """
+        semaphore = asyncio.Semaphore(self.embedding_concurrency)
+        
+        async def embed(text: str) -> list[float]:
+            async with semaphore:
+                return await self.get_embeddings(text)
+        
+        return list(await asyncio.gather(*(embed(text) for text in texts)))
+    
+    def count_embedding_tokens(self, text: str) -> int:
+        """Tokens a text counts for against max_embedding_batch_tokens."""
+        return len(_embedding_encoding().encode(text, disallowed_special=()))
+    
+    def split_embedding_batches(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[str]]:
+        """
+        Split texts into request-sized batches, in order.
+        
+        Batches hold at most ``batch_size`` (capped at max_embedding_batch_size)
+        texts and, when the provider has one, stay under its token limit. A
+        text over the token limit on its own still gets a batch of its own.
+        """
+        size = min(batch_size or self.max_embedding_batch_size, self.max_embedding_batch_size)
+        token_limit = self.max_embedding_batch_tokens
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = self.count_embedding_tokens(text) if token_limit else 0
+            if batch and (len(batch) >= size or (token_limit and batch_tokens + tokens > token_limit)):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def get_embedding_model(self) -> str:
+        """Name of the model embeddings are generated with."""
+        return self.embedding_model or self.model_name
+    
     async def get_available_models(self) -> Dict[str, dict]:
         """Get available models from provider."""
         return self.available_models 
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Google Gemini API provider implementation."""
 
+import asyncio
 import logging
 from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 import google.generativeai as genai
@@ -15,6 +16,11 @@ logger = logging.getLogger(__name__)
 class GeminiProvider(BaseLLMProvider):
     """Direct Google Gemini API provider."""
     
+    embedding_model = "models/embedding-001"
+    max_embedding_batch_size = 100
+    # Used by single and batch requests alike, so a text always gets the same vector
+    embedding_task_type = "retrieval_query"
+    
     def __init__(self, config: LLMConfiguration):
         """Initialize Gemini provider with configuration."""
         super().__init__(config)
@@ -210,16 +216,31 @@ class GeminiProvider(BaseLLMProvider):
     async def get_embeddings(self, text: str) -> list[float]:
         """Get embeddings using Gemini API."""
         try:
-            embedding_model = genai.GenerativeModel('embedding-001')
-            result = await embedding_model.embed_content(
-                {"text": text},
-                task_type="retrieval_query"
+            result = await asyncio.to_thread(
+                genai.embed_content,
+                model=self.embedding_model,
+                content=text,
+                task_type=self.embedding_task_type
             )
-            return result.embedding
+            return result['embedding']
         except Exception as e:
             logger.error(f"Gemini embeddings error: {str(e)}")
             raise
     
+    async def get_embeddings_batch(self, texts: List[str]) -> List[list[float]]:
+        """Get embeddings for several texts in one Gemini API request."""
+        try:
+            result = await asyncio.to_thread(
+                genai.embed_content,
+                model=self.embedding_model,
+                content=texts,
+                task_type=self.embedding_task_type
+            )
+            return result['embedding']
+        except Exception as e:
+            logger.error(f"Gemini batch embeddings error: {str(e)}")
+            raise
+    
     async def _load_image_from_url(self, url: str) -> str:
         """Load image data from URL."""
         try:
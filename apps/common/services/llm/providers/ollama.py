@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 class OllamaProvider(BaseLLMProvider):
     """Direct Ollama API provider."""
     
+    max_embedding_batch_size = 64
+    
     def __init__(self, config: LLMConfiguration):
         """Initialize Ollama provider with configuration."""
         super().__init__(config)
@@ -263,6 +265,22 @@ class OllamaProvider(BaseLLMProvider):
             logger.error(f"Ollama embeddings error: {str(e)}")
             raise 
     
+    async def get_embeddings_batch(self, texts: List[str]) -> List[list[float]]:
+        """Get embeddings for several texts with Ollama's /api/embed endpoint."""
+        try:
+            response = await self.client.post("/api/embed", json={
+                "model": self.model_name,
+                "input": texts
+            })
+            if response.status_code == 404:
+                # Ollama before 0.3 only has the single-text endpoint
+                return await super().get_embeddings_batch(texts)
+            response.raise_for_status()
+            return response.json()['embeddings']
+        except Exception as e:
+            logger.error(f"Ollama batch embeddings error: {str(e)}")
+            raise
+    
     async def _fetch_available_models(self) -> Dict[str, dict]:
         """Fetch available models from Ollama API."""
         try:
@@ -14,6 +14,11 @@ logger = logging.getLogger(__name__)
 class OpenAIProvider(BaseLLMProvider):
     """Direct OpenAI API provider."""
     
+    embedding_model = "text-embedding-3-small"
+    max_embedding_batch_size = 2048
+    # OpenAI rejects embeddings requests over 300k input tokens
+    max_embedding_batch_tokens = 300000
+    
     def __init__(self, config: LLMConfiguration):
         """Initialize OpenAI provider with configuration."""
         super().__init__(config)
@@ -187,7 +192,7 @@ class OpenAIProvider(BaseLLMProvider):
         """Get embeddings using OpenAI API."""
         try:
             response = await self.client.embeddings.create(
-                model="text-embedding-3-small",
+                model=self.embedding_model,
                 input=text
             )
             return response.data[0].embedding
@@ -195,6 +200,18 @@ class OpenAIProvider(BaseLLMProvider):
             logger.error(f"OpenAI embeddings error: {str(e)}")
             raise 
     
+    async def get_embeddings_batch(self, texts: List[str]) -> List[list[float]]:
+        """Get embeddings for several texts in one OpenAI API request."""
+        try:
+            response = await self.client.embeddings.create(
+                model=self.embedding_model,
+                input=texts
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            logger.error(f"OpenAI batch embeddings error: {str(e)}")
+            raise
+    
     async def _fetch_available_models(self) -> Dict[str, dict]:
         """Fetch available models from OpenAI API."""
         try:
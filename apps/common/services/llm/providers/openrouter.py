@@ -14,6 +14,11 @@ logger = logging.getLogger(__name__)
 class OpenRouterProvider(BaseLLMProvider):
     """Direct OpenRouter API provider."""
     
+    embedding_model = "openai/text-embedding-3-small"
+    max_embedding_batch_size = 256
+    # OpenAI rejects embeddings requests over 300k input tokens
+    max_embedding_batch_tokens = 300000
+    
     def __init__(self, config: LLMConfiguration):
         """Initialize OpenRouter provider with configuration."""
         super().__init__(config)
@@ -180,7 +185,7 @@ class OpenRouterProvider(BaseLLMProvider):
         """Get embeddings using OpenRouter API."""
         try:
             response = await self.client.post("/embeddings", json={
-                "model": "openai/text-embedding-3-small",
+                "model": self.embedding_model,
                 "input": text
             })
             response.raise_for_status()
@@ -190,6 +195,20 @@ class OpenRouterProvider(BaseLLMProvider):
             logger.error(f"OpenRouter embeddings error: {str(e)}")
             raise 
     
+    async def get_embeddings_batch(self, texts: List[str]) -> List[list[float]]:
+        """Get embeddings for several texts in one OpenRouter API request."""
+        try:
+            response = await self.client.post("/embeddings", json={
+                "model": self.embedding_model,
+                "input": texts
+            })
+            response.raise_for_status()
+            data = response.json()
+            return [item['embedding'] for item in sorted(data['data'], key=lambda item: item.get('index', 0))]
+        except Exception as e:
+            logger.error(f"OpenRouter batch embeddings error: {str(e)}")
+            raise
+    
     async def _fetch_available_models(self) -> Dict[str, dict]:
         """Fetch available models from OpenRouter API."""
         try:
@@ -2,7 +2,7 @@
 
 import asyncio
 import logging
-from typing import Any, AsyncGenerator, Dict, Optional, Tuple, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 import tiktoken
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -16,11 +16,17 @@ from .providers.anthropic import AnthropicProvider
 from .providers.openrouter import OpenRouterProvider
 from .providers.ollama import OllamaProvider
 from .utils.cache import LLMCache
+from .utils.embedding_cache import EmbeddingCache
 from .utils.rate_limiter import RateLimiter
+from .utils.single_flight import SingleFlight, StreamFanout
 from .utils.streaming import StreamingManager
 
 logger = logging.getLogger(__name__)
 
+# Shared by every LLMService instance in the process
+_single_flight = SingleFlight()
+_stream_fanout = StreamFanout()
+
 class LLMService:
     """
     Centralized service for managing LLM interactions.
@@ -34,6 +40,9 @@ class LLMService:
         'openrouter': OpenRouterProvider,
         'ollama': OllamaProvider
     }
+
+    # Longest time a request waits for rate limit budget before failing
+    RATE_LIMIT_MAX_WAIT = 120
     
     def __init__(self, user=None, cache_ttl: int = 3600):
         """Initialize the LLM service with optional user context."""
@@ -44,6 +53,7 @@ class LLMService:
         
         # Initialize cache
         self.cache = LLMCache(ttl=cache_ttl)
+        self.embedding_cache = EmbeddingCache()
         
         # Initialize config
         self._config = None
@@ -108,21 +118,41 @@ class LLMService:
         self._provider_instances[cache_key] = provider
         return provider
     
-    async def _get_rate_limiter(self, provider_type: str) -> RateLimiter:
-        """Get or create rate limiter for provider."""
+    async def _get_rate_limiter(self, provider_type: str, model: Optional[str] = None) -> RateLimiter:
+        """Get or create rate limiter for a provider and model."""
         provider_type_lower = provider_type.lower()
-        if provider_type_lower not in self._rate_limiters:
+        limiter_key = f"{provider_type_lower}:{model or 'default'}"
+        if limiter_key not in self._rate_limiters:
             from django.db import models
             config = await models.QuerySet(LLMConfiguration).filter(provider_type__iexact=provider_type).afirst()
             if not config:
                 raise ValueError(f"No configuration found for provider type: {provider_type}")
                 
-            self._rate_limiters[provider_type_lower] = RateLimiter(
+            self._rate_limiters[limiter_key] = RateLimiter(
                 provider_type=provider_type_lower,
                 requests_per_minute=config.requests_per_minute,
-                tokens_per_minute=config.tokens_per_minute
+                tokens_per_minute=config.tokens_per_minute,
+                model=model
+            )
+        return self._rate_limiters[limiter_key]
+
+    def _estimate_prompt_tokens(self, messages: list) -> int:
+        """Rough prompt token count used to reserve rate limit budget."""
+        try:
+            return sum(
+                len(self.tokenizer.encode(str(message.get('content', '') if isinstance(message, dict) else message)))
+                for message in messages
+            )
+        except Exception:
+            return 0
+
+    async def _acquire_rate_limit(self, rate_limiter: RateLimiter, estimated_tokens: int):
+        """Wait for rate limit budget, failing only after RATE_LIMIT_MAX_WAIT seconds."""
+        if not await rate_limiter.acquire(estimated_tokens=estimated_tokens, timeout=self.RATE_LIMIT_MAX_WAIT):
+            raise ValueError(
+                f"Rate limit exceeded: no budget for {rate_limiter.provider_type}/{rate_limiter.model} "
+                f"within {self.RATE_LIMIT_MAX_WAIT}s"
             )
-        return self._rate_limiters[provider_type_lower]
     
     async def get_available_models(self, provider_type: str) -> dict:
         """Get available models for a provider."""
@@ -193,22 +223,49 @@ class LLMService:
         provider_type = provider_type or config.provider_type
         model = kwargs.pop('model', None) or kwargs.pop('model_name', config.default_model)
         
-        # Check cache if enabled
-        if use_cache:
+        # Check cache if enabled for this call and for the provider configuration
+        use_cache = use_cache and config.enable_response_cache
+        if not use_cache:
+            return await self._complete(messages, provider_type, model, config, use_cache=False, **kwargs)
+
+        def lookup_cache():
             cached = self.cache.get_cached_response(
                 messages=messages,
                 provider_type=provider_type.lower(),  # Normalize for cache key
                 model=model,
                 **kwargs
             )
-            if cached:
-                return cached.content, cached.metadata
-        
-        # Check rate limits
-        rate_limiter = await self._get_rate_limiter(provider_type)
-        is_allowed, reason = rate_limiter.check_rate_limit()
-        if not is_allowed:
-            raise ValueError(f"Rate limit exceeded: {reason}")
+            return (cached['content'], cached['metadata']) if cached else None
+
+        cached = lookup_cache()
+        if cached:
+            return cached
+
+        async def wait_for_cached():
+            return lookup_cache()
+
+        # Identical concurrent requests share a single provider call
+        cache_key = self.cache.request_key(messages, provider_type.lower(), model, **kwargs)
+        return await _single_flight.do(
+            cache_key,
+            lambda: self._complete(messages, provider_type, model, config, use_cache=True, **kwargs),
+            wait_for=wait_for_cached
+        )
+
+    async def _complete(
+        self,
+        messages: list,
+        provider_type: str,
+        model: str,
+        config: LLMConfiguration,
+        use_cache: bool,
+        **kwargs
+    ) -> Tuple[str, dict]:
+        """Call the provider, track usage and cache the response."""
+        # Wait for rate limit budget
+        rate_limiter = await self._get_rate_limiter(provider_type, model)
+        estimated_tokens = self._estimate_prompt_tokens(messages)
+        await self._acquire_rate_limit(rate_limiter, estimated_tokens)
         
         # Get provider
         provider = await self.get_provider(provider_type)
@@ -230,8 +287,9 @@ class LLMService:
                     completion_tokens=metadata['usage'].get('completion_tokens', 0),
                     provider_type=provider_type.lower()  # Normalize for tracking
                 )
+                # The estimate was reserved up front; charge the remainder
                 rate_limiter.increment_counters(
-                    tokens_used=metadata['usage'].get('total_tokens', 0)
+                    tokens_used=metadata['usage'].get('total_tokens', 0) - estimated_tokens
                 )
             
             # Cache response if enabled
@@ -242,6 +300,7 @@ class LLMService:
                     model=model,
                     content=completion,
                     metadata=metadata,
+                    ttl=config.response_cache_ttl,
                     **kwargs
                 )
             
@@ -275,11 +334,26 @@ class LLMService:
         provider_type = provider_type or config.provider_type
         model = kwargs.get('model_name', config.default_model)
         
-        # Check rate limits
-        rate_limiter = await self._get_rate_limiter(provider_type)
-        is_allowed, reason = rate_limiter.check_rate_limit()
-        if not is_allowed:
-            raise ValueError(f"Rate limit exceeded: {reason}")
+        # Identical concurrent streams share one upstream response
+        stream_key = self.cache.request_key(messages, provider_type.lower(), model, **{**kwargs, 'stream': True})
+        async for content in _stream_fanout.subscribe(
+            stream_key,
+            lambda: self._stream_from_provider(messages, provider_type, model, config, **kwargs)
+        ):
+            yield content
+
+    async def _stream_from_provider(
+        self,
+        messages: list,
+        provider_type: str,
+        model: str,
+        config: LLMConfiguration,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream a completion from the provider, falling back if configured."""
+        # Wait for rate limit budget
+        rate_limiter = await self._get_rate_limiter(provider_type, model)
+        await self._acquire_rate_limit(rate_limiter, self._estimate_prompt_tokens(messages))
         
         # Get provider and streaming manager
         provider = await self.get_provider(provider_type)
@@ -308,9 +382,17 @@ class LLMService:
             else:
                 raise ValueError(f"Streaming not supported for provider: {provider_type}")
             
-            # Stream with timeout
-            async for content in streaming_manager.stream_with_timeout(chunk_stream):
-                yield content
+            # Stream with timeout; the prompt estimate was reserved up front,
+            # the streamed output is charged once the stream ends
+            emitted = []
+            try:
+                async for content in streaming_manager.stream_with_timeout(chunk_stream):
+                    emitted.append(content)
+                    yield content
+            finally:
+                rate_limiter.increment_counters(
+                    tokens_used=len(self.tokenizer.encode(''.join(map(str, emitted)), disallowed_special=()))
+                )
             
         except Exception as e:
             logger.error(f"Error in streaming completion: {str(e)}")
@@ -327,6 +409,69 @@ class LLMService:
             else:
                 yield f"Error: {str(e)}"
     
+    async def get_embeddings_batch(
+        self,
+        texts: List[str],
+        provider_type: str = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: int = 4,
+        use_cache: bool = True
+    ) -> List[list[float]]:
+        """
+        Get embeddings for many texts with as few provider requests as possible.
+        
+        Args:
+            texts: Texts to embed
+            provider_type: Type of provider to use (defaults to config's provider_type)
+            batch_size: Texts per request, capped at the provider's limits
+            max_concurrency: Sub-batches sent to the provider at once
+            use_cache: Whether to use the embedding cache
+            
+        Returns:
+            One embedding per input text, in input order
+        """
+        if not texts:
+            return []
+        
+        if not provider_type:
+            config = await self.config
+            if not config:
+                raise ValueError("No active LLM configuration found")
+            provider_type = config.provider_type
+        
+        provider = await self.get_provider(provider_type)
+        model = provider.get_embedding_model()
+        
+        # Identical texts are embedded once
+        unique_texts = list(dict.fromkeys(texts))
+        embeddings = self.embedding_cache.get_many(model, unique_texts) if use_cache else {}
+        missing = [text for text in unique_texts if text not in embeddings]
+        
+        if missing:
+            batches = provider.split_embedding_batches(missing, batch_size)
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def embed_batch(batch: List[str]) -> Dict[str, list[float]]:
+                async with semaphore:
+                    vectors = await provider.get_embeddings_batch(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} embeddings from {provider_type}, got {len(vectors)}")
+                return dict(zip(batch, vectors))
+            
+            new_embeddings = {}
+            for result in await asyncio.gather(*(embed_batch(batch) for batch in batches)):
+                new_embeddings.update(result)
+            
+            logger.info(
+                f"Embedded {len(missing)} texts in {len(batches)} requests "
+                f"({len(unique_texts) - len(missing)} cached)"
+            )
+            if use_cache:
+                self.embedding_cache.set_many(model, new_embeddings)
+            embeddings.update(new_embeddings)
+        
+        return [embeddings[text] for text in texts]
+    
     async def track_token_usage(
         self,
         model: str,
@@ -1,28 +1,112 @@
 """Caching utility for LLM responses."""
 
+import hashlib
 import json
+import logging
+import threading
 import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional, Tuple
 
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm_response:"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class LRUByteCache:
+    """
+    Thread-safe in-process LRU cache bounded by an approximate byte budget.
+
+    Entries carry their own expiry time; expired entries are dropped on read
+    and the least recently used entries are evicted once the budget is
+    exceeded.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at, size = item
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.current_bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[2]
+            self._entries[key] = (value, time.time() + ttl, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.evictions = 0
+
+
+# One memory tier per process, shared by every LLMService instance
+_memory_tier = LRUByteCache(getattr(settings, 'LLM_RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+_metrics_lock = threading.Lock()
+_metrics = {'memory_hits': 0, 'redis_hits': 0, 'misses': 0, 'stores': 0}
+
+
+def _record(metric: str):
+    with _metrics_lock:
+        _metrics[metric] += 1
+
+
 class LLMCache:
-    """Cache for LLM responses."""
-    
+    """
+    Two-tier cache for LLM responses.
+
+    Lookups go to a per-process LRU first and then to the shared Django cache
+    (Redis), so responses are reused across LLMService instances and across
+    web, Daphne and Celery processes. Keys are SHA-256 digests of the request
+    parameters.
+    """
+
     def __init__(self, ttl: int = 3600):
         self.ttl = ttl
-        self.cache = {}
         self.hits = 0
         self.misses = 0
-    
-    def _get_cache_key(self, messages: list, provider_type: str, model: str, **kwargs) -> str:
-        """Generate cache key from request parameters."""
+
+    def request_key(self, messages: list, provider_type: str, model: str, **kwargs) -> str:
+        """Key identifying a request by its parameters (cache entries and coalescing)."""
         key_data = {
             'messages': messages,
             'provider': provider_type,
             'model': model,
             **kwargs
         }
-        return json.dumps(key_data, sort_keys=True)
-    
+        payload = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
     def get_cached_response(
         self,
         messages: list,
@@ -31,19 +115,33 @@ class LLMCache:
         **kwargs
     ) -> Optional[Dict[str, Any]]:
         """Get cached response if available and not expired."""
-        key = self._get_cache_key(messages, provider_type, model, **kwargs)
-        
-        if key in self.cache:
-            cached = self.cache[key]
-            if time.time() - cached['timestamp'] < self.ttl:
+        key = self.request_key(messages, provider_type, model, **kwargs)
+
+        cached = _memory_tier.get(key)
+        if cached is not None:
+            self.hits += 1
+            _record('memory_hits')
+            return cached
+
+        try:
+            cached = shared_cache.get(f"{REDIS_KEY_PREFIX}{key}")
+        except Exception as e:
+            logger.warning(f"Error reading LLM response cache: {str(e)}")
+            cached = None
+
+        if cached is not None:
+            remaining = cached.get('expires_at', 0) - time.time()
+            if remaining > 0:
+                # Promote to the memory tier for the rest of its lifetime
+                _memory_tier.set(key, cached, int(remaining) or 1, self._entry_size(key, cached))
                 self.hits += 1
+                _record('redis_hits')
                 return cached
-            else:
-                del self.cache[key]
-        
+
         self.misses += 1
+        _record('misses')
         return None
-    
+
     def cache_response(
         self,
         messages: list,
@@ -51,22 +149,65 @@ class LLMCache:
         model: str,
         content: str,
         metadata: dict,
+        ttl: Optional[int] = None,
         **kwargs
     ):
-        """Cache a response."""
-        key = self._get_cache_key(messages, provider_type, model, **kwargs)
-        self.cache[key] = {
+        """Cache a response in both tiers."""
+        ttl = ttl or self.ttl
+        key = self.request_key(messages, provider_type, model, **kwargs)
+        now = time.time()
+        entry = {
             'content': content,
             'metadata': metadata,
-            'timestamp': time.time()
+            'timestamp': now,
+            'expires_at': now + ttl
         }
-    
+        _memory_tier.set(key, entry, ttl, self._entry_size(key, entry))
+        _record('stores')
+
+        try:
+            shared_cache.set(f"{REDIS_KEY_PREFIX}{key}", entry, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Error writing LLM response cache: {str(e)}")
+
+    @staticmethod
+    def _entry_size(key: str, entry: Dict[str, Any]) -> int:
+        """Approximate memory footprint of an entry in bytes."""
+        try:
+            metadata_size = len(json.dumps(entry.get('metadata'), default=str))
+        except (TypeError, ValueError):
+            metadata_size = 1024
+        return len(key) + len(str(entry.get('content', '')).encode('utf-8')) + metadata_size + 128
+
     def get_cache_stats(self) -> Tuple[int, int]:
         """Get cache hit/miss statistics."""
         return self.hits, self.misses
-    
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        """Process-wide hit, miss and eviction metrics for both tiers."""
+        with _metrics_lock:
+            metrics = dict(_metrics)
+        lookups = metrics['memory_hits'] + metrics['redis_hits'] + metrics['misses']
+        metrics.update({
+            'hit_rate': (metrics['memory_hits'] + metrics['redis_hits']) / lookups if lookups else 0.0,
+            'evictions': _memory_tier.evictions,
+            'memory_entries': len(_memory_tier),
+            'memory_bytes': _memory_tier.current_bytes,
+            'memory_max_bytes': _memory_tier.max_bytes
+        })
+        return metrics
+
     def clear(self):
         """Clear the cache."""
-        self.cache = {}
+        _memory_tier.clear()
+        with _metrics_lock:
+            for metric in _metrics:
+                _metrics[metric] = 0
+        if hasattr(shared_cache, 'delete_pattern'):
+            try:
+                shared_cache.delete_pattern(f"{REDIS_KEY_PREFIX}*")
+            except Exception as e:
+                logger.warning(f"Error clearing LLM response cache: {str(e)}")
         self.hits = 0
-        self.misses = 0 
\ No newline at end of file
+        self.misses = 0
@@ -0,0 +1,54 @@
+"""Caching utility for text embeddings."""
+
+import hashlib
+import logging
+from array import array
+from typing import Dict, Iterable, List
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm_embedding:"
+
+
+class EmbeddingCache:
+    """
+    Shared (Redis) cache of embeddings keyed by model and content hash.
+
+    Vectors are stored as packed float32 bytes, roughly a quarter of the
+    size of a pickled list of floats. Reads and writes are batched with
+    get_many/set_many.
+    """
+
+    def __init__(self, ttl: int = 30 * 86400):
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(model: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{KEY_PREFIX}{model}:{digest}"
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings by text."""
+        keys = {self._key(model, text): text for text in texts}
+        if not keys:
+            return {}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Error reading embedding cache: {str(e)}")
+            return {}
+        return {keys[key]: array('f', packed).tolist() for key, packed in cached.items()}
+
+    def set_many(self, model: str, embeddings: Dict[str, List[float]]):
+        """Cache embeddings by text."""
+        if not embeddings:
+            return
+        try:
+            cache.set_many(
+                {self._key(model, text): array('f', vector).tobytes() for text, vector in embeddings.items()},
+                timeout=self.ttl
+            )
+        except Exception as e:
+            logger.warning(f"Error writing embedding cache: {str(e)}")
@@ -1,68 +1,236 @@
 """Rate limiting utility for LLM providers."""
 
+import asyncio
+import logging
+import random
+import threading
 import time
-from typing import Tuple
+import weakref
+from typing import Dict, Optional, Tuple
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm_ratelimit"
+REDIS_RETRY_INTERVAL = 60  # Seconds on local buckets before trying Redis again
+
+# Refills both buckets (requests and tokens) from the Redis clock and takes
+# the request's cost from them atomically. Returns the number of seconds to
+# wait as a string (Lua numbers are truncated to integers in replies); "0"
+# means the cost was taken. With force=1 the cost is always taken, which lets
+# the token bucket go into debt when actual usage exceeds the estimate.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local force = tonumber(ARGV[5]) == 1
+local levels = {}
+local wait = 0
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local cost = tonumber(ARGV[i * 2])
+    if capacity > 0 then
+        local rate = capacity / 60
+        local bucket = redis.call('HMGET', KEYS[i], 'level', 'ts')
+        local level = tonumber(bucket[1]) or capacity
+        local ts = tonumber(bucket[2]) or now
+        level = math.min(capacity, level + math.max(0, now - ts) * rate)
+        levels[i] = level
+        local needed = math.min(cost, capacity)
+        if level < needed then
+            wait = math.max(wait, (needed - level) / rate)
+        end
+    end
+end
+
+if wait > 0 and not force then
+    return tostring(wait)
+end
+
+for i = 1, 2 do
+    if levels[i] then
+        local capacity = tonumber(ARGV[i * 2 - 1])
+        local level = levels[i] - tonumber(ARGV[i * 2])
+        redis.call('HSET', KEYS[i], 'level', level, 'ts', now)
+        redis.call('EXPIRE', KEYS[i], math.ceil((capacity - level) / (capacity / 60)) + 1)
+    end
+end
+return '0'
+"""
+
+
+class _LocalBuckets:
+    """In-process fallback with the same semantics as TOKEN_BUCKET_SCRIPT."""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, keys: Tuple[str, str], capacities: Tuple[int, int], costs: Tuple[int, int], force: bool) -> float:
+        with self._lock:
+            now = time.time()
+            levels = {}
+            wait = 0.0
+            for key, capacity, cost in zip(keys, capacities, costs):
+                if capacity <= 0:
+                    continue
+                rate = capacity / 60
+                level, ts = self._state.get(key, (capacity, now))
+                level = min(capacity, level + max(0.0, now - ts) * rate)
+                levels[key] = level
+                needed = min(cost, capacity)
+                if level < needed:
+                    wait = max(wait, (needed - level) / rate)
+
+            if wait > 0 and not force:
+                return wait
+
+            for key, cost in zip(keys, costs):
+                if key in levels:
+                    self._state[key] = (levels[key] - cost, now)
+            return 0.0
+
+    def level(self, key: str, capacity: int) -> float:
+        with self._lock:
+            level, ts = self._state.get(key, (capacity, time.time()))
+            return min(capacity, level + max(0.0, time.time() - ts) * capacity / 60)
+
+
+_local_buckets = _LocalBuckets()
+
 
 class RateLimiter:
-    """Rate limiter for managing API request and token limits."""
-    
+    """
+    Token-bucket rate limiter for API request and token limits.
+
+    Buckets live in Redis and are keyed by provider and model, so every web,
+    ASGI and Celery process draws from the same per-minute budget. Each check
+    is a single atomic Lua script call. If Redis is unavailable the limiter
+    falls back to per-process buckets.
+
+    ``acquire()`` waits until enough budget has refilled instead of failing.
+    Waiters on one event loop are served in arrival order.
+    """
+
     def __init__(
         self,
         provider_type: str,
         requests_per_minute: int = 60,
-        tokens_per_minute: int = 40000
+        tokens_per_minute: int = 40000,
+        model: Optional[str] = None
     ):
         self.provider_type = provider_type
+        self.model = model or "default"
         self.requests_per_minute = requests_per_minute
         self.tokens_per_minute = tokens_per_minute
-        
-        # Initialize counters
-        self.request_timestamps = []
-        self.token_counts = []
-        self.last_reset = time.time()
-    
-    def check_rate_limit(self) -> Tuple[bool, str]:
-        """Check if current request is within rate limits."""
-        current_time = time.time()
-        window_start = current_time - 60  # 1 minute window
-        
-        # Clean up old timestamps and counts
-        self.request_timestamps = [ts for ts in self.request_timestamps if ts > window_start]
-        self.token_counts = self.token_counts[-self.requests_per_minute:]
-        
-        # Check request limit
-        if len(self.request_timestamps) >= self.requests_per_minute:
-            return False, "Request rate limit exceeded"
-        
-        # Check token limit
-        tokens_used = sum(self.token_counts)
-        if tokens_used >= self.tokens_per_minute:
-            return False, "Token rate limit exceeded"
-        
+
+        scope = f"{KEY_PREFIX}:{{{provider_type}:{self.model}}}"
+        self.request_key = f"{scope}:requests"
+        self.token_key = f"{scope}:tokens"
+
+        self._script = None
+        self._redis_retry_at = 0.0
+        # Limiters are shared between event loops (e.g. async_to_sync calls),
+        # and an asyncio.Lock can only be used from one loop
+        self._acquire_locks = weakref.WeakKeyDictionary()
+        self._locks_guard = threading.Lock()
+
+    def _get_script(self):
+        if self._script is None and get_redis_connection is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                self._script = get_redis_connection("default").register_script(TOKEN_BUCKET_SCRIPT)
+            except Exception as e:
+                self._redis_failed(e)
+        return self._script
+
+    def _redis_failed(self, error: Exception):
+        """Use the local buckets for a while instead of retrying Redis on every request."""
+        self._script = None
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+        logger.warning(
+            f"Redis rate limiter unavailable, using local buckets for {REDIS_RETRY_INTERVAL}s: {str(error)}"
+        )
+
+    def _acquire_lock(self) -> asyncio.Lock:
+        """The lock that orders waiters on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._locks_guard:
+            lock = self._acquire_locks.get(loop)
+            if lock is None:
+                lock = self._acquire_locks[loop] = asyncio.Lock()
+            return lock
+
+    def _take(self, tokens: int, requests: int = 1, force: bool = False) -> float:
+        """Take budget from both buckets; return seconds to wait (0 if taken)."""
+        keys = (self.request_key, self.token_key)
+        capacities = (self.requests_per_minute, self.tokens_per_minute)
+        costs = (requests, tokens)
+        try:
+            script = self._get_script()
+            if script is not None:
+                result = script(
+                    keys=list(keys),
+                    args=[capacities[0], costs[0], capacities[1], costs[1], 1 if force else 0]
+                )
+                return float(result)
+        except Exception as e:
+            self._redis_failed(e)
+        return _local_buckets.take(keys, capacities, costs, force)
+
+    def check_rate_limit(self, estimated_tokens: int = 0) -> Tuple[bool, str]:
+        """Take budget for one request if available, without waiting."""
+        wait = self._take(estimated_tokens)
+        if wait > 0:
+            return False, f"Rate limit for {self.provider_type}/{self.model} exceeded, retry in {wait:.1f}s"
         return True, ""
-    
+
+    async def acquire(self, estimated_tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the request fits in the budget and take it.
+
+        Returns False if ``timeout`` seconds pass first.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        async with self._acquire_lock():
+            while True:
+                wait = self._take(estimated_tokens)
+                if wait <= 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                # Jitter spreads out waiters from different processes
+                await asyncio.sleep(wait + random.uniform(0, 0.05))
+
     def increment_counters(self, tokens_used: int = 0):
-        """Increment request and token counters."""
-        current_time = time.time()
-        
-        # Reset counters if window has passed
-        if current_time - self.last_reset >= 60:
-            self.request_timestamps = []
-            self.token_counts = []
-            self.last_reset = current_time
-        
-        # Add new request
-        self.request_timestamps.append(current_time)
+        """Charge tokens used beyond what was taken when the request was admitted."""
         if tokens_used > 0:
-            self.token_counts.append(tokens_used)
-    
+            self._take(tokens_used, requests=0, force=True)
+
     def get_current_usage(self) -> Tuple[int, int]:
-        """Get current request and token usage."""
-        current_time = time.time()
-        window_start = current_time - 60
-        
-        # Clean up old data
-        self.request_timestamps = [ts for ts in self.request_timestamps if ts > window_start]
-        self.token_counts = self.token_counts[-self.requests_per_minute:]
-        
-        return len(self.request_timestamps), sum(self.token_counts) 
\ No newline at end of file
+        """Get approximate request and token usage in the current minute."""
+        try:
+            if self._get_script() is not None:
+                client = get_redis_connection("default")
+                levels = []
+                for key, capacity in ((self.request_key, self.requests_per_minute), (self.token_key, self.tokens_per_minute)):
+                    level, ts = client.hmget(key, 'level', 'ts')
+                    if level is None:
+                        levels.append(capacity)
+                    else:
+                        elapsed = max(0.0, time.time() - float(ts))
+                        levels.append(min(capacity, float(level) + elapsed * capacity / 60))
+                return int(self.requests_per_minute - levels[0]), int(self.tokens_per_minute - levels[1])
+        except Exception as e:
+            logger.warning(f"Error reading rate limiter usage: {str(e)}")
+
+        return (
+            int(self.requests_per_minute - _local_buckets.level(self.request_key, self.requests_per_minute)),
+            int(self.tokens_per_minute - _local_buckets.level(self.token_key, self.tokens_per_minute))
+        )
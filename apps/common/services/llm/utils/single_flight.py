@@ -0,0 +1,235 @@
+"""Request coalescing (single-flight) for identical LLM requests."""
+
+import asyncio
+import logging
+import uuid
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "llm_inflight:"
+
+# Deletes the lock only while it still holds the caller's token, so a lock
+# that expired and was taken by another process is left alone
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis():
+    if get_redis_connection is None:
+        return None
+    try:
+        return get_redis_connection("default")
+    except Exception:
+        # Not a django-redis cache backend
+        return None
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time and shares its result.
+
+    Concurrent callers with the same key in a process await the leader's
+    future. Across processes the leader holds a short Redis lock. Callers in
+    other processes poll ``wait_for`` (typically a response cache lookup)
+    until the lock is released, and call through themselves if no result
+    appears. Without Redis the lock falls back to the Django cache.
+    """
+
+    def __init__(self, lock_timeout: int = 60, poll_interval: float = 0.25):
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[Tuple[int, str], asyncio.Future] = {}
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        wait_for: Optional[Callable[[], Awaitable[Optional[Any]]]] = None
+    ) -> Any:
+        """Return func()'s result, sharing it with concurrent callers of the same key."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        while flight_key in self._in_flight:
+            in_flight = self._in_flight[flight_key]
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # The leader was cancelled; the next waiter takes over
+
+        future = loop.create_future()
+        self._in_flight[flight_key] = future
+        try:
+            result = await self._run_once(key, func, wait_for)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(flight_key, None)
+
+    async def _run_once(self, key: str, func, wait_for) -> Any:
+        lock_key = f"{LOCK_PREFIX}{key}"
+        token = uuid.uuid4().hex
+        if wait_for is not None and not self._acquire_lock(lock_key, token):
+            result = await self._wait_for_other_process(lock_key, wait_for)
+            if result is not None:
+                return result
+            self._acquire_lock(lock_key, token)
+
+        try:
+            return await func()
+        finally:
+            self._release_lock(lock_key, token)
+
+    async def _wait_for_other_process(self, lock_key: str, wait_for) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            result = await wait_for()
+            if result is not None:
+                return result
+            if not self._lock_held(lock_key):
+                # The other process finished without leaving a result
+                return await wait_for()
+        return None
+
+    def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        try:
+            client = _redis()
+            if client is not None:
+                return bool(client.set(lock_key, token, nx=True, ex=self.lock_timeout))
+            return bool(cache.add(lock_key, token, timeout=self.lock_timeout))
+        except Exception as e:
+            logger.warning(f"Error acquiring single-flight lock: {str(e)}")
+            return True
+
+    def _lock_held(self, lock_key: str) -> bool:
+        try:
+            client = _redis()
+            if client is not None:
+                return bool(client.exists(lock_key))
+            return cache.get(lock_key) is not None
+        except Exception:
+            return False
+
+    def _release_lock(self, lock_key: str, token: str):
+        try:
+            client = _redis()
+            if client is not None:
+                client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            elif cache.get(lock_key) == token:
+                # Other cache backends have no compare-and-delete; best effort
+                cache.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Error releasing single-flight lock: {str(e)}")
+
+
+class _Broadcast:
+    """Chunks of one upstream stream, replayed to every subscriber."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+
+
+class StreamFanout:
+    """
+    Shares one upstream async stream between identical concurrent requests.
+
+    The first subscriber for a key starts the upstream generator in a task.
+    Every subscriber, including late joiners, receives all chunks from the
+    start. The upstream is cancelled once its last subscriber leaves, and an
+    upstream failure is raised in every subscriber still reading.
+    """
+
+    def __init__(self):
+        self._streams: Dict[Tuple[int, str], _Broadcast] = {}
+
+    async def subscribe(
+        self,
+        key: str,
+        stream_factory: Callable[[], AsyncGenerator[Any, None]]
+    ) -> AsyncGenerator[Any, None]:
+        loop = asyncio.get_running_loop()
+        stream_key = (id(loop), key)
+
+        broadcast = self._streams.get(stream_key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[stream_key] = broadcast
+            # Keep a reference so the producer task is not garbage collected
+            broadcast.task = loop.create_task(self._produce(stream_key, broadcast, stream_factory))
+
+        broadcast.subscribers += 1
+        try:
+            index = 0
+            while True:
+                async with broadcast.changed:
+                    await broadcast.changed.wait_for(
+                        lambda: index < len(broadcast.chunks) or broadcast.done
+                    )
+                    pending = broadcast.chunks[index:]
+                    finished = broadcast.done
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(broadcast.chunks):
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # Nobody is reading any more; stop paying for the upstream
+                if self._streams.get(stream_key) is broadcast:
+                    del self._streams[stream_key]
+                broadcast.task.cancel()
+
+    async def _produce(self, stream_key, broadcast: _Broadcast, stream_factory):
+        try:
+            async with aclosing(stream_factory()) as stream:
+                async for chunk in stream:
+                    async with broadcast.changed:
+                        broadcast.chunks.append(chunk)
+                        broadcast.changed.notify_all()
+        except asyncio.CancelledError:
+            # Subscribers that are still reading must not see a complete stream
+            broadcast.error = RuntimeError("Upstream stream was cancelled")
+            raise
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            # New requests start a fresh stream from here on
+            if self._streams.get(stream_key) is broadcast:
+                del self._streams[stream_key]
+            broadcast.done = True
+            async with broadcast.changed:
+                broadcast.changed.notify_all()
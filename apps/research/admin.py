@@ -1,6 +1,13 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Research
+from .models import Research, ResearchStep
+
+class ResearchStepInline(admin.TabularInline):
+    model = ResearchStep
+    extra = 0
+    can_delete = False
+    fields = ['step_type', 'title', 'created_at', 'updated_at']
+    readonly_fields = fields
 
 @admin.register(Research)
 class ResearchAdmin(admin.ModelAdmin):
@@ -9,6 +16,7 @@ class ResearchAdmin(admin.ModelAdmin):
     search_fields = ['query', 'user__username', 'report']
     readonly_fields = ['created_at', 'updated_at', 'visited_urls', 'learnings', 'reasoning_steps']
     date_hierarchy = 'created_at'
+    inlines = [ResearchStepInline]
     
     def truncated_query(self, obj):
         return obj.query[:50] + "..." if len(obj.query) > 50 else obj.query
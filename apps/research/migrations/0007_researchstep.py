@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-16 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0006_assign_organizations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step_type', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('research', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='research.research')),
+            ],
+            options={
+                'ordering': ['id'],
+                'constraints': [models.UniqueConstraint(fields=('research', 'step_type', 'title'), name='unique_research_step')],
+            },
+        ),
+    ]
@@ -8,6 +8,8 @@ User = get_user_model()
 def default_list():
     return []
 
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
 class Research(OrganizationModelMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -38,4 +40,44 @@ class Research(OrganizationModelMixin, models.Model):
         verbose_name_plural = 'Research'
 
     def __str__(self):
-        return f"Research: {self.query[:50]}..." 
\ No newline at end of file
+        return f"Research: {self.query[:50]}..."
+
+    def load_reasoning_steps(self):
+        """
+        Fill reasoning_steps from the step log.
+
+        Steps are appended to ResearchStep while the research runs. The JSON
+        field is written once, the first time the steps of finished research
+        are read, and used as is after that.
+        """
+        if self.status in FINISHED_STATUSES and self.reasoning_steps:
+            return self.reasoning_steps
+        steps = [step.data for step in self.steps.all()]
+        if steps:
+            self.reasoning_steps = steps
+            if self.status in FINISHED_STATUSES:
+                self.save(update_fields=['reasoning_steps'])
+        return self.reasoning_steps
+
+    def step_count(self) -> int:
+        if self.status in FINISHED_STATUSES and self.reasoning_steps:
+            return len(self.reasoning_steps)
+        return self.steps.count() or len(self.reasoning_steps or [])
+
+class ResearchStep(models.Model):
+    """One reasoning step of a research run, upserted on (research, step_type, title)."""
+    research = models.ForeignKey(Research, on_delete=models.CASCADE, related_name='steps')
+    step_type = models.CharField(max_length=50)
+    title = models.CharField(max_length=255)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['research', 'step_type', 'title'], name='unique_research_step')
+        ]
+
+    def __str__(self):
+        return f"{self.step_type}: {self.title[:50]}"
@@ -1,78 +1,66 @@
 import logging
 from typing import Dict, Optional, List
-from .models import Research
+from .models import Research, ResearchStep
 import json
+from django.core.cache import cache
 from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
+CANCELLED_KEY = "research_{research_id}_cancelled"
+CANCELLED_TIMEOUT = 60 * 60 * 24
+
 class ResearchService:
     @staticmethod
-    def update_research_steps(research_id: int, step_data: Dict) -> Optional[Research]:
-        """Update research steps in the database."""
+    def update_research_steps(research_id: int, step_data: Dict) -> Optional[ResearchStep]:
+        """Append a research step, or update the step with the same type and title."""
         try:
-            #logger.info(f"Updating research steps for research {research_id}")
-            #logger.info(f"Step data received: {json.dumps(step_data)}")
-            
-            # Use transaction context manager
-            with transaction.atomic():
-                # Get research object with select_for_update to prevent race conditions
-                research = Research.objects.select_for_update().get(id=research_id)
-                
-                # Ensure we have a valid list for current_steps
-                current_steps = research.reasoning_steps
-                if current_steps is None or not isinstance(current_steps, list):
-                    logger.warning(f"Current steps was not a valid list, resetting. Type was: {type(current_steps)}")
-                    current_steps = []
-                
-                #logger.info(f"Current step count before update: {len(current_steps)}")
-                
-                # Validate step data
-                if not all(key in step_data for key in ['step_type', 'title', 'explanation']):
-                    logger.error(f"Invalid step data format: {json.dumps(step_data)}")
-                    return None
-                
-                # Only append if this is a new step
-                is_duplicate = False
-                if current_steps:
-                    # Check for duplicate step based on step_type and title
-                    for existing_step in current_steps:
-                        if (existing_step.get('step_type') == step_data.get('step_type') and 
-                            existing_step.get('title') == step_data.get('title')):
-                            # Update the existing step instead of adding a new one
-                            existing_step.update(step_data)
-                            is_duplicate = True
-                            logger.info(f"Updated existing step: {step_data.get('title')}")
-                            break
-                    
-                    # Special case: don't add 'complete' step if it's already there
-                    if step_data.get('step_type') == 'complete' and any(s.get('step_type') == 'complete' for s in current_steps):
-                        is_duplicate = True
-                        logger.info("Skipping duplicate complete step")
-                
-                if not is_duplicate:
-                    current_steps.append(step_data)
-                    #logger.info(f"Added new step: {step_data.get('title')}")
-                
-                logger.info(f"Current step count after update: {len(current_steps)}")
-                
-                # Save the updated steps
-                research.reasoning_steps = current_steps
-                research.save(update_fields=['reasoning_steps'])
-                
-                # Verify the save
-                research.refresh_from_db()
-                #logger.info(f"Verified step count after save: {len(research.reasoning_steps)}")
-                
-                return research
-                
-        except Research.DoesNotExist:
-            logger.error(f"Research {research_id} not found")
-            return None
+            # Validate step data
+            if not all(key in step_data for key in ['step_type', 'title', 'explanation']):
+                logger.error(f"Invalid step data format: {json.dumps(step_data)}")
+                return None
+
+            step_type = step_data['step_type']
+            # Special case: don't add 'complete' step if it's already there
+            if step_type == 'complete' and ResearchStep.objects.filter(research_id=research_id, step_type='complete').exists():
+                logger.info("Skipping duplicate complete step")
+                return None
+
+            # Single upsert; no lock on the Research row
+            step, = ResearchStep.objects.bulk_create(
+                [ResearchStep(
+                    research_id=research_id,
+                    step_type=step_type[:50],
+                    title=str(step_data['title'])[:255],
+                    data=step_data
+                )],
+                update_conflicts=True,
+                unique_fields=['research', 'step_type', 'title'],
+                update_fields=['data', 'updated_at']
+            )
+            return step
+
         except Exception as e:
             logger.error(f"Error updating research steps: {str(e)}", exc_info=True)
             return None
 
+    @staticmethod
+    def set_cancelled(research_id: int, cancelled: bool = True):
+        """Record the cancellation flag that running research checks."""
+        cache.set(CANCELLED_KEY.format(research_id=research_id), cancelled, timeout=CANCELLED_TIMEOUT)
+
+    @staticmethod
+    def is_cancelled(research_id: int) -> bool:
+        """Whether research was cancelled, read from the cache when possible."""
+        key = CANCELLED_KEY.format(research_id=research_id)
+        cancelled = cache.get(key)
+        if cancelled is None:
+            status = Research.objects.filter(id=research_id).values_list('status', flat=True).first()
+            # Missing research counts as cancelled
+            cancelled = status is None or status == 'cancelled'
+            cache.set(key, cancelled, timeout=CANCELLED_TIMEOUT)
+        return cancelled
+
     @staticmethod
     def update_research_status(research_id: int, status: str) -> Optional[Research]:
         """Update research status."""
@@ -81,7 +69,8 @@ class ResearchService:
                 research = Research.objects.select_for_update().get(id=research_id)
                 research.status = status
                 research.save(update_fields=['status'])
-                return research
+            ResearchService.set_cancelled(research_id, status == 'cancelled')
+            return research
         except Research.DoesNotExist:
             logger.error(f"Research {research_id} not found")
             return None
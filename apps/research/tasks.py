@@ -110,12 +110,7 @@ class ProgressTracker:
 
     def check_cancelled(self) -> bool:
         """Check if the research has been cancelled."""
-        try:
-            # Use objects manager which is now organization-aware through the mixin
-            research = Research.objects.get(id=self.research_id)
-            return research.status == 'cancelled'
-        except Research.DoesNotExist:
-            return True
+        return ResearchService.is_cancelled(self.research_id)
 
 class ProgressDeepResearchTool(DeepResearchTool):
     """Extended DeepResearchTool that tracks progress and sends updates."""
@@ -155,7 +150,7 @@ class ProgressDeepResearchTool(DeepResearchTool):
         
         return urls
 
-    def _process_content(self, query, content, num_learnings=3, guidance=None):
+    def _process_content(self, query, content, num_learnings=3, guidance=None, url=None):
         if self.progress_tracker.check_cancelled():
             raise Ignore()
         
@@ -166,20 +161,18 @@ class ProgressDeepResearchTool(DeepResearchTool):
         
         # Create a proper content dictionary if content is a string
         if isinstance(content, str):
-            # Check if we have URL information from the parent class call context
-            url = getattr(self, '_current_url', 'unknown source')
             content_dict = {
-                'url': url,
+                'url': url or 'unknown source',
                 'content': content
             }
             # Store the original content string
             original_content = content
             # Use the dictionary for processing
-            result = super()._process_content(query, original_content, num_learnings, guidance)
+            result = super()._process_content(query, original_content, num_learnings, guidance, url)
         else:
             # Content is already a dictionary
             content_dict = content
-            result = super()._process_content(query, content.get('content', content), num_learnings, guidance)
+            result = super()._process_content(query, content.get('content', content), num_learnings, guidance, url)
         
         # Validate result
         if not result:
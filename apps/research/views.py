@@ -12,6 +12,7 @@ import json
 import logging
 
 from .models import Research
+from .services import ResearchService
 from .forms import ResearchForm
 from .tasks import run_research
 from apps.common.utils import get_models
@@ -66,6 +67,7 @@ def research_create(request):
 def research_detail(request, research_id):
     """View details of a research task."""
     research = get_object_or_404(Research, id=research_id, user=request.user)
+    research.load_reasoning_steps()
     available_models = get_models()
     selected_model = getattr(settings, 'GENERAL_MODEL', available_models[0] if available_models else None)
     
@@ -106,6 +108,7 @@ def cancel_research(request, research_id):
             # Update status in database
             research.status = 'cancelled'
             research.save(update_fields=['status'])
+            ResearchService.set_cancelled(research_id)
             
             # Log for debugging
             logger.info(f"Research {research_id} cancelled successfully")
@@ -143,7 +146,7 @@ def research_progress(request, research_id):
         progress = 100
     elif research.status == 'in_progress':
         # Estimate progress based on steps
-        step_count = len(research.reasoning_steps)
+        step_count = research.step_count()
         expected_total = 10  # Typical number of steps
         progress = min(95, int((step_count / expected_total) * 100))
     
@@ -171,6 +174,7 @@ def research_reasoning(request, research_id):
         return HttpResponse(status=400)
         
     research = get_object_or_404(Research, id=research_id, user=request.user)
+    research.load_reasoning_steps()
     
     return render(request, 'research/partials/steps.html', {
         'research': research
@@ -91,6 +91,7 @@ class ResearchConsumer(OrganizationAwareConsumer):
             #logger.debug(f"Attempting to fetch research with ID: {research_id}")
             research = Research.objects.get(id=research_id)
             #logger.debug(f"Successfully found research with ID: {research_id}")
+            research.load_reasoning_steps()
             return research
         except Research.DoesNotExist:
             # Fallback to unfiltered objects if filtered query fails
@@ -98,6 +99,7 @@ class ResearchConsumer(OrganizationAwareConsumer):
             try:
                 research = Research.unfiltered_objects.get(id=research_id)
                 logger.info(f"Found research with unfiltered_objects. Organization: {research.organization_id}")
+                research.load_reasoning_steps()
                 return research
             except Research.DoesNotExist:
                 logger.error(f"Research {research_id} not found")
@@ -126,7 +128,8 @@ class ResearchConsumer(OrganizationAwareConsumer):
             return research
         
         research.status = 'cancelled'
-        research.save()
+        research.save(update_fields=['status'])
+        ResearchService.set_cancelled(research.id)
         logger.info(f"Research {self.research_id} cancelled")
         return research
     
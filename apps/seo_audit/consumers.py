@@ -3,7 +3,9 @@ import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from apps.common.websockets.organization_consumer import OrganizationAwareConsumer
 from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
 from .models import SEOAuditResult
+from .services.progress import audit_group, get_replay
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +15,7 @@ class SEOAuditConsumer(OrganizationAwareConsumer):
         await super().connect()
         
         self.audit_id = self.scope['url_route']['kwargs']['audit_id']
-        self.audit_group_name = f'audit_{self.audit_id}'
+        self.audit_group_name = audit_group(self.audit_id)
         
         #logger.info(f"WebSocket connecting for audit {self.audit_id}")
         #logger.debug(f"Channel name: {self.channel_name}")
@@ -35,6 +37,9 @@ class SEOAuditConsumer(OrganizationAwareConsumer):
             # logger.info(f"WebSocket connection accepted for audit {self.audit_id}")
         except Exception as e:
             logger.error(f"Error accepting connection: {str(e)}")
+            return
+
+        await self.send_replay()
 
     async def disconnect(self, close_code):
         # logger.info(f"WebSocket disconnecting for audit {self.audit_id} with code {close_code}")
@@ -111,6 +116,14 @@ class SEOAuditConsumer(OrganizationAwareConsumer):
         except Exception as e:
             logger.error(f"Error sending audit error: {str(e)}")
 
+    async def send_replay(self):
+        """Catch up on events sent before this client connected"""
+        try:
+            for event in await sync_to_async(get_replay)(self.audit_id):
+                await self.send(text_data=json.dumps(event))
+        except Exception as e:
+            logger.error(f"Error replaying audit events: {str(e)}")
+
     @database_sync_to_async
     def get_audit_status(self):
         """Get current audit status"""
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seo_audit', '0005_seoauditresult_organization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seoauditissue',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='Identifies the issue within its audit', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='seoauditissue',
+            constraint=models.UniqueConstraint(fields=('audit', 'fingerprint'), name='unique_audit_issue_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-16 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seo_audit', '0006_seoauditissue_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SEOAuditPageState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048)),
+                ('etag', models.CharField(blank=True, max_length=255, null=True)),
+                ('last_modified', models.CharField(blank=True, max_length=64, null=True)),
+                ('content_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('status_code', models.IntegerField(default=200)),
+                ('is_404', models.BooleanField(default=False)),
+                ('links', models.JSONField(default=list)),
+                ('internal_links', models.JSONField(default=list)),
+                ('checks', models.JSONField(default=dict, help_text='Page check issues by category')),
+                ('metrics', models.JSONField(default=dict)),
+                ('signature', models.JSONField(blank=True, help_text='MinHash signature for near-duplicate detection', null=True)),
+                ('audit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='page_states', to='seo_audit.seoauditresult')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('audit', 'url'), name='unique_audit_page_state_url')],
+            },
+        ),
+    ]
@@ -168,13 +168,40 @@ class SEOAuditIssue(models.Model):
     url = models.URLField()
     details = models.JSONField()
     discovered_at = models.DateTimeField(auto_now_add=True)
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, help_text="Identifies the issue within its audit")
 
     class Meta:
         ordering = ['-severity', '-discovered_at']
+        constraints = [
+            models.UniqueConstraint(fields=['audit', 'fingerprint'], name='unique_audit_issue_fingerprint')
+        ]
 
     def __str__(self):
         return f"{self.get_issue_type_display()} - {self.get_severity_display()} - {self.url}" 
 
+class SEOAuditPageState(models.Model):
+    """What an audit stored about one page, used by the next incremental audit."""
+    audit = models.ForeignKey(SEOAuditResult, on_delete=models.CASCADE, related_name='page_states')
+    url = models.URLField(max_length=2048)
+    etag = models.CharField(max_length=255, null=True, blank=True)
+    last_modified = models.CharField(max_length=64, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+    status_code = models.IntegerField(default=200)
+    is_404 = models.BooleanField(default=False)
+    links = models.JSONField(default=list)
+    internal_links = models.JSONField(default=list)
+    checks = models.JSONField(default=dict, help_text="Page check issues by category")
+    metrics = models.JSONField(default=dict)
+    signature = models.JSONField(null=True, blank=True, help_text="MinHash signature for near-duplicate detection")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['audit', 'url'], name='unique_audit_page_state_url')
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.audit_id})"
+
 class SEORemediationPlan(models.Model):
     audit = models.ForeignKey(SEOAuditResult, on_delete=models.CASCADE, related_name='remediation_plans')
     url = models.URLField()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+from django.db import connection
+from apps.seo_audit.models import SEOAuditIssue
+
+logger = logging.getLogger(__name__)
+
+def issue_fingerprint(issue_type: str, url: str, issue: Dict[str, Any]) -> str:
+    """Stable identity of an issue within an audit (ignores when it was found)."""
+    key = json.dumps(
+        [issue_type, url, issue.get('issue'), issue.get('value'), issue.get('details')],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def guess_issue_type(issue: Dict[str, Any]) -> str:
+    """Issue type for issues that do not carry one."""
+    issue_type = issue.get('type')
+    if issue_type:
+        return issue_type
+
+    # Try to determine issue type from the issue details
+    description = str(issue.get('issue', '')).lower()
+    if 'ssl' in description:
+        return 'ssl_error'
+    if 'link' in description:
+        return 'broken_link'
+    if 'meta' in description:
+        return 'meta_tag_issue'
+    if 'content' in description:
+        return 'content_issue'
+    return 'general_issue'  # Default fallback
+
+class BulkWriter:
+    """
+    Writes model rows with bulk_create from a writer thread.
+
+    Rows are buffered and full batches handed to the thread, so rows added
+    from inside an event loop (where the ORM cannot be used) still reach the
+    database while the caller keeps running. Conflicting rows are skipped.
+    """
+
+    model = None
+
+    def __init__(self, name: str, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.written = 0
+        self._name = name
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+        self._error: Optional[Exception] = None
+        self._queue: "queue.Queue[Optional[List[Any]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def add(self, rows: List[Any]):
+        """Buffer rows, handing a full batch to the writer thread."""
+        with self._lock:
+            self._buffer.extend(rows)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._queue.put(batch)
+
+    def flush(self):
+        """Write everything buffered so far and wait until it is stored."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._queue.put(batch)
+        self._queue.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self, timeout: float = 30.0):
+        """Stop the writer thread; call ``flush`` first to keep buffered rows."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"{self._name} did not finish within {timeout}s")
+
+    def _write_loop(self):
+        try:
+            while True:
+                batch = self._queue.get()
+                try:
+                    if batch is None:
+                        break
+                    self.model.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+                    self.written += len(batch)
+                    logger.debug(f"{self._name} wrote {len(batch)} rows")
+                except Exception as e:
+                    logger.error(f"{self._name} failed to write rows: {str(e)}")
+                    self._error = e
+                finally:
+                    self._queue.task_done()
+        finally:
+            # The thread holds its own database connection
+            connection.close()
+
+class AuditIssueWriter(BulkWriter):
+    """
+    Buffers audit issues and writes them in batches as the audit runs.
+
+    Issues are de-duplicated by fingerprint before writing, and rows are
+    unique per audit and fingerprint, so ``written`` counts the rows
+    actually stored.
+    """
+
+    model = SEOAuditIssue
+
+    def __init__(self, audit, batch_size: int = 500):
+        super().__init__(f'audit-issues-{audit.id}', batch_size=batch_size)
+        self.audit = audit
+        self._seen = set()
+
+    def __call__(self, issues: List[Dict[str, Any]]):
+        rows = []
+        with self._lock:
+            for issue in issues:
+                row = self._to_row(issue)
+                if row.fingerprint in self._seen:
+                    continue
+                self._seen.add(row.fingerprint)
+                rows.append(row)
+        self.add(rows)
+
+    def _to_row(self, issue: Dict[str, Any]) -> SEOAuditIssue:
+        issue_type = guess_issue_type(issue)
+        url = issue.get('url') or self.audit.website
+        return SEOAuditIssue(
+            audit=self.audit,
+            severity=issue.get('severity', 'medium'),
+            issue_type=issue_type,
+            url=url,
+            details=json.loads(json.dumps(issue, default=str)),
+            fingerprint=issue_fingerprint(issue_type, url, issue)
+        )
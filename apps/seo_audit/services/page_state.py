@@ -0,0 +1,77 @@
+import logging
+from typing import Any, Dict, List, Optional
+from apps.seo_audit.models import SEOAuditPageState, SEOAuditResult
+from apps.seo_audit.services.issue_writer import BulkWriter
+
+logger = logging.getLogger(__name__)
+
+# What the crawler needs for every page: validators to fetch conditionally
+# and links to keep crawling from pages that did not change
+CRAWL_FIELDS = ('url', 'etag', 'last_modified', 'content_hash', 'status_code', 'links', 'internal_links')
+# Kept results, only read for pages that turned out to be unchanged
+DETAIL_FIELDS = ('url', 'checks', 'metrics', 'is_404', 'signature')
+LOAD_BATCH_SIZE = 500
+
+class AuditPageStateWriter(BulkWriter):
+    """Stores the per-page state of an audit as pages are analysed."""
+
+    model = SEOAuditPageState
+
+    def __init__(self, audit, batch_size: int = 500):
+        super().__init__(f'audit-page-state-{audit.id}', batch_size=batch_size)
+        self.audit = audit
+
+    def __call__(self, state: Dict[str, Any]):
+        self.add([SEOAuditPageState(
+            audit=self.audit,
+            url=state['url'],
+            etag=state.get('etag'),
+            last_modified=state.get('last_modified'),
+            content_hash=state.get('content_hash'),
+            status_code=state.get('status_code') or 200,
+            is_404=state.get('is_404', False),
+            links=state.get('links', []),
+            internal_links=state.get('internal_links', []),
+            checks=state.get('checks', {}),
+            metrics=state.get('metrics', {}),
+            signature=state.get('signature')
+        )])
+
+class PreviousPageState:
+    """
+    Page state of the latest completed audit of the same website and client.
+
+    ``pages`` holds what the crawler needs for every page; the stored check
+    results of a page are only read by ``load`` once it is known to be
+    unchanged.
+    """
+
+    def __init__(self, audit_id: int, pages: Dict[str, Dict[str, Any]]):
+        self.audit_id = audit_id
+        self.pages = pages
+
+    @classmethod
+    def for_audit(cls, audit) -> Optional["PreviousPageState"]:
+        previous_id = SEOAuditResult.unfiltered_objects.filter(
+            organization_id=audit.organization_id,
+            client_id=audit.client_id,
+            website=audit.website,
+            status='completed'
+        ).exclude(id=audit.id).order_by('-start_time').values_list('id', flat=True).first()
+        if previous_id is None:
+            return None
+        rows = SEOAuditPageState.objects.filter(audit_id=previous_id).values(*CRAWL_FIELDS)
+        return cls(previous_id, {row['url']: row for row in rows.iterator()})
+
+    def load(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored results of the given pages, by URL."""
+        details = {}
+        for start in range(0, len(urls), LOAD_BATCH_SIZE):
+            rows = SEOAuditPageState.objects.filter(
+                audit_id=self.audit_id,
+                url__in=urls[start:start + LOAD_BATCH_SIZE]
+            ).values(*DETAIL_FIELDS)
+            for row in rows:
+                details[row['url']] = {**self.pages.get(row['url'], {}), **row}
+        logger.debug(f"Loaded stored results of {len(details)} unchanged pages from audit {self.audit_id}")
+        return details
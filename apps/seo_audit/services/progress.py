@@ -0,0 +1,114 @@
+import json
+import logging
+import queue
+import threading
+from typing import Dict, List, Optional
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+logger = logging.getLogger(__name__)
+
+REPLAY_SIZE = 50  # Events kept for browsers that connect mid-audit
+REPLAY_TIMEOUT = 3600  # 1 hour
+
+def audit_group(audit_id) -> str:
+    return f'audit_{audit_id}'
+
+def replay_key(audit_id) -> str:
+    return f"seo_audit_replay_{audit_id}"
+
+def _redis():
+    if get_redis_connection is None:
+        return None
+    try:
+        return get_redis_connection("default")
+    except Exception as e:
+        logger.warning(f"Redis unavailable for audit replay, using cache: {str(e)}")
+        return None
+
+class AuditProgressPublisher:
+    """
+    Streams audit events to the audit's channel group.
+
+    Events are handed to a sender thread, so the audit (which reports
+    progress from inside its own event loop) never blocks on the channel
+    layer. The latest ``REPLAY_SIZE`` events are also kept in Redis for
+    browsers that connect mid-audit; see ``get_replay``.
+    """
+
+    def __init__(self, audit_id):
+        self.audit_id = audit_id
+        self.group = audit_group(audit_id)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._send_loop, name=f'audit-progress-{audit_id}', daemon=True)
+        self._thread.start()
+
+    def update(self, data: Dict):
+        self.publish({'type': 'audit.update', 'data': data})
+
+    def complete(self, data: Dict, replay_data: Optional[Dict] = None):
+        # The full results are only useful live; late joiners just need to know it finished
+        self.publish(
+            {'type': 'audit.complete', 'data': data},
+            replay_event={'type': 'audit.complete', 'data': replay_data or {'status': 'completed'}}
+        )
+
+    def error(self, error: str):
+        self.publish({'type': 'audit.error', 'error': error})
+
+    def publish(self, event: Dict, replay_event: Optional[Dict] = None):
+        self._queue.put((event, replay_event or event))
+
+    def close(self, timeout: float = 10.0):
+        """Send what is queued and stop the sender thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Progress sender for audit {self.audit_id} did not finish within {timeout}s")
+
+    def _send_loop(self):
+        channel_layer = get_channel_layer()
+        client = _redis()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            event, replay_event = item
+            try:
+                async_to_sync(channel_layer.group_send)(self.group, event)
+            except Exception as e:
+                logger.error(f"Error sending progress for audit {self.audit_id}: {str(e)}")
+            self._remember(client, replay_event)
+
+    def _remember(self, client, event: Dict):
+        key = replay_key(self.audit_id)
+        payload = json.dumps(event, default=str)
+        try:
+            if client is not None:
+                pipe = client.pipeline()
+                pipe.rpush(key, payload)
+                pipe.ltrim(key, -REPLAY_SIZE, -1)
+                pipe.expire(key, REPLAY_TIMEOUT)
+                pipe.execute()
+            else:
+                events = (cache.get(key) or []) + [payload]
+                cache.set(key, events[-REPLAY_SIZE:], timeout=REPLAY_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Error storing replay event for audit {self.audit_id}: {str(e)}")
+
+def get_replay(audit_id) -> List[Dict]:
+    """Recent events of an audit, oldest first."""
+    key = replay_key(audit_id)
+    try:
+        client = _redis()
+        payloads = client.lrange(key, 0, -1) if client is not None else (cache.get(key) or [])
+        return [json.loads(payload) for payload in payloads]
+    except Exception as e:
+        logger.warning(f"Error reading replay events for audit {audit_id}: {str(e)}")
+        return []
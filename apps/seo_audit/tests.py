@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+
+from apps.organizations.models import Organization
+from apps.seo_audit.models import SEOAuditIssue, SEOAuditPageState, SEOAuditResult
+from apps.seo_audit.services.issue_writer import AuditIssueWriter
+from apps.seo_audit.services.page_state import AuditPageStateWriter, PreviousPageState
+
+User = get_user_model()
+
+
+class AuditTestCase(TransactionTestCase):
+    """Writers use their own thread and connection, so rows must be committed"""
+
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='password')
+        self.organization = Organization.objects.create(name='Org', owner=owner)
+        self.audit = SEOAuditResult.unfiltered_objects.create(
+            organization=self.organization,
+            website='https://example.com/'
+        )
+
+
+class AuditIssueWriterTests(AuditTestCase):
+    """Tests for batched issue writes during an audit"""
+
+    def issue(self, path, issue='Missing title'):
+        return {'type': 'title', 'url': f'https://example.com/{path}', 'issue': issue, 'severity': 'high'}
+
+    def wait_for_rows(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if SEOAuditIssue.objects.filter(audit=self.audit).count() >= count:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_full_batches_are_written_while_the_audit_runs(self):
+        """Batches reported from inside the audit's event loop are stored before the audit ends"""
+        writer = AuditIssueWriter(self.audit, batch_size=2)
+        self.addCleanup(writer.close)
+
+        async def crawl():
+            # The crawler calls the writer synchronously from its event loop
+            writer([self.issue('a'), self.issue('b')])
+            writer([self.issue('c')])
+
+        asyncio.run(crawl())
+
+        self.assertTrue(self.wait_for_rows(2))
+        writer.flush()
+        self.assertEqual(SEOAuditIssue.objects.filter(audit=self.audit).count(), 3)
+
+    def test_repeated_issues_are_counted_once(self):
+        writer = AuditIssueWriter(self.audit, batch_size=10)
+        self.addCleanup(writer.close)
+
+        writer([self.issue('a'), self.issue('a'), self.issue('b')])
+        writer([self.issue('a')])
+        writer.flush()
+
+        self.assertEqual(writer.written, 2)
+        self.assertEqual(SEOAuditIssue.objects.filter(audit=self.audit).count(), 2)
+
+
+class PageStateTests(AuditTestCase):
+    """Tests for per-page state stored for incremental audits"""
+
+    def test_next_audit_reads_validators_and_loads_results_on_demand(self):
+        writer = AuditPageStateWriter(self.audit, batch_size=10)
+        self.addCleanup(writer.close)
+        writer({
+            'url': 'https://example.com/a',
+            'etag': '"v1"',
+            'content_hash': 'abc',
+            'links': ['https://example.com/b'],
+            'checks': {'meta_tag_issues': [{'type': 'title', 'issue': 'Missing title'}]},
+            'metrics': {'word_count': 120},
+            'signature': [1, 2, 3]
+        })
+        writer.flush()
+        self.audit.status = 'completed'
+        self.audit.save()
+
+        next_audit = SEOAuditResult.unfiltered_objects.create(
+            organization=self.organization,
+            website='https://example.com/'
+        )
+        previous = PreviousPageState.for_audit(next_audit)
+
+        page = previous.pages['https://example.com/a']
+        self.assertEqual(page['etag'], '"v1"')
+        self.assertEqual(page['links'], ['https://example.com/b'])
+        self.assertNotIn('checks', page)
+
+        loaded = previous.load(['https://example.com/a', 'https://example.com/missing'])
+        self.assertEqual(list(loaded), ['https://example.com/a'])
+        self.assertEqual(loaded['https://example.com/a']['signature'], [1, 2, 3])
+        self.assertEqual(SEOAuditPageState.objects.filter(audit=self.audit).count(), 1)
@@ -155,6 +155,7 @@ class StartAuditView(LoginRequiredMixin, View):
             max_pages = int(data.get('max_pages', 100))
             check_external_links = data.get('check_external_links', False)
             crawl_delay = float(data.get('crawl_delay', 1.0))
+            incremental = bool(data.get('incremental', False))
 
             # Validate required fields
             if not website:
@@ -182,7 +183,8 @@ class StartAuditView(LoginRequiredMixin, View):
                 website=website,
                 max_pages=max_pages,
                 check_external_links=check_external_links,
-                crawl_delay=crawl_delay
+                crawl_delay=crawl_delay,
+                incremental=incremental
             )
             logger.info(f"Started Celery task: {task.id} for audit: {audit.id}")
 
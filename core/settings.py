@@ -532,6 +532,12 @@ CELERY_RESULT_EXPIRES     = 60*60*24*30 # Results expire after 1 month
 CELERY_ACCEPT_CONTENT     = ["json"]
 CELERY_TASK_SERIALIZER    = 'json'
 CELERY_RESULT_SERIALIZER  = 'json'
+CELERY_BEAT_SCHEDULE      = {
+    'reconcile-conversation-token-totals': {
+        'task': 'apps.agents.tasks.token_totals.reconcile_conversation_token_totals',
+        'schedule': 60 * 60,  # Hourly
+    },
+}
 ########################################
 
 X_FRAME_OPTIONS = 'SAMEORIGIN'